@@ -16,6 +16,12 @@ sys.path.insert(0, os.path.abspath(parent_dir))
 # Note: SQLite on Vercel is not ideal for production due to serverless nature
 # Consider using a managed database like PostgreSQL, MySQL, or MongoDB
 os.environ.setdefault('DATABASE_URL', 'sqlite:////tmp/hr_demo.db')
+# /tmp does not survive cold starts: the pre-built bundle (scripts/build_bundle.py) is copied
+# there when deployed, otherwise users/bookings are seeded whenever the database is new
+os.environ.setdefault('SEED_ON_STARTUP', 'true')
+# Cold-start mode: load the knowledge base on the first chat request, not while
+# every cold start (including plain logins) waits
+os.environ.setdefault('VECTORSTORE_PRELOAD', 'false')
 
 # Import Flask - required dependency
 from flask import Flask
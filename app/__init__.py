@@ -1,7 +1,11 @@
 from flask import Flask, request, Response, redirect, jsonify
 from flask_cors import CORS
 from app.config import Config
-from app.database import db, init_db
+from app.bundle import BASE_URL_PLACEHOLDER, bundled_openapi_spec, install_bundle
+from app.database import db, configure_engine, engine_options, init_db
+from app.cli import register_commands
+from app.utils.passwords import configure_password_hashing
+from app.utils.query_stats import install_query_stats
 from app.utils.openapi_spec import get_openapi_spec
 
 # Make flasgger optional - it requires building from source which fails on Vercel
@@ -19,7 +23,13 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
     
     # Initialize extensions
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
     db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, app.config)
+        if app.config['QUERY_STATS_ENABLED']:
+            install_query_stats(app, db.engine)
+    configure_password_hashing(app.config)
     # Enable CORS - explicitly allow frontend origins
     allowed_origins = [
         "https://informityxapp.vercel.app",
@@ -33,14 +43,19 @@ def create_app(config_class=Config):
              "origins": allowed_origins,
              "methods": ["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
              "allow_headers": ["Content-Type", "Authorization", "X-Requested-With"],
+             "expose_headers": ["X-Next-Cursor"],
              "supports_credentials": True
          }})
     
     # Register blueprints first (needed for Swagger to discover routes)
-    from app.api import auth as auth_bp, hr as hr_bp, autosphere as autosphere_bp
+    from app.api import auth as auth_bp, hr as hr_bp, autosphere as autosphere_bp, admin as admin_bp
     app.register_blueprint(auth_bp.bp, url_prefix='/api/auth')
     app.register_blueprint(hr_bp.bp, url_prefix='/api/hr')
     app.register_blueprint(autosphere_bp.bp, url_prefix='/api/autosphere')
+    app.register_blueprint(admin_bp.bp, url_prefix='/api/admin')
+    
+    # Register maintenance CLI commands (flask --app run compress-text, ...)
+    register_commands(app)
     
     # Initialize Swagger after blueprints are registered (optional)
     if FLASGGER_AVAILABLE and Swagger is not None:
@@ -88,6 +103,10 @@ def create_app(config_class=Config):
                 {
                     "name": "AutoSphere Motors",
                     "description": "AutoSphere Motors AI Assistant endpoints"
+                },
+                {
+                    "name": "Admin",
+                    "description": "Operational endpoints (HR Manager only)"
                 }
             ]
         }
@@ -110,6 +129,10 @@ def create_app(config_class=Config):
             else:
                 scheme = 'http'
             base_url = f"{scheme}://{request.host}"
+            # Pre-serialized spec from the deploy bundle - no per-request build/serialization
+            bundled = bundled_openapi_spec()
+            if bundled:
+                return Response(bundled.replace(BASE_URL_PLACEHOLDER, base_url), mimetype='application/json')
             spec = get_openapi_spec(base_url)
             return jsonify(spec)
         
@@ -200,6 +223,9 @@ def create_app(config_class=Config):
     # On Vercel, database initialization might fail due to file system limitations
     try:
         with app.app_context():
+            # Fresh instance: start from the pre-built database so init_db has nothing to do
+            if db.engine.dialect.name == 'sqlite' and db.engine.url.database not in (None, '', ':memory:'):
+                install_bundle(db.engine.url.database)
             init_db()
     except Exception as e:
         # Log error but don't fail app creation
@@ -207,4 +233,15 @@ def create_app(config_class=Config):
         print(f"Warning: Database initialization failed: {e}")
         print(f"This is expected on Vercel if using SQLite. Consider using a managed database.")
     
+    # Warm the shared vectorstore once per process (once per master with gunicorn --preload)
+    if app.config.get('VECTORSTORE_PRELOAD'):
+        from app.utils.vectorstore import preload_vectorstore
+        preload_vectorstore()
+    
+    # Close the connections opened above, so workers forked from this process
+    # (gunicorn preload_app) each open their own instead of sharing the parent's
+    with app.app_context():
+        if db.engine.url.database not in (None, '', ':memory:'):
+            db.engine.dispose()
+    
     return app
@@ -0,0 +1,151 @@
+from flask import Blueprint, request
+from pydantic import ValidationError
+from app.middleware.auth import require_auth, require_role
+from app.schemas.admin import QueryStatsParams
+from app.utils.query_stats import get_query_stats, reset_query_stats
+from app.utils.response import success_response, validation_error_response
+
+bp = Blueprint('admin', __name__)
+
+
+@bp.route('/query-stats', methods=['GET'])
+@require_auth
+@require_role('HR Manager')
+def query_stats():
+    """
+    Database Query Stats
+    Per-endpoint query counts and database time for this worker process, the
+    repository methods behind them, recent slow queries and possible N+1 patterns (HR Manager only)
+    ---
+    tags:
+      - Admin
+    produces:
+      - application/json
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: top_callers
+        type: integer
+        required: false
+        default: 10
+        maximum: 100
+        description: Repository methods listed per endpoint, slowest first
+    responses:
+      200:
+        description: Query stats retrieved
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            message:
+              type: string
+              example: Query stats retrieved
+            data:
+              type: object
+              properties:
+                settings:
+                  type: object
+                  properties:
+                    slow_query_ms:
+                      type: number
+                      example: 200
+                    n_plus_one_threshold:
+                      type: integer
+                      example: 10
+                endpoints:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      endpoint:
+                        type: string
+                        example: autosphere.search_bookings
+                      requests:
+                        type: integer
+                        example: 120
+                      queries:
+                        type: integer
+                        example: 240
+                      total_ms:
+                        type: number
+                        example: 310.5
+                      avg_queries_per_request:
+                        type: number
+                        example: 2.0
+                      avg_ms_per_request:
+                        type: number
+                        example: 2.59
+                      max_queries_per_request:
+                        type: integer
+                        example: 2
+                      slow_queries:
+                        type: integer
+                        example: 0
+                      n_plus_one:
+                        type: integer
+                        example: 0
+                      callers:
+                        type: array
+                        items:
+                          type: object
+                          properties:
+                            caller:
+                              type: string
+                              example: BookingRepository.search
+                            queries:
+                              type: integer
+                              example: 240
+                            total_ms:
+                              type: number
+                              example: 310.5
+                slow_queries:
+                  type: array
+                  items:
+                    type: object
+                n_plus_one:
+                  type: array
+                  items:
+                    type: object
+      401:
+        description: Unauthorized
+      403:
+        description: Forbidden (HR Manager role required)
+      422:
+        description: Validation error
+    """
+    try:
+        params = QueryStatsParams(**request.args.to_dict())
+    except ValidationError as e:
+        errors = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+        return validation_error_response(errors)
+    
+    return success_response(data=get_query_stats(params.top_callers), message="Query stats retrieved")
+
+
+@bp.route('/query-stats', methods=['DELETE'])
+@require_auth
+@require_role('HR Manager')
+def clear_query_stats():
+    """
+    Reset Database Query Stats
+    Clear this worker's query counters, slow query log and N+1 reports (HR Manager only)
+    ---
+    tags:
+      - Admin
+    produces:
+      - application/json
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Query stats reset
+      401:
+        description: Unauthorized
+      403:
+        description: Forbidden (HR Manager role required)
+    """
+    reset_query_stats()
+    return success_response(message="Query stats reset")
@@ -1,13 +1,19 @@
-from flask import Blueprint, request
+import json
+from datetime import datetime
+from flask import Blueprint, Response, request, g, stream_with_context
 from pydantic import ValidationError
 from app.middleware.auth import require_auth
 from app.services.autosphere_service import AutoSphereService
+from app.repositories.booking_capacity_repository import CapacityExceededError
 from app.utils.response import success_response, error_response, validation_error_response
-from app.schemas.booking import BookingCreate, BookingResponse, BookingSearchParams
+from app.utils.lazy import lazy_instance
+from app.utils.vectorstore import is_vectorstore_ready
+from app.schemas.booking import BookingCreate, BookingResponse, BookingSearchParams, BookingExportParams, BookingAnalyticsParams, AvailabilityParams
 from app.schemas.chat import ChatRequest, ChatResponse
 
 bp = Blueprint('autosphere', __name__)
-autosphere_service = AutoSphereService()
+# Built on the first request that needs it, not at import
+autosphere_service = lazy_instance(AutoSphereService)
 
 
 @bp.route('/chat', methods=['POST'])
@@ -16,6 +22,7 @@ def chat():
     """
     AI Assistant Chat
     Chat with AutoSphere AI assistant. Supports intent classification and booking flow.
+    Conversation context is kept server-side; send back the returned session_id.
     ---
     tags:
       - AutoSphere Motors
@@ -37,8 +44,12 @@ def chat():
             message:
               type: string
               example: What services do you offer?
+            session_id:
+              type: string
+              description: Session ID from a previous response
             chat_history:
               type: array
+              description: Only used to seed a new session
               items:
                 type: object
                 properties:
@@ -72,6 +83,9 @@ def chat():
                 booking_flow:
                   type: boolean
                   example: false
+                session_id:
+                  type: string
+                  example: 3f2b9c0e8d7a4b6f9e1c2d3a4b5c6d7e
       401:
         description: Unauthorized
       422:
@@ -94,12 +108,18 @@ def chat():
                 for msg in chat_data.chat_history
             ]
         
-        result = autosphere_service.chat(chat_data.message, chat_history)
+        result = autosphere_service.chat(
+            chat_data.message,
+            chat_history,
+            session_id=chat_data.session_id,
+            user_id=g.user_id
+        )
         
         response_data = ChatResponse(
             response=result['response'],
             intent=result.get('intent'),
-            booking_flow=result.get('booking_flow')
+            booking_flow=result.get('booking_flow'),
+            session_id=result.get('session_id')
         )
         
         return success_response(data=response_data.dict(), message="Chat response generated")
@@ -152,6 +172,9 @@ def create_booking():
               type: string
               format: date
               example: "2024-12-25"
+            location:
+              type: string
+              description: Branch (default - main site)
             natural_language:
               type: string
               example: "I want to book a service for my Toyota Camry on December 25th"
@@ -186,12 +209,16 @@ def create_booking():
                   type: string
                 preferred_date:
                   type: string
+                location:
+                  type: string
                 created_at:
                   type: string
       400:
         description: Bad request
       401:
         description: Unauthorized
+      409:
+        description: No slots left for the booking type on the preferred date
       422:
         description: Validation error
       500:
@@ -216,7 +243,8 @@ def create_booking():
                 name=extracted.get("Name", ""),
                 phone=extracted.get("Phone", ""),
                 vehicle_model=extracted.get("Vehicle Model", ""),
-                preferred_date=extracted.get("Preferred Date")
+                preferred_date=extracted.get("Preferred Date"),
+                location=booking_data.location
             )
         else:
             # Use structured fields
@@ -225,7 +253,8 @@ def create_booking():
                 name=booking_data.name,
                 phone=booking_data.phone,
                 vehicle_model=booking_data.vehicle_model,
-                preferred_date=booking_data.preferred_date.isoformat() if booking_data.preferred_date else None
+                preferred_date=booking_data.preferred_date.isoformat() if booking_data.preferred_date else None,
+                location=booking_data.location
             )
         
         return success_response(
@@ -233,16 +262,107 @@ def create_booking():
             message=f"{booking_data.booking_type} booking confirmed! Booking ID: {booking['booking_id']}"
         )
     
+    except CapacityExceededError as e:
+        return error_response(f"{str(e)}. Please choose another date.", status_code=409)
+    except ValueError as e:
+        return error_response(str(e), status_code=400)
     except Exception as e:
         return error_response(f"Error creating booking: {str(e)}", status_code=500)
 
 
+@bp.route('/bookings/import', methods=['POST'])
+@require_auth
+def import_bookings():
+    """
+    Import Bookings
+    Bulk import bookings from a CSV or XLSX file. The first row is the header:
+    booking_type, name, phone, vehicle_model, preferred_date (or "Booking Type",
+    "Vehicle Model", ...). Valid rows are saved even when others fail; failed rows
+    are listed with their spreadsheet row number.
+    ---
+    tags:
+      - AutoSphere Motors
+    consumes:
+      - multipart/form-data
+    produces:
+      - application/json
+    security:
+      - Bearer: []
+    parameters:
+      - in: formData
+        name: file
+        type: file
+        required: true
+        description: CSV or XLSX file of bookings
+    responses:
+      200:
+        description: Import finished (check failed/errors for rejected rows)
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            message:
+              type: string
+              example: Imported 998 booking(s), 2 row(s) failed
+            data:
+              type: object
+              properties:
+                imported:
+                  type: integer
+                failed:
+                  type: integer
+                booking_ids:
+                  type: array
+                  items:
+                    type: string
+                errors:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      row:
+                        type: integer
+                        example: 7
+                      errors:
+                        type: array
+                        items:
+                          type: string
+                          example: "phone: Field required"
+      400:
+        description: Missing, empty or unsupported file
+      401:
+        description: Unauthorized
+      500:
+        description: Server error
+    """
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return error_response("A CSV or XLSX file is required", status_code=400)
+    
+    try:
+        result = autosphere_service.import_bookings(file)
+        return success_response(
+            data=result,
+            message=f"Imported {result['imported']} booking(s), {result['failed']} row(s) failed"
+        )
+    
+    except ValueError as e:
+        return error_response(str(e), status_code=400)
+    except Exception as e:
+        return error_response(f"Error importing bookings: {str(e)}", status_code=500)
+
+
 @bp.route('/bookings', methods=['GET'])
 @require_auth
 def search_bookings():
     """
     Search Bookings
-    Search bookings by booking ID, phone number, or booking type
+    Search bookings by booking ID, phone number, or booking type.
+    Results are paginated newest first; when more exist the X-Next-Cursor header holds
+    the cursor for the next page. Use stream=ndjson|json to stream every match instead.
+    name/vehicle_model do a typo-tolerant search and return one page, best match first.
     ---
     tags:
       - AutoSphere Motors
@@ -261,17 +381,53 @@ def search_bookings():
         name: phone
         type: string
         required: false
-        description: Search by phone number
+        description: Search by phone number (matched on its last 9 digits, so any format works; must contain a digit)
         example: +1234567890
+      - in: query
+        name: phone_suffix
+        type: string
+        required: false
+        description: Search by the last 4-15 digits of the phone number
+        example: "2000"
       - in: query
         name: booking_type
         type: string
         enum: [Service, Test Drive]
         required: false
         description: Filter by booking type
+      - in: query
+        name: name
+        type: string
+        required: false
+        description: Fuzzy search by customer name (partial or misspelt, e.g. "jon smth")
+      - in: query
+        name: vehicle_model
+        type: string
+        required: false
+        description: Fuzzy search by vehicle model (e.g. "camry")
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: Page size (default 50, max 500)
+      - in: query
+        name: cursor
+        type: string
+        required: false
+        description: X-Next-Cursor value from the previous page
+      - in: query
+        name: stream
+        type: string
+        enum: [ndjson, json]
+        required: false
+        description: Stream all matches as NDJSON lines or a bare JSON array
     responses:
       200:
         description: Bookings found
+        headers:
+          X-Next-Cursor:
+            type: string
+            description: Cursor for the next page (absent on the last page)
         schema:
           type: object
           properties:
@@ -302,29 +458,162 @@ def search_bookings():
                     type: string
                   created_at:
                     type: string
+      400:
+        description: Invalid cursor, or cursor/stream combined with a fuzzy search
       401:
         description: Unauthorized
+      422:
+        description: Validation error
       500:
         description: Server error
     """
     try:
-        # Get query parameters
-        booking_id = request.args.get('booking_id')
-        phone = request.args.get('phone')
-        booking_type = request.args.get('booking_type')
+        params = BookingSearchParams(**request.args.to_dict())
+    except ValidationError as e:
+        errors = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+        return validation_error_response(errors)
+    
+    if params.stream and (params.name or params.vehicle_model):
+        return error_response("Fuzzy name/vehicle_model search cannot be streamed", status_code=400)
+    
+    try:
+        if params.stream:
+            rows = autosphere_service.stream_bookings(
+                booking_id=params.booking_id,
+                phone=params.phone,
+                booking_type=params.booking_type,
+                phone_suffix=params.phone_suffix
+            )
+            if params.stream == 'ndjson':
+                body = (json.dumps(row) + "\n" for row in rows)
+                mimetype = 'application/x-ndjson'
+            else:
+                body = _json_array(rows)
+                mimetype = 'application/json'
+            return Response(stream_with_context(body), mimetype=mimetype)
         
-        bookings = autosphere_service.search_bookings(
-            booking_id=booking_id,
-            phone=phone,
-            booking_type=booking_type
+        result = autosphere_service.search_bookings(
+            booking_id=params.booking_id,
+            phone=params.phone,
+            booking_type=params.booking_type,
+            limit=params.limit,
+            cursor=params.cursor,
+            phone_suffix=params.phone_suffix,
+            name=params.name,
+            vehicle_model=params.vehicle_model
         )
+        bookings = result['bookings']
         
-        return success_response(data=bookings, message=f"Found {len(bookings)} booking(s)")
+        response, status_code = success_response(data=bookings, message=f"Found {len(bookings)} booking(s)")
+        if result['next_cursor']:
+            response.headers['X-Next-Cursor'] = result['next_cursor']
+        return response, status_code
     
+    except ValueError as e:
+        return error_response(str(e), status_code=400)
     except Exception as e:
         return error_response(f"Error searching bookings: {str(e)}", status_code=500)
 
 
+def _json_array(rows):
+    """Stream an iterable of dicts as a single JSON array"""
+    yield "["
+    for i, row in enumerate(rows):
+        yield ("," if i else "") + json.dumps(row)
+    yield "]"
+
+
+@bp.route('/bookings/export', methods=['GET'])
+@require_auth
+def export_bookings():
+    """
+    Export Bookings
+    Download bookings as CSV, Parquet or an Arrow IPC stream. The file is streamed
+    in batches, so any number of bookings can be exported with constant memory.
+    Parquet and Arrow require the optional pyarrow package.
+    ---
+    tags:
+      - AutoSphere Motors
+    produces:
+      - text/csv
+      - application/vnd.apache.parquet
+      - application/vnd.apache.arrow.stream
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: format
+        type: string
+        enum: [csv, parquet, arrow]
+        default: csv
+        required: false
+        description: File format
+      - in: query
+        name: booking_type
+        type: string
+        enum: [Service, Test Drive]
+        required: false
+        description: Filter by booking type
+      - in: query
+        name: date_from
+        type: string
+        format: date
+        required: false
+        description: First day to include (inclusive)
+        example: "2024-12-01"
+      - in: query
+        name: date_to
+        type: string
+        format: date
+        required: false
+        description: Last day to include (inclusive)
+        example: "2024-12-31"
+      - in: query
+        name: date_field
+        type: string
+        enum: [created_at, preferred_date]
+        default: created_at
+        required: false
+        description: Date the range applies to
+    responses:
+      200:
+        description: Export file (Content-Disposition attachment)
+      400:
+        description: Format not available (pyarrow not installed)
+      401:
+        description: Unauthorized
+      422:
+        description: Validation error
+      500:
+        description: Server error
+    """
+    try:
+        params = BookingExportParams(**request.args.to_dict())
+    except ValidationError as e:
+        errors = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+        return validation_error_response(errors)
+    
+    try:
+        chunks, mimetype, extension = autosphere_service.export_bookings(
+            format=params.format,
+            booking_type=params.booking_type,
+            date_from=params.date_from,
+            date_to=params.date_to,
+            date_field=params.date_field
+        )
+        filename = f"bookings-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{extension}"
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    
+    except ValueError as e:
+        return error_response(str(e), status_code=400)
+    except Exception as e:
+        return error_response(f"Error exporting bookings: {str(e)}", status_code=500)
+
+
 @bp.route('/bookings/<booking_id>', methods=['GET'])
 @require_auth
 def get_booking(booking_id: str):
@@ -393,3 +682,341 @@ def get_booking(booking_id: str):
     
     except Exception as e:
         return error_response(f"Error retrieving booking: {str(e)}", status_code=500)
+
+
+@bp.route('/analytics/bookings', methods=['GET'])
+@require_auth
+def booking_analytics():
+    """
+    Booking Analytics
+    Bookings per day (UTC, by created_at) with the average lead time in days from booking
+    to preferred date. Served from a rollup table, so cost grows with the number of days,
+    not bookings.
+    ---
+    tags:
+      - AutoSphere Motors
+    produces:
+      - application/json
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: date_from
+        type: string
+        format: date
+        required: false
+        description: First day (inclusive, default 30 days before date_to)
+      - in: query
+        name: date_to
+        type: string
+        format: date
+        required: false
+        description: Last day (inclusive, default today)
+      - in: query
+        name: booking_type
+        type: string
+        enum: [Service, Test Drive]
+        required: false
+        description: Filter by booking type
+      - in: query
+        name: vehicle_model
+        type: string
+        required: false
+        description: Filter by vehicle model (exact)
+      - in: query
+        name: group_by
+        type: string
+        enum: [total, booking_type, vehicle_model, booking_type_vehicle_model]
+        default: total
+        required: false
+        description: Split each day by booking type and/or vehicle model
+    responses:
+      200:
+        description: Time series retrieved
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            message:
+              type: string
+              example: Booking analytics retrieved
+            data:
+              type: object
+              properties:
+                date_from:
+                  type: string
+                date_to:
+                  type: string
+                group_by:
+                  type: string
+                total_bookings:
+                  type: integer
+                series:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      day:
+                        type: string
+                        example: "2024-12-01"
+                      booking_type:
+                        type: string
+                      vehicle_model:
+                        type: string
+                      bookings:
+                        type: integer
+                        example: 42
+                      avg_lead_time_days:
+                        type: number
+                        example: 6.5
+      400:
+        description: date_from is after date_to
+      401:
+        description: Unauthorized
+      422:
+        description: Validation error
+      500:
+        description: Server error
+    """
+    try:
+        params = BookingAnalyticsParams(**request.args.to_dict())
+    except ValidationError as e:
+        errors = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+        return validation_error_response(errors)
+    
+    try:
+        result = autosphere_service.booking_analytics(
+            date_from=params.date_from,
+            date_to=params.date_to,
+            booking_type=params.booking_type,
+            vehicle_model=params.vehicle_model,
+            group_by=params.group_by
+        )
+        return success_response(data=result, message="Booking analytics retrieved")
+    
+    except ValueError as e:
+        return error_response(str(e), status_code=400)
+    except Exception as e:
+        return error_response(f"Error retrieving booking analytics: {str(e)}", status_code=500)
+
+
+@bp.route('/ready', methods=['GET'])
+def readiness():
+    """
+    Readiness Check
+    Report whether the AutoSphere knowledge base is loaded and warm
+    ---
+    tags:
+      - AutoSphere Motors
+    produces:
+      - application/json
+    responses:
+      200:
+        description: Knowledge base is warm
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            message:
+              type: string
+              example: Ready
+            data:
+              type: object
+              properties:
+                vectorstore:
+                  type: boolean
+                  example: true
+      503:
+        description: Knowledge base is still loading
+    """
+    if not is_vectorstore_ready():
+        return error_response("Vectorstore is not loaded yet", status_code=503)
+    
+    return success_response(data={"vectorstore": True}, message="Ready")
+
+
+@bp.route('/metrics', methods=['GET'])
+@require_auth
+def get_metrics():
+    """
+    AutoSphere Metrics
+    Per-process counters, e.g. how often booking details were extracted locally vs. by the LLM
+    and the booking lookup cache hit rate
+    ---
+    tags:
+      - AutoSphere Motors
+    produces:
+      - application/json
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Metrics retrieved
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            message:
+              type: string
+              example: Metrics retrieved
+            data:
+              type: object
+              properties:
+                booking_extraction:
+                  type: object
+                  properties:
+                    local:
+                      type: integer
+                      example: 95
+                    llm:
+                      type: integer
+                      example: 5
+                    local_hit_rate:
+                      type: number
+                      example: 0.95
+                booking_cache:
+                  type: object
+                  properties:
+                    size:
+                      type: integer
+                      example: 420
+                    max_size:
+                      type: integer
+                      example: 10000
+                    ttl_seconds:
+                      type: number
+                      example: 30
+                    hits:
+                      type: integer
+                      example: 9500
+                    misses:
+                      type: integer
+                      example: 500
+                    hit_rate:
+                      type: number
+                      example: 0.95
+                    evictions:
+                      type: integer
+                      example: 0
+                    invalidations:
+                      type: integer
+                      example: 12
+      401:
+        description: Unauthorized
+    """
+    return success_response(data=autosphere_service.get_metrics(), message="Metrics retrieved")
+
+
+@bp.route('/availability', methods=['GET'])
+@require_auth
+def booking_availability():
+    """
+    Booking Availability
+    Open service and test drive slots per day, read from the per-date capacity
+    counters in one range query. Days without bookings show the default capacity.
+    ---
+    tags:
+      - AutoSphere Motors
+    produces:
+      - application/json
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: date_from
+        type: string
+        format: date
+        required: false
+        description: First day (inclusive, default today)
+      - in: query
+        name: date_to
+        type: string
+        format: date
+        required: false
+        description: Last day (inclusive, default 13 days after date_from)
+      - in: query
+        name: booking_type
+        type: string
+        enum: [Service, Test Drive]
+        required: false
+        description: Only this booking type
+      - in: query
+        name: location
+        type: string
+        required: false
+        description: Branch (default - main site)
+    responses:
+      200:
+        description: Availability retrieved
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            message:
+              type: string
+              example: Availability retrieved
+            data:
+              type: object
+              properties:
+                date_from:
+                  type: string
+                date_to:
+                  type: string
+                location:
+                  type: string
+                days:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      date:
+                        type: string
+                        example: "2024-12-25"
+                      booking_type:
+                        type: string
+                        example: Service
+                      capacity:
+                        type: integer
+                        example: 20
+                      reserved:
+                        type: integer
+                        example: 18
+                      available:
+                        type: integer
+                        example: 2
+      400:
+        description: Invalid or too long date range
+      401:
+        description: Unauthorized
+      422:
+        description: Validation error
+      500:
+        description: Server error
+    """
+    try:
+        params = AvailabilityParams(**request.args.to_dict())
+    except ValidationError as e:
+        errors = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+        return validation_error_response(errors)
+    
+    try:
+        result = autosphere_service.availability(
+            date_from=params.date_from,
+            date_to=params.date_to,
+            booking_type=params.booking_type,
+            location=params.location
+        )
+        return success_response(data=result, message="Availability retrieved")
+    
+    except ValueError as e:
+        return error_response(str(e), status_code=400)
+    except Exception as e:
+        return error_response(f"Error retrieving availability: {str(e)}", status_code=500)
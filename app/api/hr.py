@@ -3,15 +3,17 @@ from pydantic import ValidationError
 from app.middleware.auth import require_auth, require_role
 from app.services.hr_service import HRService
 from app.utils.response import success_response, error_response, validation_error_response
+from app.utils.lazy import lazy_instance
 from app.schemas.cv_evaluation import CVEvaluationRequest, CVEvaluationResponse
-from app.schemas.policy import PolicyUploadRequest, PolicyQuestionRequest, PolicyQuestionResponse
+from app.schemas.policy import PolicyUploadRequest, PolicyListParams, PolicyQuestionRequest, PolicyQuestionResponse
 from app.schemas.technical import (
     TechnicalQuestionGenerateRequest, TechnicalQuestionResponse,
     TechnicalAnswerEvaluateRequest, TechnicalAnswerEvaluateResponse
 )
 
 bp = Blueprint('hr', __name__)
-hr_service = HRService()
+# Built on the first request that needs it, not at import
+hr_service = lazy_instance(HRService)
 
 
 @bp.route('/cv/evaluate', methods=['POST'])
@@ -189,6 +191,73 @@ def upload_policies():
         return error_response(f"Error uploading policies: {str(e)}", status_code=500)
 
 
+@bp.route('/policy', methods=['GET'])
+@require_auth
+def list_policies():
+    """
+    List Policy Documents
+    Most recently uploaded policy documents (metadata only, newest first)
+    ---
+    tags:
+      - HR AI Platform
+    produces:
+      - application/json
+    security:
+      - Bearer: []
+    parameters:
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        default: 50
+        maximum: 500
+        description: Number of policies to return
+    responses:
+      200:
+        description: Policies retrieved
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            message:
+              type: string
+              example: Found 3 policy document(s)
+            data:
+              type: array
+              items:
+                type: object
+                properties:
+                  id:
+                    type: integer
+                  filename:
+                    type: string
+                  uploaded_at:
+                    type: string
+                  uploaded_by:
+                    type: integer
+      401:
+        description: Unauthorized
+      422:
+        description: Validation error
+      500:
+        description: Server error
+    """
+    try:
+        params = PolicyListParams(**request.args.to_dict())
+    except ValidationError as e:
+        errors = [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]
+        return validation_error_response(errors)
+    
+    try:
+        policies = hr_service.list_policies(limit=params.limit)
+        return success_response(data=policies, message=f"Found {len(policies)} policy document(s)")
+    
+    except Exception as e:
+        return error_response(f"Error listing policies: {str(e)}", status_code=500)
+
+
 @bp.route('/policy/ask', methods=['POST'])
 @require_auth
 def ask_policy_question():
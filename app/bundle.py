@@ -0,0 +1,191 @@
+"""
+Pre-built deployment bundle for serverless cold starts.
+
+`python scripts/build_bundle.py` writes DEPLOY_BUNDLE_DIR with:
+  manifest.json   version, schema fingerprint, row counts and a sha256 per file
+  hr_demo.db      seeded SQLite snapshot (schema marker set, rollups built)
+  vectorstore/    verified FAISS index + docstore
+  openapi.json    serialized OpenAPI spec (base URL filled in per request)
+  text_dicts/     trained text compression dictionaries and the CURRENT id, so
+                  compressed rows can be read on hosts that never trained them
+
+At startup install_bundle copies the snapshot into place when the configured
+SQLite file does not exist yet (e.g. /tmp on a fresh Vercel instance), so
+init_db finds a current schema and seeding never runs. The FAISS index is
+memory-mapped straight from the bundle and the spec is served as stored text,
+so cold-start time does not depend on how much seed data there is.
+"""
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional
+from app.config import Config
+
+MANIFEST = 'manifest.json'
+DATABASE_FILE = 'hr_demo.db'
+VECTORSTORE_DIR = 'vectorstore'
+OPENAPI_FILE = 'openapi.json'
+TEXT_DICTS_DIR = 'text_dicts'
+# Stored in openapi.json instead of the server URL, which is only known per request
+BASE_URL_PLACEHOLDER = '{{BASE_URL}}'
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def load_manifest(bundle_dir: Optional[str] = None) -> Optional[Dict]:
+    """
+    The bundle manifest, or None when there is no usable bundle. Files are checked
+    by size only (cheap); build_bundle verified their contents.
+    """
+    bundle_dir = bundle_dir or Config.DEPLOY_BUNDLE_DIR
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    for name, info in manifest['files'].items():
+        path = os.path.join(bundle_dir, name)
+        if not os.path.exists(path) or os.path.getsize(path) != info['bytes']:
+            print(f"Warning: Deploy bundle {manifest['version']} is incomplete ({name}); ignoring it")
+            return None
+    manifest['dir'] = bundle_dir
+    return manifest
+
+
+def bundle_path(name: str) -> Optional[str]:
+    """Path of a file/directory shipped in the deploy bundle, or None"""
+    manifest = load_manifest()
+    if not manifest:
+        return None
+    path = os.path.join(manifest['dir'], name)
+    return path if os.path.exists(path) else None
+
+
+def bundled_openapi_spec() -> Optional[str]:
+    """The pre-serialized OpenAPI spec (with BASE_URL_PLACEHOLDER), or None"""
+    path = bundle_path(OPENAPI_FILE)
+    if not path:
+        return None
+    return _read_text(path)
+
+
+@lru_cache(maxsize=1)
+def _read_text(path: str) -> str:
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def install_bundle(database_path: Optional[str]) -> bool:
+    """
+    Copy the bundled SQLite snapshot to database_path if that file does not exist.
+    The copy goes to a temporary name first, so concurrent workers never open a
+    half-written file. Returns True if the snapshot was installed.
+    """
+    manifest = load_manifest()
+    if not manifest or not database_path or os.path.exists(database_path):
+        return False
+    source = os.path.join(manifest['dir'], DATABASE_FILE)
+    if DATABASE_FILE not in manifest['files']:
+        return False
+    
+    directory = os.path.dirname(os.path.abspath(database_path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{database_path}.{os.getpid()}.tmp"
+    shutil.copyfile(source, temp_path)
+    os.replace(temp_path, database_path)
+    
+    from app.database import schema_fingerprint
+    if manifest['schema_fingerprint'] != schema_fingerprint():
+        print(f"Warning: Deploy bundle {manifest['version']} predates the current models; "
+              "init_db will upgrade it - rebuild the bundle")
+    return True
+
+
+def _verify_vectorstore(path: str) -> int:
+    """Open the FAISS index like the app does and check it matches its docstore. Returns vector count."""
+    import pickle
+    import faiss
+    
+    index = faiss.read_index(os.path.join(path, 'index.faiss'), faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+    with open(os.path.join(path, 'index.pkl'), 'rb') as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    if index.ntotal != len(index_to_docstore_id):
+        raise ValueError(f"FAISS index has {index.ntotal} vectors but {len(index_to_docstore_id)} docstore ids")
+    missing = [doc_id for doc_id in index_to_docstore_id.values() if doc_id not in docstore._dict]
+    if missing:
+        raise ValueError(f"{len(missing)} docstore entries missing from the vectorstore")
+    return index.ntotal
+
+
+def build_bundle(output_dir: str, database_path: str, vectorstore_path: Optional[str]) -> Dict:
+    """
+    Write the bundle from an initialised, seeded database and a saved vectorstore.
+    Must run in an app context bound to database_path. Returns the manifest.
+    """
+    from app.database import db, schema_fingerprint
+    from app.models import Booking, User
+    from app.utils.openapi_spec import get_openapi_spec
+    from app.utils.compression import CURRENT_FILE
+    
+    os.makedirs(output_dir, exist_ok=True)
+    counts = {'users': User.query.count(), 'bookings': Booking.query.count()}
+    
+    # A single self-contained file: fold any WAL back in and compact it
+    db.session.remove()
+    with db.engine.connect() as conn:
+        if db.engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+            conn.exec_driver_sql('VACUUM')
+    db.engine.dispose()
+    shutil.copyfile(database_path, os.path.join(output_dir, DATABASE_FILE))
+    
+    vectors = None
+    target = os.path.join(output_dir, VECTORSTORE_DIR)
+    shutil.rmtree(target, ignore_errors=True)
+    if vectorstore_path:
+        vectors = _verify_vectorstore(vectorstore_path)
+        os.makedirs(target)
+        for name in ('index.faiss', 'index.pkl'):
+            shutil.copyfile(os.path.join(vectorstore_path, name), os.path.join(target, name))
+    
+    target = os.path.join(output_dir, TEXT_DICTS_DIR)
+    shutil.rmtree(target, ignore_errors=True)
+    if os.path.isdir(Config.TEXT_COMPRESSION_DICT_DIR):
+        for name in os.listdir(Config.TEXT_COMPRESSION_DICT_DIR):
+            if name.endswith('.dict') or name == CURRENT_FILE:
+                os.makedirs(target, exist_ok=True)
+                shutil.copyfile(os.path.join(Config.TEXT_COMPRESSION_DICT_DIR, name), os.path.join(target, name))
+    
+    with open(os.path.join(output_dir, OPENAPI_FILE), 'w', encoding='utf-8') as f:
+        json.dump(get_openapi_spec(BASE_URL_PLACEHOLDER), f, sort_keys=True, separators=(',', ':'))
+    
+    files = {}
+    for root, _, names in os.walk(output_dir):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, output_dir).replace(os.sep, '/')
+            if relative != MANIFEST:
+                files[relative] = {'bytes': os.path.getsize(path), 'sha256': _sha256(path)}
+    version = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()[:12]
+    manifest = {
+        'version': version,
+        'built_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'schema_fingerprint': schema_fingerprint(),
+        'counts': counts,
+        'vectors': vectors,
+        'files': files,
+    }
+    with open(os.path.join(output_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    load_manifest.cache_clear()
+    return manifest
@@ -0,0 +1,103 @@
+import os
+import click
+from flask import Flask
+from app.database import db
+
+
+def register_commands(app: Flask):
+    """Register maintenance commands on the Flask CLI"""
+    
+    @app.cli.command('seed')
+    @click.option('--users', 'users_path', type=click.Path(dir_okay=False), default=None,
+                  help='Users workbook (default: users.xlsx)')
+    @click.option('--bookings', 'bookings_path', type=click.Path(dir_okay=False), default=None,
+                  help='Bookings workbook (default: bookings.xlsx)')
+    @click.option('--batch-size', default=1000, show_default=True)
+    @click.option('--workers', type=int, default=None, help='Password hashing processes (default: CPU count)')
+    def seed_command(users_path, bookings_path, batch_size, workers):
+        """Load users and bookings from Excel/CSV (existing usernames and booking IDs are skipped)"""
+        from app.seed import BOOKINGS_FILE, USERS_FILE, seed
+        
+        counts = seed(
+            users_path=users_path or USERS_FILE,
+            bookings_path=bookings_path or BOOKINGS_FILE,
+            batch_size=batch_size,
+            workers=workers or os.cpu_count()
+        )
+        click.echo(f"Seeded {counts['users']} user(s) and {counts['bookings']} booking(s)")
+    
+    @app.cli.command('compress-text')
+    @click.option('--train/--no-train', default=True, help='Train a new dictionary from existing documents first')
+    def compress_text_command(train):
+        """Compress stored policy document text (migrates existing rows)"""
+        from app.models.policy_document import PolicyDocument
+        from app.utils.compression import train_dictionary
+        
+        table = PolicyDocument.__table__
+        # CompressedText reads both legacy plain text and compressed rows
+        rows = db.session.execute(db.select(table.c.id, table.c.content)).all()
+        if not rows:
+            click.echo("No policy documents to compress")
+            return
+        
+        if train:
+            dict_id = train_dictionary([row.content for row in rows])
+            click.echo(f"Trained compression dictionary {dict_id:08x}")
+        
+        for row in rows:
+            db.session.execute(
+                db.update(table).where(table.c.id == row.id).values(content=row.content)
+            )
+        db.session.commit()
+        click.echo(f"Compressed {len(rows)} policy document(s)")
+    
+    @app.cli.command('backfill-phones')
+    @click.option('--batch-size', default=1000, show_default=True)
+    def backfill_phones_command(batch_size):
+        """Populate normalized phone lookup columns for existing bookings"""
+        from app.repositories.booking_repository import BookingRepository
+        
+        count = BookingRepository().backfill_phone_lookup_columns(batch_size=batch_size)
+        click.echo(f"Backfilled {count} booking(s)")
+    
+    @app.cli.command('rebuild-booking-stats')
+    def rebuild_booking_stats_command():
+        """Recompute the booking analytics rollup from the bookings table"""
+        from app.repositories.booking_stats_repository import BookingStatsRepository
+        
+        count = BookingStatsRepository().rebuild()
+        click.echo(f"Rebuilt booking analytics rollup ({count} rows)")
+    
+    @app.cli.command('rebuild-capacity')
+    @click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Only recount preferred dates from this day on')
+    def rebuild_capacity_command(since):
+        """Recount reserved booking slots from the bookings table"""
+        from app.repositories.booking_capacity_repository import BookingCapacityRepository
+        from app.services.autosphere_service import AutoSphereService
+        
+        count = BookingCapacityRepository().rebuild_reserved(
+            AutoSphereService.default_capacity, since=since.date() if since else None
+        )
+        click.echo(f"Rebuilt booking capacity counters ({count} rows)")
+    
+    @app.cli.command('set-capacity')
+    @click.argument('day', type=click.DateTime(formats=['%Y-%m-%d']))
+    @click.argument('booking_type')
+    @click.argument('capacity', type=click.IntRange(min=0))
+    @click.option('--until', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Apply to every day from DAY to this day (inclusive)')
+    @click.option('--location', default='', help='Branch (default: main site)')
+    def set_capacity_command(day, booking_type, capacity, until, location):
+        """Override the booking capacity for a date or date range (0 closes it)"""
+        from datetime import timedelta
+        from app.repositories.booking_capacity_repository import BookingCapacityRepository
+        
+        repo = BookingCapacityRepository()
+        current, last = day.date(), (until or day).date()
+        count = 0
+        while current <= last:
+            repo.set_capacity(current, booking_type, location, capacity)
+            current += timedelta(days=1)
+            count += 1
+        click.echo(f"Set {booking_type} capacity to {capacity} for {count} day(s)")
@@ -67,11 +67,41 @@ class Config:
     SQLALCHEMY_DATABASE_URI = _get_config_value('DATABASE_URL', 'sqlite:///hr_demo.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite connection pragmas - WAL lets readers run alongside one writer and, with
+    # synchronous=NORMAL, makes commits much cheaper; busy_timeout makes writers queue
+    # for the lock instead of failing with "database is locked"
+    SQLITE_JOURNAL_MODE = _get_config_value('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = _get_config_value('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(_get_config_value('SQLITE_BUSY_TIMEOUT_MS', '10000'))
+    SQLITE_CACHE_SIZE_KB = int(_get_config_value('SQLITE_CACHE_SIZE_KB', '32768'))
+    SQLITE_MMAP_SIZE_MB = int(_get_config_value('SQLITE_MMAP_SIZE_MB', '256'))
+    
+    # Connection pool (pre-ping/recycle only apply to server databases such as PostgreSQL)
+    DB_POOL_SIZE = int(_get_config_value('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(_get_config_value('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(_get_config_value('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(_get_config_value('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = _get_config_value('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    
+    # SQL instrumentation - per-endpoint query stats, slow query log, N+1 detection
+    QUERY_STATS_ENABLED = _get_config_value('QUERY_STATS_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_MS = float(_get_config_value('SLOW_QUERY_MS', '200'))
+    # Include bound parameters (password hashes, phones, names) in slow query logs
+    SLOW_QUERY_LOG_PARAMETERS = _get_config_value('SLOW_QUERY_LOG_PARAMETERS', 'false').lower() == 'true'
+    # Same statement this many times in one request is reported as a possible N+1
+    N_PLUS_ONE_THRESHOLD = int(_get_config_value('N_PLUS_ONE_THRESHOLD', '10'))
+    
     # JWT
     JWT_SECRET_KEY = _get_config_value('JWT_SECRET_KEY', os.urandom(32).hex())
     JWT_ALGORITHM = _get_config_value('JWT_ALGORITHM', 'HS256')
     JWT_EXPIRATION_HOURS = int(_get_config_value('JWT_EXPIRATION_HOURS', '24'))
     
+    # Password hashing - Werkzeug method string (scrypt:N:r:p or pbkdf2:digest:iterations).
+    # Stored hashes made with other parameters are re-hashed on the user's next login.
+    PASSWORD_HASH_METHOD = _get_config_value('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # Threads that hash/verify passwords off the request thread per process (0 = inline)
+    PASSWORD_HASH_THREADS = int(_get_config_value('PASSWORD_HASH_THREADS', '2'))
+    
     # OpenAI - reads from secrets.toml first, then environment variable
     OPENAI_API_KEY = _get_config_value('OPENAI_API_KEY')
     
@@ -82,3 +112,62 @@ class Config:
     # File upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp_uploads')
+    
+    # AutoSphere chat - 'single' classifies and answers in one LLM call, 'classic' uses two
+    CHAT_MODE = _get_config_value('CHAT_MODE', 'single')
+    
+    # Chat sessions - messages kept verbatim; older ones fold into an 'llm' or 'extractive' summary
+    CHAT_HISTORY_MESSAGES = int(_get_config_value('CHAT_HISTORY_MESSAGES', '6'))
+    CHAT_SUMMARY_MODE = _get_config_value('CHAT_SUMMARY_MODE', 'llm')
+    CHAT_SUMMARY_MAX_CHARS = int(_get_config_value('CHAT_SUMMARY_MAX_CHARS', '1500'))
+    
+    # AutoSphere knowledge base retriever - faiss (OpenAI embeddings) or bm25 (local)
+    RETRIEVER_BACKEND = _get_config_value('RETRIEVER_BACKEND', 'faiss')
+    
+    # Load the AutoSphere vectorstore in create_app (before gunicorn forks workers)
+    VECTORSTORE_PRELOAD = _get_config_value('VECTORSTORE_PRELOAD', 'true').lower() == 'true'
+    
+    # Query embedding cache - in-memory LRU size and optional SQLite file shared by workers
+    EMBEDDING_CACHE_SIZE = int(_get_config_value('EMBEDDING_CACHE_SIZE', '1024'))
+    EMBEDDING_CACHE_PATH = _get_config_value('EMBEDDING_CACHE_PATH', '')
+    
+    # Seed users/bookings from the Excel workbooks when a new database has no users
+    # (otherwise run `flask --app run seed` once)
+    SEED_ON_STARTUP = _get_config_value('SEED_ON_STARTUP', 'false').lower() == 'true'
+    
+    # Pre-built database/vectorstore/spec bundle (python scripts/build_bundle.py) used on cold start
+    DEPLOY_BUNDLE_DIR = _get_config_value(
+        'DEPLOY_BUNDLE_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'bundle')
+    )
+    
+    # Booking search - keyset page size (default/max) and rows fetched per batch when streaming
+    BOOKINGS_PAGE_SIZE = int(_get_config_value('BOOKINGS_PAGE_SIZE', '50'))
+    BOOKINGS_MAX_PAGE_SIZE = int(_get_config_value('BOOKINGS_MAX_PAGE_SIZE', '500'))
+    BOOKINGS_STREAM_BATCH_SIZE = int(_get_config_value('BOOKINGS_STREAM_BATCH_SIZE', '1000'))
+    # Distinct names/vehicle models taken from the trigram index per fuzzy search
+    BOOKINGS_FUZZY_CANDIDATES = int(_get_config_value('BOOKINGS_FUZZY_CANDIDATES', '200'))
+    # Rows per chunk (CSV) / row group (Parquet, Arrow) when exporting bookings
+    BOOKINGS_EXPORT_BATCH_SIZE = int(_get_config_value('BOOKINGS_EXPORT_BATCH_SIZE', '10000'))
+    # Rows per executemany/transaction when importing bookings from CSV/XLSX
+    BOOKINGS_IMPORT_BATCH_SIZE = int(_get_config_value('BOOKINGS_IMPORT_BATCH_SIZE', '5000'))
+    # Read-through cache for booking lookups by ID and by phone (per process; 0 disables)
+    BOOKING_CACHE_SIZE = int(_get_config_value('BOOKING_CACHE_SIZE', '10000'))
+    # Also the longest another worker's write can go unseen
+    BOOKING_CACHE_TTL_SECONDS = float(_get_config_value('BOOKING_CACHE_TTL_SECONDS', '30'))
+    # Bookings accepted per preferred date (and location) unless overridden with set-capacity
+    BOOKING_CAPACITY_SERVICE = int(_get_config_value('BOOKING_CAPACITY_SERVICE', '20'))
+    BOOKING_CAPACITY_TEST_DRIVE = int(_get_config_value('BOOKING_CAPACITY_TEST_DRIVE', '10'))
+    BOOKING_CAPACITY_DEFAULT = int(_get_config_value('BOOKING_CAPACITY_DEFAULT', '10'))
+    # Branches bookings may name (comma separated); empty accepts any, normalised
+    BOOKING_LOCATIONS = [
+        name.strip() for name in _get_config_value('BOOKING_LOCATIONS', '').split(',') if name.strip()
+    ]
+    # Longest date range one availability request may cover
+    BOOKING_AVAILABILITY_MAX_DAYS = int(_get_config_value('BOOKING_AVAILABILITY_MAX_DAYS', '92'))
+    
+    # Compressed text columns - codec is auto, zstd, zlib or none
+    TEXT_COMPRESSION_CODEC = _get_config_value('TEXT_COMPRESSION_CODEC', 'auto')
+    TEXT_COMPRESSION_DICT_DIR = _get_config_value(
+        'TEXT_COMPRESSION_DICT_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), 'instance', 'text_dicts')
+    )
@@ -1,16 +1,208 @@
+import hashlib
+import weakref
+from typing import Dict, List, Mapping
 from flask_sqlalchemy import SQLAlchemy
-import pandas as pd
-import os
-from werkzeug.security import generate_password_hash
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from app.config import Config
 
 db = SQLAlchemy()
 
+SQLITE_JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SQLITE_SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+
+def engine_options(config: Mapping) -> Dict:
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database. File-based SQLite gets a
+    bounded pool; server databases also get pre-ping and recycling so connections
+    dropped by the server or a proxy are replaced instead of failing a request.
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            # One shared in-memory connection - there is no pool to size
+            return {}
+        return {
+            'pool_size': config['DB_POOL_SIZE'],
+            'max_overflow': config['DB_MAX_OVERFLOW'],
+            'pool_timeout': config['DB_POOL_TIMEOUT'],
+        }
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+
+def sqlite_pragmas(config: Mapping) -> List[str]:
+    """PRAGMA statements run on every new SQLite connection"""
+    journal_mode = config['SQLITE_JOURNAL_MODE'].upper()
+    synchronous = config['SQLITE_SYNCHRONOUS'].upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {synchronous}")
+    return [
+        # busy_timeout first, so switching the journal mode also waits for other writers
+        f"PRAGMA busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA journal_mode = {journal_mode}",
+        f"PRAGMA synchronous = {synchronous}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = -{int(config['SQLITE_CACHE_SIZE_KB'])}",
+        f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE_MB']) * 1024 * 1024}",
+    ]
+
+
+def configure_engine(engine: Engine, config: Mapping) -> None:
+    """Apply the SQLite pragmas from config to every connection the engine opens"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(config)
+    
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in pragmas:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def upgrade_schema():
+    """
+    Add columns and indexes that were added to models after their table was created.
+    create_all only creates missing tables, so new nullable columns are added
+    with ALTER TABLE here. Returns the list of columns/indexes added.
+    """
+    inspector = db.inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {col['name'] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}')
+            added.append(f'{table.name}.{column.name}')
+        
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                with db.engine.begin() as conn:
+                    index.create(conn, checkfirst=True)
+                added.append(index.name)
+    return added
+
+
+# Fuzzy booking search (SQLite). Every distinct name/vehicle model goes into
+# booking_terms, and booking_terms_fts indexes the terms by trigram, padded like
+# app.utils.fuzzy.pad_words. Searching the distinct values (far fewer than
+# bookings) keeps it fast; matching bookings are then found through the plain
+# name/vehicle_model indexes. Triggers keep the terms in sync with every
+# insert/update, including bulk Core inserts. Terms of deleted bookings are
+# left behind - they simply match no bookings.
+_PADDED = "' ' || replace(lower(trim(new.term)), ' ', '  ') || ' '"
+BOOKING_SEARCH_INDEX_DDL = [
+    """CREATE TABLE booking_terms (
+        id INTEGER PRIMARY KEY,
+        field VARCHAR(20) NOT NULL,
+        term VARCHAR(100) NOT NULL,
+        UNIQUE (field, term)
+    )""",
+    "CREATE VIRTUAL TABLE booking_terms_fts USING fts5(name, vehicle_model, tokenize='trigram')",
+    f"""CREATE TRIGGER booking_terms_ai AFTER INSERT ON booking_terms BEGIN
+        INSERT INTO booking_terms_fts(rowid, name, vehicle_model) VALUES (
+            new.id,
+            CASE WHEN new.field = 'name' THEN {_PADDED} END,
+            CASE WHEN new.field = 'vehicle_model' THEN {_PADDED} END
+        );
+    END""",
+    """CREATE TRIGGER bookings_terms_ai AFTER INSERT ON bookings BEGIN
+        INSERT OR IGNORE INTO booking_terms(field, term) VALUES ('name', new.name), ('vehicle_model', new.vehicle_model);
+    END""",
+    """CREATE TRIGGER bookings_terms_au AFTER UPDATE OF name, vehicle_model ON bookings BEGIN
+        INSERT OR IGNORE INTO booking_terms(field, term) VALUES ('name', new.name), ('vehicle_model', new.vehicle_model);
+    END""",
+    """INSERT OR IGNORE INTO booking_terms(field, term)
+        SELECT 'name', name FROM bookings UNION SELECT 'vehicle_model', vehicle_model FROM bookings""",
+]
+
+
+# Engine -> whether it has the search index, so fuzzy searches do no schema reads
+_search_index = weakref.WeakKeyDictionary()
+
+
+def has_search_index() -> bool:
+    """Whether the booking fuzzy search index exists (checked once per engine)"""
+    engine = db.engine
+    if engine not in _search_index:
+        _search_index[engine] = (
+            engine.dialect.name == 'sqlite' and db.inspect(engine).has_table('booking_terms_fts')
+        )
+    return _search_index[engine]
+
+
+def create_search_index() -> bool:
+    """
+    Create and populate the booking fuzzy search index if it does not exist.
+    Only SQLite (3.34+, for the trigram tokenizer) is supported; other databases
+    fall back to LIKE matching in BookingRepository. Returns True if created.
+    """
+    if db.engine.dialect.name != 'sqlite' or has_search_index():
+        return False
+    with db.engine.begin() as conn:
+        for statement in BOOKING_SEARCH_INDEX_DDL:
+            conn.exec_driver_sql(statement)
+    _search_index[db.engine] = True
+    return True
+
+
+def schema_fingerprint() -> str:
+    """
+    Hash of every table, column, type and index the models define, plus the search
+    index DDL. Any model change alters it, so init_db knows the schema needs work.
+    """
+    digest = hashlib.sha256()
+    for table in db.metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}:{column.nullable}".encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(f"{index.name}:{[column.name for column in index.columns]}".encode())
+    for statement in BOOKING_SEARCH_INDEX_DDL:
+        digest.update(statement.encode())
+    return digest.hexdigest()[:32]
+
+
+def _stored_fingerprint(SchemaVersion):
+    try:
+        return db.session.execute(db.select(SchemaVersion.fingerprint).where(SchemaVersion.id == 1)).scalar()
+    except Exception:
+        # No marker table yet (new or pre-marker database)
+        db.session.rollback()
+        return None
+
 
 def init_db():
-    """Initialize database and migrate data from Excel files"""
+    """
+    Create or upgrade the schema. When the stored schema fingerprint matches the
+    models this is a single query; data seeding is the separate `seed` command.
+    """
     try:
-        from app.models.user import User
-        from app.models.booking import Booking
+        # Importing the package registers every model with create_all
+        from app.models import User, Booking, SchemaVersion
+        
+        fingerprint = schema_fingerprint()
+        if _stored_fingerprint(SchemaVersion) == fingerprint:
+            return
         
         # Create all tables
         try:
@@ -20,52 +212,70 @@ def init_db():
             # On Vercel, this might fail due to file system limitations
             return
         
-        # Migrate users from Excel if table is empty
+        # Add columns introduced after the tables were first created
         try:
-            if User.query.count() == 0:
-                users_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'users.xlsx')
-                if os.path.exists(users_file):
-                    try:
-                        df = pd.read_excel(users_file)
-                        for _, row in df.iterrows():
-                            user = User(
-                                username=row['username'],
-                                password=generate_password_hash(str(row['password'])),
-                                role=row.get('role', 'Employee')
-                            )
-                            db.session.add(user)
-                        db.session.commit()
-                        print(f"Migrated {len(df)} users from Excel")
-                    except Exception as e:
-                        print(f"Error migrating users: {e}")
-                        db.session.rollback()
+            added = upgrade_schema()
+            for name in added:
+                print(f"Schema upgrade: added {name}")
+            from app.repositories.booking_repository import BookingRepository
+            if 'bookings.phone_normalized' in added:
+                count = BookingRepository().backfill_phone_lookup_columns()
+                print(f"Backfilled normalized phones for {count} bookings")
+            # Existing tables keep a nullable created_at column; fill the gaps keyset pagination skips
+            count = BookingRepository().backfill_created_at()
+            if count:
+                print(f"Backfilled created_at for {count} bookings")
         except Exception as e:
-            print(f"Warning: User migration failed: {e}")
+            print(f"Warning: Schema upgrade failed: {e}")
+            # Leave the marker stale so the next start retries
+            fingerprint = None
         
-        # Migrate bookings from Excel if table is empty
         try:
-            if Booking.query.count() == 0:
-                bookings_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'bookings.xlsx')
-                if os.path.exists(bookings_file):
-                    try:
-                        df = pd.read_excel(bookings_file)
-                        for _, row in df.iterrows():
-                            booking = Booking(
-                                booking_id=row.get('Booking ID', ''),
-                                booking_type=row.get('Booking Type', 'Service'),
-                                name=row.get('Name', ''),
-                                phone=row.get('Phone', ''),
-                                vehicle_model=row.get('Vehicle Model', ''),
-                                preferred_date=pd.to_datetime(row.get('Preferred Date', pd.Timestamp.now())).date() if pd.notna(row.get('Preferred Date')) else None
-                            )
-                            db.session.add(booking)
-                        db.session.commit()
-                        print(f"Migrated {len(df)} bookings from Excel")
-                    except Exception as e:
-                        print(f"Error migrating bookings: {e}")
-                        db.session.rollback()
+            if create_search_index():
+                print("Created booking search index")
         except Exception as e:
-            print(f"Warning: Booking migration failed: {e}")
+            print(f"Warning: Booking search index unavailable: {e}")
+        
+        if Config.SEED_ON_STARTUP and User.query.first() is None:
+            try:
+                from app.seed import seed
+                counts = seed()
+                print(f"Seeded {counts['users']} users and {counts['bookings']} bookings from Excel")
+            except Exception as e:
+                print(f"Warning: Seeding failed: {e}")
+                db.session.rollback()
+        
+        # Build the analytics rollup for bookings that predate it
+        try:
+            from app.models import BookingDailyStat
+            if BookingDailyStat.query.first() is None and Booking.query.first() is not None:
+                from app.repositories.booking_stats_repository import BookingStatsRepository
+                count = BookingStatsRepository().rebuild()
+                print(f"Built booking analytics rollup ({count} rows)")
+        except Exception as e:
+            print(f"Warning: Booking analytics rollup failed: {e}")
+            db.session.rollback()
+        
+        # Count slots taken by bookings that predate the capacity counters
+        try:
+            from app.models import BookingCapacity
+            if (BookingCapacity.query.first() is None
+                    and Booking.query.filter(Booking.preferred_date.is_not(None)).first() is not None):
+                from app.repositories.booking_capacity_repository import BookingCapacityRepository
+                from app.services.autosphere_service import AutoSphereService
+                count = BookingCapacityRepository().rebuild_reserved(AutoSphereService.default_capacity)
+                print(f"Built booking capacity counters ({count} rows)")
+        except Exception as e:
+            print(f"Warning: Booking capacity counters failed: {e}")
+            db.session.rollback()
+        
+        if fingerprint:
+            marker = db.session.get(SchemaVersion, 1)
+            if marker:
+                marker.fingerprint = fingerprint
+            else:
+                db.session.add(SchemaVersion(id=1, fingerprint=fingerprint))
+            db.session.commit()
     except Exception as e:
         print(f"Warning: Database initialization failed: {e}")
         # Don't raise - allow app to continue without database initialization
@@ -1,5 +1,10 @@
 from app.models.user import User
-from app.models.booking import Booking
-from app.models.policy_document import PolicyDocument
+from app.models.booking import Booking, BookingRow
+from app.models.policy_document import PolicyDocument, PolicySummaryRow
+from app.models.chat_session import ChatSession
+from app.models.booking_counter import BookingCounter
+from app.models.booking_daily_stat import BookingDailyStat
+from app.models.booking_capacity import BookingCapacity
+from app.models.schema_version import SchemaVersion
 
-__all__ = ['User', 'Booking', 'PolicyDocument']
+__all__ = ['User', 'Booking', 'BookingRow', 'PolicyDocument', 'PolicySummaryRow', 'ChatSession', 'BookingCounter', 'BookingDailyStat', 'BookingCapacity', 'SchemaVersion']
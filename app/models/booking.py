@@ -1,31 +1,75 @@
 from app.database import db
-from datetime import datetime
+from app.utils.phone import normalize_phone, reversed_digits
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+
+def serialize_booking(booking) -> dict:
+    """API representation of a Booking or BookingRow"""
+    return {
+        'id': booking.id,
+        'booking_id': booking.booking_id,
+        'booking_type': booking.booking_type,
+        'name': booking.name,
+        'phone': booking.phone,
+        'vehicle_model': booking.vehicle_model,
+        'preferred_date': booking.preferred_date.isoformat() if booking.preferred_date else None,
+        'location': booking.location,
+        'created_at': booking.created_at.isoformat() if booking.created_at else None
+    }
 
 
 class Booking(db.Model):
     """Booking model for AutoSphere service/test drive bookings"""
     __tablename__ = 'bookings'
+    __table_args__ = (
+        db.Index('ix_bookings_created_at_id', 'created_at', 'id'),  # Keyset pagination order
+        # Fuzzy search: newest bookings for a matched name/model without sorting
+        db.Index('ix_bookings_name_created_at', 'name', 'created_at', 'id'),
+        db.Index('ix_bookings_vehicle_model_created_at', 'vehicle_model', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     booking_id = db.Column(db.String(50), unique=True, nullable=False, index=True)
     booking_type = db.Column(db.String(20), nullable=False)  # Service or Test Drive
     name = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(20), nullable=False, index=True)
+    phone_normalized = db.Column(db.String(20), nullable=True, index=True)  # E.164 style, set from phone
+    phone_reversed = db.Column(db.String(20), nullable=True, index=True)  # Reversed digits for suffix lookups
     vehicle_model = db.Column(db.String(100), nullable=False)
     preferred_date = db.Column(db.Date, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    location = db.Column(db.String(50), nullable=True)  # Branch; None = main site
+    # Keyset pagination orders by (created_at, id), so it must never be NULL
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    @db.validates('phone')
+    def _set_phone_lookup_columns(self, key, phone):
+        self.phone_normalized = normalize_phone(phone)
+        self.phone_reversed = reversed_digits(phone)
+        return phone
     
     def __repr__(self):
         return f'<Booking {self.booking_id}>'
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'booking_id': self.booking_id,
-            'booking_type': self.booking_type,
-            'name': self.name,
-            'phone': self.phone,
-            'vehicle_model': self.vehicle_model,
-            'preferred_date': self.preferred_date.isoformat() if self.preferred_date else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        return serialize_booking(self)
+
+
+class BookingRow(NamedTuple):
+    """
+    Read-only booking as a plain tuple of the columns the API returns. Read
+    endpoints select these columns with Core and skip ORM hydration and the
+    identity map entirely.
+    """
+    id: int
+    booking_id: str
+    booking_type: str
+    name: str
+    phone: str
+    vehicle_model: str
+    preferred_date: Optional[date]
+    location: Optional[str]
+    created_at: Optional[datetime]
+    
+    def to_dict(self):
+        return serialize_booking(self)
@@ -0,0 +1,18 @@
+from app.database import db
+
+
+class BookingCapacity(db.Model):
+    """
+    Bookable slots per day, booking type and location ('' = main site).
+    reserved is incremented atomically in the transaction that inserts each booking.
+    """
+    __tablename__ = 'booking_capacity'
+    
+    day = db.Column(db.Date, primary_key=True)
+    booking_type = db.Column(db.String(20), primary_key=True)
+    location = db.Column(db.String(50), primary_key=True, default='')
+    capacity = db.Column(db.Integer, nullable=False)
+    reserved = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<BookingCapacity {self.day} {self.booking_type} {self.location or "-"} {self.reserved}/{self.capacity}>'
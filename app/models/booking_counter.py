@@ -0,0 +1,12 @@
+from app.database import db
+
+
+class BookingCounter(db.Model):
+    """Per-day booking number sequence used to build AS-YYYYMMDD-NNNN booking IDs"""
+    __tablename__ = 'booking_counters'
+    
+    day = db.Column(db.String(8), primary_key=True)  # YYYYMMDD
+    last_value = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<BookingCounter {self.day}={self.last_value}>'
@@ -0,0 +1,19 @@
+from app.database import db
+
+
+class BookingDailyStat(db.Model):
+    """
+    Per-day booking rollup by type and vehicle model, updated as bookings are inserted.
+    Lead time is the number of days from booking (created_at) to preferred_date.
+    """
+    __tablename__ = 'booking_daily_stats'
+    
+    day = db.Column(db.Date, primary_key=True)  # created_at date (UTC)
+    booking_type = db.Column(db.String(20), primary_key=True)
+    vehicle_model = db.Column(db.String(100), primary_key=True)
+    bookings = db.Column(db.Integer, nullable=False, default=0)
+    lead_time_days_total = db.Column(db.Integer, nullable=False, default=0)
+    lead_time_bookings = db.Column(db.Integer, nullable=False, default=0)  # Bookings with a preferred_date
+    
+    def __repr__(self):
+        return f'<BookingDailyStat {self.day} {self.booking_type} {self.vehicle_model}={self.bookings}>'
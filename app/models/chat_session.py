@@ -0,0 +1,46 @@
+import json
+from app.database import db
+from datetime import datetime
+
+
+class ChatSession(db.Model):
+    """Server-side AutoSphere chat session (rolling summary + recent turns)"""
+    __tablename__ = 'chat_sessions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    summary = db.Column(db.Text, nullable=False, default='')  # Summary of turns older than recent_turns
+    recent_turns = db.Column(db.Text, nullable=False, default='[]')  # JSON list of {role, content}
+    booking_state = db.Column(db.Text, nullable=True)  # JSON slot-filling state while a booking is in progress
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ChatSession {self.session_id}>'
+    
+    @property
+    def turns(self):
+        return json.loads(self.recent_turns or '[]')
+    
+    @turns.setter
+    def turns(self, value):
+        self.recent_turns = json.dumps(value)
+    
+    @property
+    def booking(self):
+        return json.loads(self.booking_state) if self.booking_state else None
+    
+    @booking.setter
+    def booking(self, value):
+        self.booking_state = json.dumps(value) if value else None
+    
+    def to_dict(self):
+        return {
+            'session_id': self.session_id,
+            'summary': self.summary,
+            'recent_turns': self.turns,
+            'booking': self.booking,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,5 +1,7 @@
 from app.database import db
+from app.models.types import CompressedText
 from datetime import datetime
+from typing import NamedTuple, Optional
 
 
 class PolicyDocument(db.Model):
@@ -8,7 +10,7 @@ class PolicyDocument(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
-    content = db.Column(db.Text, nullable=False)  # Extracted text content
+    content = db.deferred(db.Column(CompressedText, nullable=False))  # Extracted text content (compressed)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     
@@ -23,3 +25,19 @@ class PolicyDocument(db.Model):
             'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None,
             'uploaded_by': self.uploaded_by
         }
+
+
+class PolicySummaryRow(NamedTuple):
+    """Read-only policy listing entry - metadata only, the compressed content is never read"""
+    id: int
+    filename: str
+    uploaded_at: Optional[datetime]
+    uploaded_by: Optional[int]
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'filename': self.filename,
+            'uploaded_at': self.uploaded_at.isoformat() if self.uploaded_at else None,
+            'uploaded_by': self.uploaded_by
+        }
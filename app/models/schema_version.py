@@ -0,0 +1,17 @@
+from app.database import db
+from datetime import datetime
+
+
+class SchemaVersion(db.Model):
+    """
+    Single-row marker holding the fingerprint of the schema init_db last set up.
+    When it matches the models, startup skips schema checks entirely.
+    """
+    __tablename__ = 'schema_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<SchemaVersion {self.fingerprint}>'
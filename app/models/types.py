@@ -0,0 +1,20 @@
+from app.database import db
+from app.utils.compression import compress_text, decompress_text
+
+
+class CompressedText(db.TypeDecorator):
+    """
+    Text column stored as a compressed blob.
+    Values are compressed on write and decompressed when loaded; combine with
+    db.deferred() so the blob is only fetched when the attribute is accessed.
+    """
+    impl = db.LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_text(value)
+    
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
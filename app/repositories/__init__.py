@@ -1,6 +1,7 @@
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, unit_of_work
 from app.repositories.user_repository import UserRepository
 from app.repositories.booking_repository import BookingRepository
 from app.repositories.policy_document_repository import PolicyDocumentRepository
+from app.repositories.chat_session_repository import ChatSessionRepository
 
-__all__ = ['BaseRepository', 'UserRepository', 'BookingRepository', 'PolicyDocumentRepository']
+__all__ = ['BaseRepository', 'unit_of_work', 'UserRepository', 'BookingRepository', 'PolicyDocumentRepository', 'ChatSessionRepository']
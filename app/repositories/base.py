@@ -1,22 +1,87 @@
-from typing import TypeVar, Generic, List, Optional, Type
+from contextlib import contextmanager
+from typing import TypeVar, Generic, Dict, Iterable, Iterator, List, Optional, Type
 from app.database import db
 
 ModelType = TypeVar('ModelType')
+# Read-only NamedTuple row types (e.g. BookingRow) returned by the Core read path
+RowType = TypeVar('RowType', bound=tuple)
+
+# Session.info key counting the open unit_of_work blocks
+_UNIT_OF_WORK_DEPTH = 'unit_of_work_depth'
+
+
+@contextmanager
+def unit_of_work() -> Iterator:
+    """
+    Group repository writes into one transaction with a single commit.
+    Inside the block create/update/delete only flush; the outermost block commits
+    on success and rolls everything back on an exception. Nested blocks join it.
+    """
+    session = db.session()
+    depth = session.info.get(_UNIT_OF_WORK_DEPTH, 0)
+    session.info[_UNIT_OF_WORK_DEPTH] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        session.info[_UNIT_OF_WORK_DEPTH] = depth
+
+
+def in_unit_of_work() -> bool:
+    """Whether the current session is inside a unit_of_work block"""
+    return db.session().info.get(_UNIT_OF_WORK_DEPTH, 0) > 0
 
 
 class BaseRepository(Generic[ModelType]):
     """Base repository with common CRUD operations"""
     
+    # Rows flushed per INSERT/UPDATE batch by create_many/update_many
+    BATCH_SIZE = 1000
+    
     def __init__(self, model: Type[ModelType]):
         self.model = model
     
+    def _commit(self) -> None:
+        """Commit, unless a unit_of_work will commit for us"""
+        if not in_unit_of_work():
+            db.session.commit()
+    
     def create(self, **kwargs) -> ModelType:
         """Create a new record"""
         instance = self.model(**kwargs)
         db.session.add(instance)
-        db.session.commit()
+        # Flush so the primary key is available even before the unit of work commits
+        db.session.flush()
+        self._commit()
         return instance
     
+    def create_many(self, rows: Iterable[Dict], batch_size: Optional[int] = None) -> List[ModelType]:
+        """
+        Create records from column dicts in one transaction, flushing batch_size
+        rows per batch (model validators and defaults apply as with create)
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        instances = []
+        with unit_of_work() as session:
+            batch = []
+            for row in rows:
+                batch.append(self.model(**row))
+                if len(batch) >= batch_size:
+                    session.add_all(batch)
+                    session.flush()
+                    instances.extend(batch)
+                    batch = []
+            if batch:
+                session.add_all(batch)
+                session.flush()
+                instances.extend(batch)
+        return instances
+    
     def get_by_id(self, id: int) -> Optional[ModelType]:
         """Get record by ID"""
         return self.model.query.get(id)
@@ -32,15 +97,53 @@ class BaseRepository(Generic[ModelType]):
         """Update an existing record"""
         for key, value in kwargs.items():
             setattr(instance, key, value)
-        db.session.commit()
+        self._commit()
         return instance
     
+    def update_many(self, rows: Iterable[Dict], batch_size: Optional[int] = None) -> int:
+        """
+        Update records by primary key in one transaction. Each dict holds the primary
+        key plus the columns to change; batches run as executemany UPDATEs, so model
+        validators are not applied. Returns the number of rows given.
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        count = 0
+        with unit_of_work() as session:
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    session.execute(db.update(self.model), batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                session.execute(db.update(self.model), batch)
+                count += len(batch)
+        return count
+    
     def delete(self, instance: ModelType) -> bool:
         """Delete a record"""
         db.session.delete(instance)
-        db.session.commit()
+        self._commit()
         return True
     
+    def rollback(self) -> None:
+        """Discard the current transaction's uncommitted changes"""
+        db.session.rollback()
+    
     def count(self) -> int:
         """Get total count of records"""
         return self.model.query.count()
+    
+    def _select_row(self, row_type: Type[RowType]):
+        """Core SELECT of the table columns named by row_type's fields, in field order"""
+        table = self.model.__table__
+        return db.select(*(table.c[name] for name in row_type._fields))
+    
+    @staticmethod
+    def _rows(stmt, row_type: Type[RowType]) -> List[RowType]:
+        """
+        Run a Core SELECT for read-only use and wrap each result tuple in row_type.
+        No ORM entities are built or added to the session's identity map.
+        """
+        return [row_type._make(row) for row in db.session.execute(stmt)]
@@ -0,0 +1,226 @@
+from collections import Counter
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from app.config import Config
+from app.database import db
+from app.repositories.base import BaseRepository
+from app.models.booking import Booking
+from app.models.booking_capacity import BookingCapacity
+from app.utils.location import location_key
+
+
+class CapacityExceededError(Exception):
+    """Raised when a date has no free slots left for the booking type/location"""
+    
+    def __init__(self, day: date, booking_type: str, location: str = ''):
+        self.day = day
+        self.booking_type = booking_type
+        self.location = location
+        where = f" at {location}" if location else ""
+        super().__init__(f"No {booking_type} slots left on {day.isoformat()}{where}")
+
+
+class BookingCapacityRepository(BaseRepository[BookingCapacity]):
+    """Repository for BookingCapacity counters"""
+    
+    def __init__(self):
+        super().__init__(BookingCapacity)
+    
+    @staticmethod
+    def default_capacity(booking_type: str) -> int:
+        """Bookings accepted per day for a booking type unless overridden for that date"""
+        if booking_type == "Service":
+            return Config.BOOKING_CAPACITY_SERVICE
+        if booking_type == "Test Drive":
+            return Config.BOOKING_CAPACITY_TEST_DRIVE
+        return Config.BOOKING_CAPACITY_DEFAULT
+    
+    def reserve(self, day: date, booking_type: str, location: str,
+                default_capacity: int, count: int = 1) -> None:
+        """
+        Atomically take count slots, or raise CapacityExceededError without taking any.
+        Runs in the caller's transaction: the conditional UPDATE holds the row (or, on
+        SQLite, the database) write lock until the bookings commit, so concurrent
+        workers can never overbook. The row is created with default_capacity on first use.
+        Runs in a savepoint, so a refusal leaves the rest of the caller's transaction intact.
+        """
+        with db.session.begin_nested():
+            self._reserve(day, booking_type, location, default_capacity, count)
+    
+    def _reserve(self, day: date, booking_type: str, location: str, default_capacity: int, count: int) -> None:
+        table = BookingCapacity.__table__
+        key = (table.c.day == day) & (table.c.booking_type == booking_type) & (table.c.location == location)
+        for _ in range(3):
+            result = db.session.execute(
+                db.update(table)
+                .where(key, table.c.reserved + count <= table.c.capacity)
+                .values(reserved=table.c.reserved + count)
+            )
+            if result.rowcount:
+                return
+            
+            if db.session.execute(db.select(table.c.reserved).where(key)).first() is not None:
+                raise CapacityExceededError(day, booking_type, location)
+            if count > default_capacity:
+                raise CapacityExceededError(day, booking_type, location)
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(db.insert(table).values(
+                        day=day, booking_type=booking_type, location=location,
+                        capacity=default_capacity, reserved=count
+                    ))
+                return
+            except IntegrityError:
+                # Another worker created the row first - reserve against it instead
+                continue
+        raise RuntimeError(f"Could not reserve capacity for {day}")
+    
+    def release(self, day: date, booking_type: str, location: str, count: int = 1) -> None:
+        """Give back count slots of a deleted or moved booking, in the caller's transaction"""
+        table = BookingCapacity.__table__
+        db.session.execute(
+            db.update(table)
+            .where(table.c.day == day, table.c.booking_type == booking_type, table.c.location == location,
+                   table.c.reserved >= count)
+            .values(reserved=table.c.reserved - count)
+        )
+    
+    def free_slots(self, day: date, booking_type: str, location: str, default_capacity: int) -> int:
+        """Slots still open on a date (default_capacity if the counter does not exist yet)"""
+        table = BookingCapacity.__table__
+        row = db.session.execute(
+            db.select(table.c.capacity, table.c.reserved).where(
+                table.c.day == day, table.c.booking_type == booking_type, table.c.location == location
+            )
+        ).first()
+        if row is None:
+            return default_capacity
+        return max(row.capacity - row.reserved, 0)
+    
+    def reserve_available(self, day: date, booking_type: str, location: str,
+                          default_capacity: int, count: int) -> int:
+        """
+        Take up to count slots, as many as are free. Returns how many were taken.
+        Tries all at once first, then whatever is left if the date is nearly full.
+        """
+        taken, wanted = 0, count
+        while wanted > 0:
+            try:
+                self.reserve(day, booking_type, location, default_capacity, wanted)
+                taken += wanted
+            except CapacityExceededError:
+                pass
+            if taken == count:
+                break
+            wanted = min(count - taken, self.free_slots(day, booking_type, location, default_capacity))
+        return taken
+    
+    def reserve_many(self, wanted: Dict[Tuple[date, str, str], int],
+                     default_capacity: Callable[[str], int]) -> Dict[Tuple[date, str, str], int]:
+        """
+        reserve_available for several (day, booking_type, location) keys at once: one
+        SELECT of their counters, one conditional UPDATE and one INSERT for the new ones.
+        Returns how many slots were taken per key. If another worker changed a counter
+        in between, the savepoint is rolled back and the keys are reserved one by one.
+        """
+        table = BookingCapacity.__table__
+        free = {}
+        for row in db.session.execute(
+            db.select(table).where(
+                table.c.day.in_({key[0] for key in wanted}),
+                table.c.booking_type.in_({key[1] for key in wanted}),
+                table.c.location.in_({key[2] for key in wanted})
+            )
+        ):
+            key = (row.day, row.booking_type, row.location)
+            if key in wanted:
+                free[key] = max(row.capacity - row.reserved, 0)
+        taken = {key: min(count, free.get(key, default_capacity(key[1]))) for key, count in wanted.items()}
+        
+        def matches(key):
+            return (table.c.day == key[0]) & (table.c.booking_type == key[1]) & (table.c.location == key[2])
+        
+        updates = [key for key in free if taken[key]]
+        inserts = [key for key in wanted if key not in free and taken[key]]
+        try:
+            with db.session.begin_nested():
+                if updates:
+                    amount = db.case(*[(matches(key), taken[key]) for key in updates], else_=0)
+                    result = db.session.execute(
+                        db.update(table)
+                        .where(db.or_(*[matches(key) for key in updates]), table.c.reserved + amount <= table.c.capacity)
+                        .values(reserved=table.c.reserved + amount)
+                    )
+                    if result.rowcount != len(updates):
+                        raise CapacityExceededError(*updates[0])
+                if inserts:
+                    db.session.execute(db.insert(table), [
+                        {'day': day, 'booking_type': booking_type, 'location': location,
+                         'capacity': default_capacity(booking_type), 'reserved': taken[(day, booking_type, location)]}
+                        for day, booking_type, location in inserts
+                    ])
+            return taken
+        except (CapacityExceededError, IntegrityError):
+            # A concurrent reservation got there first - fall back to one key at a time
+            return {
+                key: self.reserve_available(*key, default_capacity(key[1]), count)
+                for key, count in wanted.items()
+            }
+    
+    def set_capacity(self, day: date, booking_type: str, location: str, capacity: int) -> None:
+        """Override the capacity for one date (e.g. a holiday or extra staff) and commit"""
+        row = db.session.get(BookingCapacity, (day, booking_type, location))
+        if row:
+            row.capacity = capacity
+        else:
+            db.session.add(BookingCapacity(
+                day=day, booking_type=booking_type, location=location, capacity=capacity, reserved=0
+            ))
+        db.session.commit()
+    
+    def get_range(self, date_from: date, date_to: date,
+                  booking_type: Optional[str] = None,
+                  location: Optional[str] = None) -> List[BookingCapacity]:
+        """Counter rows for a date range - one primary key range read"""
+        query = self.model.query.filter(BookingCapacity.day >= date_from, BookingCapacity.day <= date_to)
+        if booking_type:
+            query = query.filter_by(booking_type=booking_type)
+        if location is not None:
+            query = query.filter_by(location=location)
+        return query.order_by(BookingCapacity.day, BookingCapacity.booking_type, BookingCapacity.location).all()
+    
+    def rebuild_reserved(self, default_capacity: Callable[[str], int], since: Optional[date] = None) -> int:
+        """
+        Recount reserved slots from the bookings table (for bookings that predate the
+        counters). Existing capacity overrides are kept. Returns the number of counters written.
+        """
+        table = Booking.__table__
+        stmt = (
+            db.select(table.c.preferred_date, table.c.booking_type, table.c.location, db.func.count())
+            .where(table.c.preferred_date.is_not(None))
+            .group_by(table.c.preferred_date, table.c.booking_type, table.c.location)
+        )
+        if since:
+            stmt = stmt.where(table.c.preferred_date >= since)
+        counts = Counter()
+        for day, booking_type, location, count in db.session.execute(stmt):
+            counts[(day, booking_type, location_key(location))] += count
+        
+        capacity = BookingCapacity.__table__
+        reset = db.update(capacity).values(reserved=0)
+        if since:
+            reset = reset.where(capacity.c.day >= since)
+        db.session.execute(reset)
+        for (day, booking_type, location), count in counts.items():
+            row = db.session.get(BookingCapacity, (day, booking_type, location))
+            if row:
+                row.reserved = count
+            else:
+                # Existing bookings are kept even if they exceed the default capacity
+                db.session.add(BookingCapacity(
+                    day=day, booking_type=booking_type, location=location,
+                    capacity=max(default_capacity(booking_type), count), reserved=count
+                ))
+        db.session.commit()
+        return len(counts)
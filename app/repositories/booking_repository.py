@@ -1,33 +1,494 @@
-from typing import Optional, List
-from app.repositories.base import BaseRepository
-from app.models.booking import Booking
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
+from sqlalchemy.exc import IntegrityError
+from app.config import Config
+from app.database import db, has_search_index
+from app.repositories.base import BaseRepository, unit_of_work
+from app.models.booking import Booking, BookingRow
+from app.models.booking_counter import BookingCounter
+from app.repositories.booking_capacity_repository import BookingCapacityRepository
+from app.repositories.booking_stats_repository import BookingStatsRepository
+from app.utils.phone import PHONE_MATCH_DIGITS, normalize_phone, reversed_digits
+from app.utils.fuzzy import MIN_SIMILARITY, fts_match, similarity
+from app.utils.cache import TTLCache
+from app.utils.location import location_key, normalize_location
+
+# BookingRow results by ('id', booking_id) and ('phone', phone key, limit), shared by
+# every repository instance in the process; writes below invalidate them
+booking_cache = TTLCache('booking_cache', Config.BOOKING_CACHE_SIZE, Config.BOOKING_CACHE_TTL_SECONDS)
 
 
 class BookingRepository(BaseRepository[Booking]):
     """Repository for Booking model"""
     
+    _row_by_booking_id = None
+    # Page sizes phone lookups were cached with, so a write can drop every variant
+    _phone_limits = set()
+    
     def __init__(self):
         super().__init__(Booking)
+        self.stats = BookingStatsRepository()
+        self.capacity = BookingCapacityRepository()
+    
+    @staticmethod
+    def _slot(booking: Booking) -> Tuple[Optional[date], str, str]:
+        """Capacity counter key (date, type, location) a booking holds a slot in"""
+        return booking.preferred_date, booking.booking_type, location_key(booking.location)
+    
+    @staticmethod
+    def _stat(booking: Booking) -> Tuple[datetime, str, str, Optional[date]]:
+        """Row a booking contributes to the daily rollup (see BookingStatsRepository.record)"""
+        return booking.created_at, booking.booking_type, booking.vehicle_model, booking.preferred_date
+    
+    @staticmethod
+    def _phone_keys(phone: str) -> List[str]:
+        """
+        Cache keys of the phone lookups that can match phone: the last
+        PHONE_MATCH_DIGITS digits (see _phone_filter) and the exact normalised number
+        """
+        digits = reversed_digits(phone)[::-1]
+        keys = ['=' + (normalize_phone(phone) or '')]
+        if len(digits) >= PHONE_MATCH_DIGITS:
+            keys.append(digits[-PHONE_MATCH_DIGITS:])
+        return keys
+    
+    def _phone_key(self, phone: str) -> str:
+        """Cache key of a phone lookup - mirrors how _phone_filter matches it"""
+        digits = reversed_digits(phone)[::-1]
+        if len(digits) >= PHONE_MATCH_DIGITS:
+            return digits[-PHONE_MATCH_DIGITS:]
+        return '=' + (normalize_phone(phone) or '')
+    
+    def _invalidate(self, bookings: Iterable) -> None:
+        """Drop cached lookups for bookings (models, rows or column dicts) now and on commit"""
+        if not booking_cache.enabled:
+            return
+        keys = []
+        limits = list(self._phone_limits)
+        for booking in bookings:
+            booking_id, phone = (
+                (booking.get('booking_id'), booking.get('phone')) if isinstance(booking, dict)
+                else (booking.booking_id, booking.phone)
+            )
+            keys.append(('id', booking_id))
+            if phone:
+                keys += [('phone', key, limit) for key in self._phone_keys(phone) for limit in limits]
+        booking_cache.invalidate_on_commit(db.session(), keys)
+    
+    def create(self, **kwargs) -> Booking:
+        """Create a booking and add it to the daily rollup in the same transaction"""
+        booking = self.model(**kwargs)
+        db.session.add(booking)
+        db.session.flush()
+        self.stats.record([self._stat(booking)])
+        self._invalidate([booking])
+        self._commit()
+        return booking
+    
+    def create_many(self, rows: Iterable[Dict], batch_size: Optional[int] = None) -> List[Booking]:
+        """Create bookings in one transaction and add them to the daily rollup"""
+        with unit_of_work():
+            bookings = super().create_many(rows, batch_size=batch_size)
+            self.stats.record(self._stat(booking) for booking in bookings)
+            self._invalidate(bookings)
+        return bookings
+    
+    def update(self, instance: Booking, **kwargs) -> Booking:
+        """
+        Update a booking; cached lookups for its old and new ID/phone are dropped.
+        A new date, type or location moves its capacity slot: raises
+        CapacityExceededError (and changes nothing) when the new date is full.
+        A new date, type or model moves it between daily rollup rows.
+        """
+        if 'location' in kwargs:
+            kwargs['location'] = normalize_location(kwargs['location']) or None
+        old_slot, old_stat = self._slot(instance), self._stat(instance)
+        self._invalidate([BookingRow(**{name: getattr(instance, name) for name in BookingRow._fields})])
+        with unit_of_work():
+            super().update(instance, **kwargs)
+            new_slot = self._slot(instance)
+            if new_slot != old_slot:
+                if new_slot[0]:
+                    self.capacity.reserve(*new_slot, self.capacity.default_capacity(new_slot[1]))
+                if old_slot[0]:
+                    self.capacity.release(*old_slot)
+            new_stat = self._stat(instance)
+            if new_stat != old_stat:
+                self.stats.remove([old_stat])
+                self.stats.record([new_stat])
+            self._invalidate([instance])
+        return instance
+    
+    def update_many(self, rows: Iterable[Dict], batch_size: Optional[int] = None) -> int:
+        """Update bookings by primary key - the rows' IDs/phones are not known, so the whole cache is dropped"""
+        count = super().update_many(rows, batch_size=batch_size)
+        booking_cache.clear()
+        return count
+    
+    def delete(self, instance: Booking) -> bool:
+        """Delete a booking, its capacity slot, its rollup count and its cached lookups"""
+        with unit_of_work():
+            if instance.preferred_date:
+                self.capacity.release(*self._slot(instance))
+            self.stats.remove([self._stat(instance)])
+            self._invalidate([instance])
+            super().delete(instance)
+        return True
+    
+    def next_booking_number(self, day: str) -> int:
+        """
+        Atomically take the next booking number for a day (YYYYMMDD).
+        Runs in the caller's transaction: the UPDATE holds the row (or, on SQLite,
+        the database) write lock until the booking insert commits, so concurrent
+        workers never receive the same number.
+        """
+        return self.reserve_booking_numbers(day, 1)
+    
+    def reserve_booking_numbers(self, day: str, count: int) -> int:
+        """
+        Atomically take count consecutive booking numbers for a day and return the first.
+        Same locking as next_booking_number - call it in the transaction that inserts the bookings.
+        """
+        counters = BookingCounter.__table__
+        for _ in range(3):
+            result = db.session.execute(
+                db.update(counters)
+                .where(counters.c.day == day)
+                .values(last_value=counters.c.last_value + count)
+            )
+            if result.rowcount:
+                last = db.session.execute(
+                    db.select(counters.c.last_value).where(counters.c.day == day)
+                ).scalar_one()
+                return last - count + 1
+            
+            # First booking of the day - start after any IDs created before the counter existed
+            start = self._max_legacy_number(day) + 1
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(db.insert(counters).values(day=day, last_value=start + count - 1))
+                return start
+            except IntegrityError:
+                # Another worker created the row first - increment it instead
+                continue
+        raise RuntimeError(f"Could not allocate a booking number for {day}")
+    
+    def _max_legacy_number(self, day: str) -> int:
+        """Highest numeric suffix among existing AS-<day>-NNNN booking IDs"""
+        prefix = f"AS-{day}-"
+        rows = db.session.execute(
+            db.select(Booking.booking_id).where(Booking.booking_id.like(prefix + '%'))
+        ).scalars()
+        numbers = [int(b[len(prefix):]) for b in rows if b[len(prefix):].isdigit()]
+        return max(numbers, default=0)
+    
+    def insert_many(self, rows: List[Dict]) -> None:
+        """
+        Insert booking rows (column dicts) with a single executemany, update the daily
+        rollup and commit. Core inserts skip the model's validates hook and column
+        defaults are not visible afterwards, so phone lookup columns and created_at are set here.
+        """
+        now = datetime.utcnow()
+        for row in rows:
+            row['phone_normalized'] = normalize_phone(row['phone'])
+            row['phone_reversed'] = reversed_digits(row['phone'])
+            row.setdefault('created_at', now)
+        # Table-level insert: skips the ORM bulk layer, which only adds per-row overhead here
+        db.session.execute(db.insert(Booking.__table__), rows)
+        self.stats.record(
+            (row['created_at'], row['booking_type'], row['vehicle_model'], row.get('preferred_date'))
+            for row in rows
+        )
+        self._invalidate(rows)
+        self._commit()
     
     def get_by_booking_id(self, booking_id: str) -> Optional[Booking]:
         """Get booking by booking_id"""
         return self.model.query.filter_by(booking_id=booking_id).first()
     
-    def search(self, booking_id: Optional[str] = None, 
-               phone: Optional[str] = None, 
-               booking_type: Optional[str] = None) -> List[Booking]:
-        """Search bookings by filters"""
-        query = self.model.query
-        
+    def get_row_by_booking_id(self, booking_id: str) -> Optional[BookingRow]:
+        """Read-only lookup by booking_id (see BookingRow), served from booking_cache when possible"""
+        return booking_cache.get_or_load(('id', booking_id), lambda: self._load_row_by_booking_id(booking_id))
+    
+    def _load_row_by_booking_id(self, booking_id: str) -> Optional[BookingRow]:
+        if self._row_by_booking_id is None:
+            # Built once - the hot lookup then skips statement construction and cache-key generation
+            BookingRepository._row_by_booking_id = self._select_row(BookingRow).where(
+                Booking.__table__.c.booking_id == db.bindparam('booking_id')
+            )
+        row = db.session.execute(self._row_by_booking_id, {'booking_id': booking_id}).first()
+        return BookingRow._make(row) if row else None
+    
+    def _phone_suffix_filter(self, digits: str):
+        """Rows whose phone ends with digits - an index range scan on phone_reversed"""
+        table = Booking.__table__
+        prefix = reversed_digits(digits)
+        # ':' sorts right after '9', so this range is exactly "starts with prefix"
+        return db.and_(table.c.phone_reversed >= prefix, table.c.phone_reversed < prefix + ':')
+    
+    def _phone_filter(self, phone: str):
+        """
+        Match a phone however it was typed: on its last PHONE_MATCH_DIGITS digits, or exactly
+        if shorter. A phone without digits matches nothing - not every digit-less stored phone.
+        """
+        digits = reversed_digits(phone)[::-1]
+        if not digits:
+            return db.false()
+        if len(digits) >= PHONE_MATCH_DIGITS:
+            return self._phone_suffix_filter(digits[-PHONE_MATCH_DIGITS:])
+        return Booking.__table__.c.phone_normalized == normalize_phone(phone)
+    
+    def _filters(self, booking_id: Optional[str] = None,
+                 phone: Optional[str] = None,
+                 booking_type: Optional[str] = None,
+                 phone_suffix: Optional[str] = None) -> list:
+        """The exact-match filters as Core conditions - usable by ORM queries and Core selects alike"""
+        table = Booking.__table__
+        conditions = []
         if booking_id:
-            query = query.filter_by(booking_id=booking_id)
+            conditions.append(table.c.booking_id == booking_id)
         if phone:
-            query = query.filter_by(phone=phone)
+            conditions.append(self._phone_filter(phone))
+        if phone_suffix:
+            conditions.append(self._phone_suffix_filter(phone_suffix))
         if booking_type:
-            query = query.filter_by(booking_type=booking_type)
+            conditions.append(table.c.booking_type == booking_type)
+        return conditions
+    
+    @staticmethod
+    def _keyset(after: Optional[Tuple[datetime, int]]) -> list:
+        """Condition for rows after (created_at, id) in keyset order"""
+        if not after:
+            return []
+        table = Booking.__table__
+        created_at, id = after
+        return [db.or_(
+            table.c.created_at < created_at,
+            db.and_(table.c.created_at == created_at, table.c.id < id)
+        )]
+    
+    def _search_query(self, booking_id: Optional[str] = None,
+                      phone: Optional[str] = None,
+                      booking_type: Optional[str] = None,
+                      phone_suffix: Optional[str] = None):
+        """Filtered query in keyset order (newest first, id as tie-breaker)"""
+        query = self.model.query.filter(*self._filters(booking_id, phone, booking_type, phone_suffix))
+        return query.order_by(Booking.created_at.desc(), Booking.id.desc())
+    
+    def _search_rows_stmt(self, booking_id: Optional[str] = None,
+                          phone: Optional[str] = None,
+                          booking_type: Optional[str] = None,
+                          phone_suffix: Optional[str] = None):
+        """Core counterpart of _search_query selecting BookingRow columns"""
+        table = Booking.__table__
+        return (
+            self._select_row(BookingRow)
+            .where(*self._filters(booking_id, phone, booking_type, phone_suffix))
+            .order_by(table.c.created_at.desc(), table.c.id.desc())
+        )
+    
+    def search(self, booking_id: Optional[str] = None, 
+               phone: Optional[str] = None, 
+               booking_type: Optional[str] = None,
+               limit: Optional[int] = None,
+               after: Optional[Tuple[datetime, int]] = None,
+               phone_suffix: Optional[str] = None) -> List[Booking]:
+        """
+        Search bookings by filters, one keyset page at a time.
+        after is the (created_at, id) of the last row of the previous page.
+        """
+        query = self._search_query(booking_id, phone, booking_type, phone_suffix).filter(*self._keyset(after))
+        if limit:
+            query = query.limit(limit)
         
         return query.all()
     
-    def get_by_phone(self, phone: str) -> List[Booking]:
-        """Get all bookings by phone number"""
-        return self.model.query.filter_by(phone=phone).all()
+    def search_rows(self, booking_id: Optional[str] = None,
+                    phone: Optional[str] = None,
+                    booking_type: Optional[str] = None,
+                    limit: Optional[int] = None,
+                    after: Optional[Tuple[datetime, int]] = None,
+                    phone_suffix: Optional[str] = None) -> List[BookingRow]:
+        """
+        search() for read-only use: same filters and order, returns BookingRow tuples.
+        The first page of a phone-only lookup is served from booking_cache when possible.
+        """
+        stmt = self._search_rows_stmt(booking_id, phone, booking_type, phone_suffix).where(*self._keyset(after))
+        if limit:
+            stmt = stmt.limit(limit)
+        if phone and not (booking_id or booking_type or phone_suffix or after):
+            self._phone_limits.add(limit)
+            rows = booking_cache.get_or_load(
+                ('phone', self._phone_key(phone), limit), lambda: tuple(self._rows(stmt, BookingRow))
+            )
+            return list(rows)
+        return self._rows(stmt, BookingRow)
+    
+    def iter_search(self, booking_id: Optional[str] = None,
+                    phone: Optional[str] = None,
+                    booking_type: Optional[str] = None,
+                    batch_size: int = 1000,
+                    phone_suffix: Optional[str] = None) -> Iterator[Booking]:
+        """Stream all matching bookings from a server-side cursor, batch_size rows at a time"""
+        query = self._search_query(booking_id, phone, booking_type, phone_suffix)
+        for booking in query.yield_per(batch_size):
+            yield booking
+            # Release each row once serialized so memory stays flat
+            db.session.expunge(booking)
+    
+    def iter_search_rows(self, booking_id: Optional[str] = None,
+                         phone: Optional[str] = None,
+                         booking_type: Optional[str] = None,
+                         batch_size: int = 1000,
+                         phone_suffix: Optional[str] = None) -> Iterator[BookingRow]:
+        """iter_search() for read-only use - nothing is added to the session, so nothing to expunge"""
+        result = db.session.execute(
+            self._search_rows_stmt(booking_id, phone, booking_type, phone_suffix),
+            execution_options={'yield_per': batch_size}
+        )
+        for partition in result.partitions():
+            for row in partition:
+                yield BookingRow._make(row)
+    
+    def fuzzy_search(self, name: Optional[str] = None,
+                     vehicle_model: Optional[str] = None,
+                     limit: int = 50,
+                     candidates: int = 200,
+                     **filters) -> List[BookingRow]:
+        """
+        Bookings whose name and/or vehicle model approximately match, best match first
+        (newest first among equally good matches). filters are the exact-match search filters.
+        Read-only: returns BookingRow tuples.
+        """
+        fields = [(column, text) for column, text in (('name', name), ('vehicle_model', vehicle_model)) if text]
+        matched = []
+        for column, text in fields:
+            terms = self._matching_terms(column, text, candidates)
+            if not terms:
+                return []
+            matched.append((Booking.__table__.c[column], terms))
+        
+        # Walk the first field's matches from best to worst, a score at a time, so
+        # each query reads only the rows it returns from the (field, created_at) index
+        table = Booking.__table__
+        (primary, primary_terms), others = matched[0], matched[1:]
+        stmt = self._select_row(BookingRow).where(*self._filters(**filters))
+        order = []
+        for field, terms in others:
+            stmt = stmt.where(field.in_(terms))
+            order.append(db.case(terms, value=field, else_=0).desc())
+        order += [table.c.created_at.desc(), table.c.id.desc()]
+        
+        groups = {}
+        for term, score in primary_terms.items():
+            groups.setdefault(score, []).append(term)
+        results = []
+        for score in sorted(groups, reverse=True):
+            results += self._rows(
+                stmt.where(primary.in_(groups[score])).order_by(*order).limit(limit - len(results)), BookingRow
+            )
+            if len(results) >= limit:
+                break
+        return results
+    
+    def _matching_terms(self, column: str, text: str, candidates: int) -> Dict[str, float]:
+        """
+        Distinct stored values of column similar to text, with their similarity.
+        The trigram index (SQLite) or a substring scan picks candidates; only those
+        at least MIN_SIMILARITY alike are kept.
+        """
+        match = fts_match(text)
+        if not match:
+            return {}
+        if has_search_index():
+            values = db.session.execute(
+                db.text(
+                    'SELECT t.term FROM booking_terms_fts JOIN booking_terms t ON t.id = booking_terms_fts.rowid '
+                    'WHERE booking_terms_fts MATCH :match ORDER BY booking_terms_fts.rank LIMIT :limit'
+                ),
+                {'match': f'{column} : ({match})', 'limit': candidates}
+            ).scalars()
+        else:
+            # No trigram index (non-SQLite database) - any value containing a query word
+            field = getattr(Booking, column)
+            values = db.session.execute(
+                db.select(field).distinct()
+                .where(db.or_(*(field.ilike(f'%{word}%') for word in text.split())))
+                .limit(candidates)
+            ).scalars()
+        
+        scores = {value: similarity(text, value) for value in values}
+        return {value: score for value, score in scores.items() if score >= MIN_SIMILARITY}
+    
+    EXPORT_COLUMNS = ('id', 'booking_id', 'booking_type', 'name', 'phone',
+                      'vehicle_model', 'preferred_date', 'location', 'created_at')
+    
+    def export_partitions(self, booking_type: Optional[str] = None,
+                          date_from: Optional[date] = None,
+                          date_to: Optional[date] = None,
+                          date_field: str = 'created_at',
+                          batch_size: int = 10000) -> Iterator[List[tuple]]:
+        """
+        Stream EXPORT_COLUMNS of matching bookings as lists of plain row tuples,
+        batch_size rows at a time, through a Core query (no ORM objects).
+        date_from/date_to are inclusive and apply to date_field (created_at or preferred_date).
+        """
+        table = Booking.__table__
+        stmt = db.select(*(table.c[name] for name in self.EXPORT_COLUMNS)).order_by(table.c.id)
+        if booking_type:
+            stmt = stmt.where(table.c.booking_type == booking_type)
+        column = table.c[date_field]
+        if date_from:
+            stmt = stmt.where(column >= date_from)
+        if date_to:
+            # created_at is a timestamp - include the whole last day
+            stmt = stmt.where(column < date_to + timedelta(days=1) if date_field == 'created_at' else column <= date_to)
+        
+        result = db.session.execute(stmt, execution_options={'yield_per': batch_size})
+        for partition in result.partitions():
+            yield partition
+    
+    def get_by_phone(self, phone: str, exact: bool = False) -> List[Booking]:
+        """
+        Get all bookings by phone number, whatever format it was typed in.
+        exact=True requires the same normalised (E.164 style) number.
+        """
+        if exact:
+            normalized = normalize_phone(phone)
+            return self.model.query.filter_by(phone_normalized=normalized).all() if normalized else []
+        return self.model.query.filter(self._phone_filter(phone)).all()
+    
+    def backfill_created_at(self) -> int:
+        """
+        Give rows without created_at (legacy/imported before it was required) the
+        oldest known timestamp, so keyset pages reach them - last, as NULLs sorted
+        before. Returns the number of rows updated.
+        """
+        table = Booking.__table__
+        oldest = db.session.execute(db.select(db.func.min(table.c.created_at))).scalar() or datetime.utcnow()
+        result = db.session.execute(db.update(table).where(table.c.created_at.is_(None)).values(created_at=oldest))
+        db.session.commit()
+        return result.rowcount
+    
+    def backfill_phone_lookup_columns(self, batch_size: int = 1000) -> int:
+        """Populate phone_normalized/phone_reversed for rows written before they existed"""
+        table = Booking.__table__
+        updated = 0
+        while True:
+            rows = db.session.execute(
+                db.select(table.c.id, table.c.phone)
+                .where(table.c.phone_normalized.is_(None))
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+            db.session.execute(
+                db.update(table).where(table.c.id == db.bindparam('row_id')),
+                [
+                    {'row_id': row.id, 'phone_normalized': normalize_phone(row.phone),
+                     'phone_reversed': reversed_digits(row.phone)}
+                    for row in rows
+                ]
+            )
+            db.session.commit()
+            updated += len(rows)
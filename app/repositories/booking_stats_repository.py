@@ -0,0 +1,144 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from app.database import db
+from app.repositories.base import BaseRepository
+from app.models.booking import Booking
+from app.models.booking_daily_stat import BookingDailyStat
+
+GROUP_COLUMNS = {
+    'total': (),
+    'booking_type': ('booking_type',),
+    'vehicle_model': ('vehicle_model',),
+    'booking_type_vehicle_model': ('booking_type', 'vehicle_model'),
+}
+
+
+class BookingStatsRepository(BaseRepository[BookingDailyStat]):
+    """Repository for the BookingDailyStat rollup"""
+    
+    def __init__(self):
+        super().__init__(BookingDailyStat)
+    
+    @staticmethod
+    def _aggregate(bookings: Iterable[Tuple[datetime, str, str, Optional[date]]]) -> Dict[tuple, List[int]]:
+        """Sum (created_at, booking_type, vehicle_model, preferred_date) rows per rollup key"""
+        totals = defaultdict(lambda: [0, 0, 0])
+        for created_at, booking_type, vehicle_model, preferred_date in bookings:
+            day = created_at.date()
+            entry = totals[(day, booking_type, vehicle_model)]
+            entry[0] += 1
+            if preferred_date:
+                entry[1] += (preferred_date - day).days
+                entry[2] += 1
+        return totals
+    
+    def record(self, bookings: Iterable[Tuple[datetime, str, str, Optional[date]]], sign: int = 1) -> None:
+        """
+        Add new bookings, given as (created_at, booking_type, vehicle_model, preferred_date),
+        to the rollup - or subtract them with sign=-1. Runs in the caller's transaction so
+        the rollup commits with the bookings.
+        """
+        stats = BookingDailyStat.__table__
+        for (day, booking_type, vehicle_model), totals in self._aggregate(bookings).items():
+            count, lead_total, lead_count = (sign * value for value in totals)
+            key = (
+                (stats.c.day == day) & (stats.c.booking_type == booking_type)
+                & (stats.c.vehicle_model == vehicle_model)
+            )
+            for _ in range(3):
+                result = db.session.execute(
+                    db.update(stats).where(key).values(
+                        bookings=stats.c.bookings + count,
+                        lead_time_days_total=stats.c.lead_time_days_total + lead_total,
+                        lead_time_bookings=stats.c.lead_time_bookings + lead_count
+                    )
+                )
+                if sign < 0:
+                    # Emptied rows would show up as zero-booking groups
+                    db.session.execute(db.delete(stats).where(key, stats.c.bookings <= 0))
+                    break
+                if result.rowcount:
+                    break
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(db.insert(stats).values(
+                            day=day, booking_type=booking_type, vehicle_model=vehicle_model, bookings=count,
+                            lead_time_days_total=lead_total, lead_time_bookings=lead_count
+                        ))
+                    break
+                except IntegrityError:
+                    # Another worker inserted the row first - add to it instead
+                    continue
+            else:
+                raise RuntimeError(f"Could not update booking stats for {day}")
+    
+    def remove(self, bookings: Iterable[Tuple[datetime, str, str, Optional[date]]]) -> None:
+        """Subtract deleted bookings (or the old values of updated ones) from the rollup"""
+        self.record(bookings, sign=-1)
+    
+    def rebuild(self, batch_size: int = 10000) -> int:
+        """Recompute the whole rollup from the bookings table. Returns the number of rollup rows."""
+        table = Booking.__table__
+        result = db.session.execute(
+            db.select(table.c.created_at, table.c.booking_type, table.c.vehicle_model, table.c.preferred_date)
+            .where(table.c.created_at.is_not(None)),
+            execution_options={'yield_per': batch_size}
+        )
+        totals = defaultdict(lambda: [0, 0, 0])
+        for partition in result.partitions():
+            for key, (count, lead_total, lead_count) in self._aggregate(partition).items():
+                entry = totals[key]
+                entry[0] += count
+                entry[1] += lead_total
+                entry[2] += lead_count
+        
+        stats = BookingDailyStat.__table__
+        db.session.execute(db.delete(stats))
+        if totals:
+            db.session.execute(db.insert(stats), [
+                {'day': day, 'booking_type': booking_type, 'vehicle_model': vehicle_model, 'bookings': count,
+                 'lead_time_days_total': lead_total, 'lead_time_bookings': lead_count}
+                for (day, booking_type, vehicle_model), (count, lead_total, lead_count) in totals.items()
+            ])
+        db.session.commit()
+        return len(totals)
+    
+    def series(self, date_from: date, date_to: date,
+               booking_type: Optional[str] = None,
+               vehicle_model: Optional[str] = None,
+               group_by: str = 'total') -> List[Dict]:
+        """
+        Daily totals between date_from and date_to (inclusive), optionally split by
+        booking type and/or vehicle model (see GROUP_COLUMNS). Reads only the rollup rows.
+        """
+        stats = BookingDailyStat.__table__
+        dimensions = [stats.c[name] for name in GROUP_COLUMNS[group_by]]
+        stmt = (
+            db.select(
+                stats.c.day, *dimensions,
+                db.func.sum(stats.c.bookings).label('bookings'),
+                db.func.sum(stats.c.lead_time_days_total).label('lead_time_days_total'),
+                db.func.sum(stats.c.lead_time_bookings).label('lead_time_bookings')
+            )
+            .where(stats.c.day >= date_from, stats.c.day <= date_to)
+            .group_by(stats.c.day, *dimensions)
+            .order_by(stats.c.day, *dimensions)
+        )
+        if booking_type:
+            stmt = stmt.where(stats.c.booking_type == booking_type)
+        if vehicle_model:
+            stmt = stmt.where(stats.c.vehicle_model == vehicle_model)
+        
+        return [
+            {
+                'day': row.day.isoformat(),
+                **{column.name: getattr(row, column.name) for column in dimensions},
+                'bookings': row.bookings,
+                'avg_lead_time_days': (
+                    round(row.lead_time_days_total / row.lead_time_bookings, 2) if row.lead_time_bookings else None
+                )
+            }
+            for row in db.session.execute(stmt)
+        ]
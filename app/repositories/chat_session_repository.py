@@ -0,0 +1,14 @@
+from typing import Optional
+from app.repositories.base import BaseRepository
+from app.models.chat_session import ChatSession
+
+
+class ChatSessionRepository(BaseRepository[ChatSession]):
+    """Repository for ChatSession model"""
+    
+    def __init__(self):
+        super().__init__(ChatSession)
+    
+    def get_for_user(self, session_id: str, user_id: Optional[int]) -> Optional[ChatSession]:
+        """Get a session by session_id, only if it belongs to the user"""
+        return self.model.query.filter_by(session_id=session_id, user_id=user_id).first()
@@ -1,6 +1,6 @@
 from typing import List
 from app.repositories.base import BaseRepository
-from app.models.policy_document import PolicyDocument
+from app.models.policy_document import PolicyDocument, PolicySummaryRow
 
 
 class PolicyDocumentRepository(BaseRepository[PolicyDocument]):
@@ -11,11 +11,18 @@ class PolicyDocumentRepository(BaseRepository[PolicyDocument]):
     
     def get_all_content(self) -> str:
         """Get all policy content combined"""
-        documents = self.get_all()
-        return "\n\n---\n\n".join([doc.content for doc in documents])
+        # Select the deferred column directly so all blobs load in one query
+        rows = self.model.query.with_entities(PolicyDocument.content).all()
+        return "\n\n---\n\n".join([row.content for row in rows])
     
     def get_recent(self, limit: int = 10) -> List[PolicyDocument]:
         """Get most recently uploaded policies"""
         return self.model.query.order_by(
-            PolicyDocument.uploaded_at.desc()
+            PolicyDocument.uploaded_at.desc(), PolicyDocument.id.desc()
         ).limit(limit).all()
+    
+    def list_recent(self, limit: int = 50) -> List[PolicySummaryRow]:
+        """Newest policies for listings - metadata columns only, read-only tuples"""
+        table = PolicyDocument.__table__
+        stmt = self._select_row(PolicySummaryRow).order_by(table.c.uploaded_at.desc(), table.c.id.desc()).limit(limit)
+        return self._rows(stmt, PolicySummaryRow)
@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class QueryStatsParams(BaseModel):
+    """Query stats view parameters"""
+    top_callers: int = Field(10, ge=0, le=100, description="Repository methods listed per endpoint, slowest first")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Literal, Optional
 from datetime import date
 
 
@@ -10,6 +10,7 @@ class BookingCreate(BaseModel):
     phone: str = Field(..., min_length=1, description="Phone number")
     vehicle_model: str = Field(..., min_length=1, description="Vehicle model")
     preferred_date: Optional[date] = Field(None, description="Preferred date")
+    location: Optional[str] = Field(None, max_length=50, description="Branch (default: main site)")
     natural_language: Optional[str] = Field(None, description="Natural language booking text (alternative to structured fields)")
     
     class Config:
@@ -33,6 +34,7 @@ class BookingResponse(BaseModel):
     phone: str
     vehicle_model: str
     preferred_date: Optional[str]
+    location: Optional[str] = None
     created_at: str
     
     class Config:
@@ -42,5 +44,39 @@ class BookingResponse(BaseModel):
 class BookingSearchParams(BaseModel):
     """Booking search parameters"""
     booking_id: Optional[str] = Field(None, description="Search by booking ID")
-    phone: Optional[str] = Field(None, description="Search by phone number")
+    phone: Optional[str] = Field(None, pattern=r"\d", description="Search by phone number (any format, at least one digit)")
+    phone_suffix: Optional[str] = Field(None, pattern=r"^\d{4,15}$", description="Search by the last digits of the phone number")
     booking_type: Optional[str] = Field(None, description="Filter by booking type")
+    name: Optional[str] = Field(None, min_length=2, max_length=100, description="Fuzzy search by customer name")
+    vehicle_model: Optional[str] = Field(None, min_length=2, max_length=100, description="Fuzzy search by vehicle model")
+    limit: Optional[int] = Field(None, ge=1, description="Page size")
+    cursor: Optional[str] = Field(None, description="next_cursor from the previous page")
+    stream: Optional[Literal["ndjson", "json"]] = Field(None, description="Stream all matches instead of paginating")
+
+
+class BookingExportParams(BaseModel):
+    """Booking export parameters"""
+    format: Literal["csv", "parquet", "arrow"] = Field("csv", description="Export file format")
+    booking_type: Optional[str] = Field(None, description="Filter by booking type")
+    date_from: Optional[date] = Field(None, description="First day to include (inclusive)")
+    date_to: Optional[date] = Field(None, description="Last day to include (inclusive)")
+    date_field: Literal["created_at", "preferred_date"] = Field("created_at", description="Date the range applies to")
+
+
+class BookingAnalyticsParams(BaseModel):
+    """Booking analytics parameters"""
+    date_from: Optional[date] = Field(None, description="First day (inclusive, default 30 days before date_to)")
+    date_to: Optional[date] = Field(None, description="Last day (inclusive, default today)")
+    booking_type: Optional[str] = Field(None, description="Filter by booking type")
+    vehicle_model: Optional[str] = Field(None, description="Filter by vehicle model")
+    group_by: Literal["total", "booking_type", "vehicle_model", "booking_type_vehicle_model"] = Field(
+        "total", description="Split each day by booking type and/or vehicle model"
+    )
+
+
+class AvailabilityParams(BaseModel):
+    """Booking availability parameters"""
+    date_from: Optional[date] = Field(None, description="First day (inclusive, default today)")
+    date_to: Optional[date] = Field(None, description="Last day (inclusive, default 13 days after date_from)")
+    booking_type: Optional[str] = Field(None, description="Only this booking type")
+    location: Optional[str] = Field(None, max_length=50, description="Branch (default: main site)")
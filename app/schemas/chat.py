@@ -11,13 +11,14 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     """Chat request schema"""
     message: str = Field(..., min_length=1, description="User message")
-    chat_history: Optional[List[ChatMessage]] = Field(default_factory=list, description="Previous chat messages")
+    session_id: Optional[str] = Field(None, description="Server-side chat session ID returned by a previous response")
+    chat_history: Optional[List[ChatMessage]] = Field(default_factory=list, description="Previous chat messages (only used to seed a new session)")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "message": "What services do you offer?",
-                "chat_history": []
+                "session_id": None
             }
         }
 
@@ -27,12 +28,14 @@ class ChatResponse(BaseModel):
     response: str = Field(..., description="AI assistant response")
     intent: Optional[str] = Field(None, description="Detected intent (service_booking, test_drive_booking, general_question)")
     booking_flow: Optional[bool] = Field(None, description="Whether booking flow is active")
+    session_id: Optional[str] = Field(None, description="Chat session ID to send with the next message")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "response": "We offer comprehensive vehicle services including...",
                 "intent": "general_question",
-                "booking_flow": False
+                "booking_flow": False,
+                "session_id": "3f2b9c0e8d7a4b6f9e1c2d3a4b5c6d7e"
             }
         }
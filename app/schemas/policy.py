@@ -24,6 +24,11 @@ class PolicyUploadResponse(BaseModel):
         }
 
 
+class PolicyListParams(BaseModel):
+    """Policy listing parameters"""
+    limit: int = Field(50, ge=1, le=500, description="Number of policies to return, newest first")
+
+
 class PolicyQuestionRequest(BaseModel):
     """Policy question request schema"""
     question: str = Field(..., min_length=1, description="Question about HR policies")
@@ -0,0 +1,186 @@
+"""
+Seed users and bookings from the bundled Excel workbooks.
+
+Run explicitly with `flask --app run seed` (or at startup with SEED_ON_STARTUP=true).
+Workbooks are streamed with openpyxl in read-only mode and inserted in batches of
+plain mappings, so memory stays flat however large they are. Password hashing
+(PASSWORD_HASH_METHOD, deliberately slow) runs across a process pool for the seed
+command and on the in-process hashing threads when seeding at startup. Rows whose
+username or booking ID already exists are skipped, so seeding twice is harmless.
+"""
+import os
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+from werkzeug.datastructures import FileStorage
+from werkzeug.security import generate_password_hash
+from app.database import db
+from app.utils import passwords as passwords_util
+from app.utils.file_processor import read_table_rows
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+USERS_FILE = os.path.join(BASE_DIR, 'users.xlsx')
+BOOKINGS_FILE = os.path.join(BASE_DIR, 'bookings.xlsx')
+
+# Workbook headers ("Booking Type", "DateTime", ...) -> bookings columns
+BOOKING_COLUMNS = {
+    'booking_id': 'booking_id',
+    'booking_type': 'booking_type',
+    'name': 'name',
+    'phone': 'phone',
+    'vehicle_model': 'vehicle_model',
+    'preferred_date': 'preferred_date',
+    'location': 'location',
+    'datetime': 'created_at',
+    'created_at': 'created_at',
+}
+
+
+def _read_rows(path: str) -> Iterator[Dict]:
+    """Stream a CSV/XLSX file as dicts keyed by snake_case header"""
+    with open(path, 'rb') as stream:
+        fields = {}
+        for _, raw in read_table_rows(FileStorage(stream=stream, filename=path)):
+            row = {}
+            for header, value in raw.items():
+                if header not in fields:
+                    fields[header] = "_".join(header.lower().replace("-", " ").split())
+                row[fields[header]] = value
+            yield row
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[List]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _to_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        return None
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def hash_passwords(passwords: List[str], pool: Optional[ProcessPoolExecutor] = None, workers: int = 1) -> List[str]:
+    """
+    Hash passwords, split across the process pool (of workers processes) when given
+    one, otherwise on app.utils.passwords' thread pool
+    """
+    if pool is None or len(passwords) < 2:
+        return passwords_util.hash_passwords(passwords)
+    # The configured method is passed along - pool processes may not have run create_app
+    hash_one = partial(generate_password_hash, method=passwords_util.current_method())
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(pool.map(hash_one, passwords, chunksize=chunksize))
+
+
+def seed_users(path: str = USERS_FILE, batch_size: int = 1000, workers: Optional[int] = None) -> int:
+    """
+    Insert users from a workbook (username, password[, role]). Returns the number added.
+    workers > 1 hashes on a process pool (the seed command); by default - e.g. seeding
+    at startup on a serverless host, where process pools are unavailable - passwords
+    are hashed on the in-process hashing threads.
+    """
+    from app.models.user import User
+    
+    workers = workers or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    added = 0
+    try:
+        for batch in _batches(_read_rows(path), batch_size):
+            batch = [row for row in batch if row.get('username') and row.get('password')]
+            existing = set(db.session.execute(
+                db.select(User.username).where(User.username.in_([row['username'] for row in batch]))
+            ).scalars())
+            batch = [row for row in batch if row['username'] not in existing]
+            if not batch:
+                continue
+            hashes = hash_passwords([str(row['password']) for row in batch], pool, workers)
+            # ORM bulk insert from plain mappings - no per-row objects or identity map
+            db.session.execute(db.insert(User), [
+                {'username': row['username'], 'password': password_hash, 'role': row.get('role', 'Employee')}
+                for row, password_hash in zip(batch, hashes)
+            ])
+            db.session.commit()
+            added += len(batch)
+    finally:
+        if pool:
+            pool.shutdown()
+    return added
+
+
+def seed_bookings(path: str = BOOKINGS_FILE, batch_size: int = 1000) -> int:
+    """
+    Insert bookings from a workbook, keeping their booking IDs. The daily rollup is
+    updated with each batch; capacity counters are recounted at the end.
+    Returns the number added.
+    """
+    from app.models.booking import Booking
+    from app.repositories.booking_repository import BookingRepository
+    from app.repositories.booking_capacity_repository import BookingCapacityRepository
+    from app.services.autosphere_service import AutoSphereService
+    
+    repo = BookingRepository()
+    added = 0
+    for batch in _batches(_read_rows(path), batch_size):
+        rows = []
+        for raw in batch:
+            row = {column: raw[key] for key, column in BOOKING_COLUMNS.items() if key in raw}
+            if not row.get('booking_id'):
+                continue
+            row.setdefault('booking_type', 'Service')
+            for column in ('name', 'phone', 'vehicle_model'):
+                row[column] = str(row.get(column, ''))
+            row['preferred_date'] = _to_date(row['preferred_date']) if row.get('preferred_date') else None
+            if 'created_at' in row:
+                row['created_at'] = _to_datetime(row['created_at']) or datetime.utcnow()
+            rows.append(row)
+        
+        existing = set(db.session.execute(
+            db.select(Booking.booking_id).where(Booking.booking_id.in_([row['booking_id'] for row in rows]))
+        ).scalars())
+        rows = [row for row in rows if row['booking_id'] not in existing]
+        if not rows:
+            continue
+        # insert_many expects every row to have the same keys
+        for row in rows:
+            row.setdefault('location', None)
+            row.setdefault('created_at', datetime.utcnow())
+        repo.insert_many(rows)
+        added += len(rows)
+    
+    if added:
+        BookingCapacityRepository().rebuild_reserved(AutoSphereService.default_capacity)
+    return added
+
+
+def seed(users_path: Optional[str] = USERS_FILE, bookings_path: Optional[str] = BOOKINGS_FILE,
+         batch_size: int = 1000, workers: Optional[int] = None) -> Dict[str, int]:
+    """Seed users and bookings from whichever workbooks exist. Returns counts added."""
+    result = {'users': 0, 'bookings': 0}
+    if users_path and os.path.exists(users_path):
+        result['users'] = seed_users(users_path, batch_size=batch_size, workers=workers)
+    if bookings_path and os.path.exists(bookings_path):
+        result['bookings'] = seed_bookings(bookings_path, batch_size=batch_size)
+    return result
@@ -1,6 +1,6 @@
-from werkzeug.security import check_password_hash
 from app.repositories.user_repository import UserRepository
 from app.middleware.auth import generate_token
+from app.utils.passwords import hash_password, needs_rehash, verify_password
 
 
 class AuthService:
@@ -19,9 +19,12 @@ class AuthService:
         if not user:
             return None
         
-        if not check_password_hash(user.password, password):
+        if not verify_password(user.password, password):
             return None
         
+        if needs_rehash(user.password):
+            self._rehash(user, password)
+        
         # Generate JWT token
         token = generate_token(user.id, user.username, user.role)
         
@@ -29,3 +32,12 @@ class AuthService:
             'token': token,
             'user': user.to_dict()
         }
+    
+    def _rehash(self, user, password: str) -> None:
+        """Re-hash a verified password with the configured PASSWORD_HASH_METHOD"""
+        try:
+            self.user_repo.update(user, password=hash_password(password))
+        except Exception as e:
+            # The old hash still verifies - retried on the next login
+            self.user_repo.rollback()
+            print(f"Warning: Could not re-hash password for user {user.id}: {e}")
@@ -1,28 +1,52 @@
 import json
 import ast
-import random
-from datetime import datetime
-from typing import Dict, Optional, List
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, Optional, List, Tuple
+from app.config import Config
 from app.utils.openai_client import get_openai_client
-from app.utils.vectorstore import load_vectorstore
-from app.repositories.booking_repository import BookingRepository
+from app.utils.vectorstore import get_vectorstore
+from app.repositories.booking_repository import BookingRepository, booking_cache
+from app.repositories.booking_capacity_repository import BookingCapacityRepository, CapacityExceededError
+from app.repositories.chat_session_repository import ChatSessionRepository
+from app.models.chat_session import ChatSession
+from app.services.booking_slot_filler import BookingSlotFiller
+from app.utils.booking_parser import BOOKING_FIELDS, parse_booking_text
+from app.utils.location import normalize_location
+from app.utils import metrics
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.file_processor import read_table_rows
+from app.utils.export import EXPORT_FORMATS, arrow_chunks, csv_chunks, parquet_chunks
+from app.schemas.booking import BookingCreate
+from pydantic import ValidationError
 
 
 class AutoSphereService:
     """Service for AutoSphere Motors AI operations"""
     
     LLM_MODEL = "gpt-4o"
+    SUMMARY_MODEL = "gpt-4o-mini"
+    INTENTS = ["service_booking", "test_drive_booking", "general_question"]
+    BOOKING_TYPES = ["Service", "Test Drive"]
+    CANCEL_MESSAGES = ["cancel", "stop", "never mind", "nevermind", "cancel booking"]
     
     def __init__(self):
-        self.client = get_openai_client()
+        self._client = None
         self.booking_repo = BookingRepository()
-        self.vectorstore = None  # Lazy load
+        self.capacity_repo = BookingCapacityRepository()
+        self.session_repo = ChatSessionRepository()
+        self.slot_filler = BookingSlotFiller(lambda prompt: self._ask_llm(prompt, temperature=0))
+    
+    @property
+    def client(self):
+        """OpenAI client, created on the first LLM call (booking endpoints never need it)"""
+        if self._client is None:
+            self._client = get_openai_client()
+        return self._client
     
     def _get_vectorstore(self):
-        """Lazy load vectorstore"""
-        if self.vectorstore is None:
-            self.vectorstore = load_vectorstore()
-        return self.vectorstore
+        """Get the process-wide vectorstore (preloaded at startup when enabled)"""
+        return get_vectorstore()
     
     def _ask_llm(self, prompt: str, model: str = None, temperature: float = 0.2) -> str:
         """Helper to call OpenAI LLM"""
@@ -35,10 +59,17 @@ class AutoSphereService:
         return response.choices[0].message.content
     
     def generate_booking_id(self) -> str:
-        """Generate unique booking ID"""
+        """
+        Generate unique booking ID (AS-YYYYMMDD-NNNN, numbered per day).
+        Must be called inside the transaction that inserts the booking.
+        """
+        return self.generate_booking_ids(1)[0]
+    
+    def generate_booking_ids(self, count: int) -> List[str]:
+        """Generate count consecutive booking IDs in one counter update (same transaction rule)"""
         date_part = datetime.now().strftime("%Y%m%d")
-        random_part = random.randint(1000, 9999)
-        return f"AS-{date_part}-{random_part}"
+        first = self.booking_repo.reserve_booking_numbers(date_part, count)
+        return [f"AS-{date_part}-{number:04d}" for number in range(first, first + count)]
     
     def classify_intent(self, user_message: str) -> str:
         """Classify user intent"""
@@ -55,7 +86,16 @@ class AutoSphereService:
         return response.strip().lower()
     
     def extract_booking_details(self, user_text: str) -> Optional[Dict]:
-        """Extract booking details from natural language text"""
+        """
+        Extract booking details from natural language text.
+        Local parsers run first; the LLM is only called when required fields are still missing.
+        """
+        data, _ = parse_booking_text(user_text)
+        if all(data.get(k) for k in BOOKING_FIELDS):
+            metrics.increment("booking_extraction.local")
+            return data
+        
+        metrics.increment("booking_extraction.llm")
         prompt = f"""
         Extract only the booking details from the text and return as JSON with double quotes.
         Do not add extra text.
@@ -74,73 +114,268 @@ class AutoSphereService:
         text = response.strip()
         
         # Try JSON parsing
+        llm_data = None
         try:
-            data = json.loads(text)
-            if all(k in data for k in ["Name", "Phone", "Vehicle Model", "Preferred Date"]):
-                return data
+            llm_data = json.loads(text)
         except:
             try:
-                data = ast.literal_eval(text)
-                if isinstance(data, dict) and all(k in data for k in ["Name", "Phone", "Vehicle Model", "Preferred Date"]):
-                    return data
+                llm_data = ast.literal_eval(text)
             except:
                 pass
         
-        # Fallback: line-by-line parsing
-        data = {}
-        lines = user_text.splitlines()
-        for line in lines:
-            if ":" in line:
-                key, val = line.split(":", 1)
-                key = key.strip().lower()
-                val = val.strip()
-                if key in ["name", "phone", "vehicle model", "preferred date"]:
-                    data[key.title()] = val
-        
-        if len(data) == 4:
+        if isinstance(llm_data, dict):
+            # Locally parsed values are already normalised - keep them
+            data = {**{k: llm_data[k] for k in BOOKING_FIELDS if llm_data.get(k)}, **data}
+        
+        if all(data.get(k) for k in BOOKING_FIELDS):
             return data
         
         return None
     
-    def chat(self, message: str, chat_history: Optional[List[Dict]] = None) -> Dict:
-        """Handle AI assistant chat"""
-        chat_history = chat_history or []
+    def _get_session(self, session_id: Optional[str], user_id: Optional[int],
+                     chat_history: List[Dict]) -> ChatSession:
+        """Load the user's chat session, or start a new one (seeded from client history)"""
+        if session_id:
+            session = self.session_repo.get_for_user(session_id, user_id)
+            if session:
+                return session
+        
+        # Unknown or foreign session ids always get a fresh id
+        session = ChatSession(session_id=uuid.uuid4().hex, user_id=user_id, summary='')
+        session.turns = [
+            {"role": msg["role"], "content": msg["content"]}
+            for msg in chat_history[-2 * Config.CHAT_HISTORY_MESSAGES:]
+            if msg.get("role") in ("user", "assistant")
+        ]
+        return session
+    
+    def _history_messages(self, session: ChatSession) -> List[Dict]:
+        """Summary plus verbatim recent turns, as chat completion messages"""
+        messages = []
+        if session.summary:
+            messages.append({"role": "system", "content": "Summary of the earlier conversation:\n" + session.summary})
+        return messages + session.turns
+    
+    def _summarize(self, summary: str, turns: List[Dict]) -> str:
+        """Fold older turns into the rolling summary"""
+        transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+        if Config.CHAT_SUMMARY_MODE == "llm":
+            prompt = f"""
+            Update the conversation summary with the new messages.
+            Keep names, phone numbers, vehicle models, dates and open requests.
+            Return only the summary, at most {Config.CHAT_SUMMARY_MAX_CHARS} characters.
+            
+            Current summary:
+            {summary or "(empty)"}
+            
+            New messages:
+            {transcript}
+            """
+            try:
+                return self._ask_llm(prompt, model=self.SUMMARY_MODEL, temperature=0).strip()[:Config.CHAT_SUMMARY_MAX_CHARS]
+            except Exception as e:
+                print(f"Warning: Chat summarization failed, using extractive summary: {e}")
+        
+        # Extractive: keep the first sentence of each user message, newest last
+        lines = [line for line in summary.splitlines() if line]
+        for turn in turns:
+            if turn["role"] == "user":
+                first_sentence = turn["content"].strip().split("\n")[0].split(". ")[0]
+                lines.append(f"- User: {first_sentence[:200]}")
+        while lines and len("\n".join(lines)) > Config.CHAT_SUMMARY_MAX_CHARS:
+            lines.pop(0)
+        return "\n".join(lines)
+    
+    def _record_turn(self, session: ChatSession, message: str, reply: str):
+        """Append a turn, folding overflow into the summary, and persist the session"""
+        turns = session.turns + [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": reply}
+        ]
+        keep = Config.CHAT_HISTORY_MESSAGES
+        summary = session.summary or ''
+        # Fold only once the window has doubled so summarization runs every keep/2 turns
+        if len(turns) > 2 * keep:
+            summary = self._summarize(summary, turns[:-keep])
+            turns = turns[-keep:]
+        
+        if session.id is None:
+            self.session_repo.create(
+                session_id=session.session_id,
+                user_id=session.user_id,
+                summary=summary,
+                recent_turns=json.dumps(turns),
+                booking_state=session.booking_state
+            )
+        else:
+            self.session_repo.update(
+                session,
+                summary=summary,
+                recent_turns=json.dumps(turns),
+                booking_state=session.booking_state
+            )
+    
+    def _retrieve_context(self, message: str) -> str:
+        """Retrieve knowledge base context for a message"""
+        vectorstore = self._get_vectorstore()
+        docs = vectorstore.similarity_search(message, k=3)
+        return "\n".join([doc.page_content for doc in docs])
+    
+    def _advance_booking(self, session: ChatSession, message: str, allow_llm: bool = True) -> str:
+        """
+        Fill booking slots from the message; create the booking once all are known.
+        Returns the assistant reply. session.booking is cleared when the booking is created.
+        """
+        state = self.slot_filler.fill(session.booking, message, allow_llm=allow_llm)
+        session.booking = state
+        if self.slot_filler.missing(state):
+            return self.slot_filler.prompt(state)
+        
+        slots = state["slots"]
+        try:
+            booking = self.create_booking(
+                booking_type=state["booking_type"],
+                name=slots["Name"],
+                phone=slots["Phone"],
+                vehicle_model=slots["Vehicle Model"],
+                preferred_date=slots["Preferred Date"]
+            )
+        except CapacityExceededError:
+            # Keep the other details and ask for a different date
+            full_date = slots.pop("Preferred Date")
+            session.booking = state
+            return (
+                f"Sorry, we're fully booked for {state['booking_type']} on {full_date}. "
+                "Which other date (YYYY-MM-DD) works for you?"
+            )
+        except Exception as e:
+            print(f"Warning: Chat booking failed: {e}")
+            return "Sorry, I couldn't save your booking just now. Please send your details again."
+        
+        session.booking = None
+        return (
+            f"{state['booking_type']} booking confirmed! Booking ID: {booking['booking_id']}\n"
+            f"Name: {booking['name']}, Phone: {booking['phone']}, "
+            f"Vehicle Model: {booking['vehicle_model']}, Preferred Date: {booking['preferred_date']}"
+        )
+    
+    def _classify_and_answer(self, message: str, history: List[Dict]) -> Tuple[str, str]:
+        """
+        Classify intent and answer general questions in a single LLM call.
+        Returns (intent, answer); answer is empty for booking intents.
+        """
+        context = self._retrieve_context(message)
+        response = self.client.chat.completions.create(
+            model=self.LLM_MODEL,
+            messages=[
+                {"role": "system", "content": (
+                    "You are AutoSphere AI. Classify the user's intent as one of "
+                    "service_booking, test_drive_booking or general_question. "
+                    "For general_question, answer the user using the context. "
+                    'Return only JSON: {"intent": "...", "answer": "..."} '
+                    "with an empty answer for booking intents."
+                )},
+                *history,
+                {"role": "user", "content": context + "\nUser: " + message}
+            ],
+            temperature=0.2,
+            response_format={"type": "json_object"}
+        )
+        text = response.choices[0].message.content
         
-        # Classify intent
-        intent = self.classify_intent(message)
+        try:
+            data = json.loads(text)
+            intent = str(data.get("intent", "general_question")).strip().lower()
+            answer = str(data.get("answer") or "")
+        except (ValueError, AttributeError):
+            # Not valid JSON - treat the whole reply as the answer
+            return "general_question", text
+        
+        if intent not in self.INTENTS:
+            intent = "general_question"
+        return intent, answer
+    
+    def chat(self, message: str, chat_history: Optional[List[Dict]] = None,
+             session_id: Optional[str] = None, user_id: Optional[int] = None) -> Dict:
+        """
+        Handle AI assistant chat.
+        Context comes from the server-side session; chat_history only seeds a new session.
+        """
+        chat_history = chat_history or []
+        session = self._get_session(session_id, user_id, chat_history)
+        history = self._history_messages(session)
         booking_flow = False
         
+        if session.booking:
+            # Booking in progress - keep filling slots without classifying the message
+            intent = "service_booking" if session.booking["booking_type"] == "Service" else "test_drive_booking"
+            if message.strip().lower().rstrip(".!") in self.CANCEL_MESSAGES:
+                session.booking = None
+                response_text = "Okay, I've cancelled that booking. How else can I help?"
+            else:
+                response_text = self._advance_booking(session, message)
+            self._record_turn(session, message, response_text)
+            return {
+                "response": response_text,
+                "intent": intent,
+                "booking_flow": session.booking is not None,
+                "session_id": session.session_id
+            }
+        
+        if Config.CHAT_MODE == "single":
+            # Retrieval first, then one call that both classifies and answers
+            intent, response_text = self._classify_and_answer(message, history)
+        else:
+            # Classify intent
+            intent = self.classify_intent(message)
+            response_text = None
+        
         # Handle booking intents
         if intent in ["service_booking", "test_drive_booking"]:
-            booking_flow = True
             booking_type = "Service" if intent == "service_booking" else "Test Drive"
-            response_text = f"Sure! Let's book your {booking_type}.\nPlease provide Name, Phone, Vehicle Model, Preferred Date (YYYY-MM-DD) in one message."
-        else:
+            session.booking = self.slot_filler.start(booking_type)
+            # Only local parsers on the opening message - it is usually just the request
+            response_text = self._advance_booking(session, message, allow_llm=False)
+            booking_flow = session.booking is not None
+        elif response_text is None:
             # General question - use RAG
-            vectorstore = self._get_vectorstore()
-            docs = vectorstore.similarity_search(message, k=3)
-            context = "\n".join([doc.page_content for doc in docs])
+            context = self._retrieve_context(message)
             
             response = self.client.chat.completions.create(
                 model=self.LLM_MODEL,
                 messages=[
                     {"role": "system", "content": "You are AutoSphere AI."},
+                    *history,
                     {"role": "user", "content": context + "\nUser: " + message}
                 ],
                 temperature=0.2
             )
             response_text = response.choices[0].message.content
         
+        self._record_turn(session, message, response_text)
+        
         return {
             "response": response_text,
             "intent": intent,
-            "booking_flow": booking_flow
+            "booking_flow": booking_flow,
+            "session_id": session.session_id
         }
     
+    @staticmethod
+    def default_capacity(booking_type: str) -> int:
+        """Bookings accepted per day for a booking type unless overridden for that date"""
+        return BookingCapacityRepository.default_capacity(booking_type)
+    
     def create_booking(self, booking_type: str, name: str, phone: str, 
                       vehicle_model: str, preferred_date: Optional[str] = None,
-                      natural_language: Optional[str] = None) -> Dict:
-        """Create a booking"""
+                      natural_language: Optional[str] = None,
+                      location: Optional[str] = None) -> Dict:
+        """
+        Create a booking.
+        Raises CapacityExceededError if the preferred date has no slots left and
+        ValueError for a location not in BOOKING_LOCATIONS.
+        """
+        location = normalize_location(location)
         # If natural language provided, try to extract details
         if natural_language:
             extracted = self.extract_booking_details(natural_language)
@@ -150,9 +385,6 @@ class AutoSphereService:
                 vehicle_model = extracted.get("Vehicle Model", vehicle_model)
                 preferred_date = extracted.get("Preferred Date", preferred_date)
         
-        # Generate booking ID
-        booking_id = self.generate_booking_id()
-        
         # Parse preferred_date if string
         from datetime import datetime as dt
         preferred_date_obj = None
@@ -162,6 +394,17 @@ class AutoSphereService:
             except:
                 pass
         
+        if preferred_date_obj:
+            # Reserved in the booking's transaction - released again if the insert fails.
+            # A refusal only rolls back the reservation's savepoint, so chat state written
+            # earlier in the request (the booking slots) survives it.
+            self.capacity_repo.reserve(
+                preferred_date_obj, booking_type, location, self.default_capacity(booking_type)
+            )
+        
+        # Generate booking ID last - it holds the counter lock until the insert commits
+        booking_id = self.generate_booking_id()
+        
         # Create booking
         booking = self.booking_repo.create(
             booking_id=booking_id,
@@ -169,25 +412,284 @@ class AutoSphereService:
             name=name,
             phone=phone,
             vehicle_model=vehicle_model,
-            preferred_date=preferred_date_obj
+            preferred_date=preferred_date_obj,
+            location=location or None
         )
         
         return booking.to_dict()
     
+    # Spreadsheet headers ("Booking Type", "vehicle model", ...) -> BookingCreate fields
+    IMPORT_FIELDS = ("booking_type", "name", "phone", "vehicle_model", "preferred_date", "location")
+    
+    def import_bookings(self, file) -> Dict:
+        """
+        Import bookings from an uploaded CSV/XLSX file.
+        Rows are validated with BookingCreate; valid rows are inserted in batches of
+        BOOKINGS_IMPORT_BATCH_SIZE, one transaction and one block of booking IDs per batch.
+        Rows beyond a date's remaining capacity are rejected, in file order.
+        Returns {"imported", "failed", "booking_ids", "errors": [{"row", "errors"}]}.
+        Raises ValueError for an unreadable file.
+        """
+        booking_ids, errors, batch = [], [], []
+        
+        def reserve_slots():
+            # All (date, type, location) groups of the batch reserved together, inside the batch transaction
+            groups = {}
+            for number, booking in batch:
+                if booking["preferred_date"]:
+                    key = (booking["preferred_date"], booking["booking_type"], booking["location"] or '')
+                    groups.setdefault(key, []).append(number)
+            rejected = {}
+            if not groups:
+                return rejected
+            taken = self.capacity_repo.reserve_many(
+                {key: len(numbers) for key, numbers in groups.items()}, self.default_capacity
+            )
+            for key, numbers in groups.items():
+                message = str(CapacityExceededError(*key))
+                rejected.update((number, message) for number in numbers[taken[key]:])
+            return rejected
+        
+        def flush():
+            try:
+                rejected = reserve_slots()
+                rows = [booking for number, booking in batch if number not in rejected]
+                if rows:
+                    for booking, booking_id in zip(rows, self.generate_booking_ids(len(rows))):
+                        booking["booking_id"] = booking_id
+                    self.booking_repo.insert_many(rows)
+                    booking_ids.extend(row["booking_id"] for row in rows)
+                else:
+                    self.booking_repo.rollback()
+                errors.extend({"row": number, "errors": [message]} for number, message in rejected.items())
+            except Exception as e:
+                self.booking_repo.rollback()
+                errors.extend({"row": number, "errors": [f"Could not save: {str(e)}"]} for number, _ in batch)
+            batch.clear()
+        
+        fields = {}
+        for number, raw in read_table_rows(file):
+            values = {}
+            for header, value in raw.items():
+                if header not in fields:
+                    fields[header] = "_".join(header.lower().replace("-", " ").split())
+                if fields[header] in self.IMPORT_FIELDS:
+                    values[fields[header]] = value
+            try:
+                booking = BookingCreate(**values)
+                location = normalize_location(booking.location)
+            except ValidationError as e:
+                errors.append({"row": number, "errors": [f"{err['loc'][0]}: {err['msg']}" for err in e.errors()]})
+                continue
+            except ValueError as e:
+                errors.append({"row": number, "errors": [f"location: {e}"]})
+                continue
+            row = booking.model_dump(include=set(self.IMPORT_FIELDS))
+            row["location"] = location or None
+            batch.append((number, row))
+            if len(batch) >= Config.BOOKINGS_IMPORT_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+        
+        errors.sort(key=lambda error: error["row"])
+        return {
+            "imported": len(booking_ids),
+            "failed": len(errors),
+            "booking_ids": booking_ids,
+            "errors": errors
+        }
+    
     def search_bookings(self, booking_id: Optional[str] = None,
                        phone: Optional[str] = None,
-                       booking_type: Optional[str] = None) -> List[Dict]:
-        """Search bookings by filters"""
-        bookings = self.booking_repo.search(
+                       booking_type: Optional[str] = None,
+                       limit: Optional[int] = None,
+                       cursor: Optional[str] = None,
+                       phone_suffix: Optional[str] = None,
+                       name: Optional[str] = None,
+                       vehicle_model: Optional[str] = None) -> Dict:
+        """
+        Search bookings by filters, one page at a time (newest first).
+        A fuzzy name/vehicle_model search instead returns the best matches first, in a single page.
+        Returns {"bookings": [...], "next_cursor": str or None}.
+        Raises ValueError for an invalid cursor.
+        """
+        limit = min(limit or Config.BOOKINGS_PAGE_SIZE, Config.BOOKINGS_MAX_PAGE_SIZE)
+        if name or vehicle_model:
+            if cursor:
+                raise ValueError("Fuzzy name/vehicle_model search returns a single ranked page; cursor is not supported")
+            bookings = self.booking_repo.fuzzy_search(
+                name=name,
+                vehicle_model=vehicle_model,
+                limit=limit,
+                candidates=Config.BOOKINGS_FUZZY_CANDIDATES,
+                booking_id=booking_id,
+                phone=phone,
+                booking_type=booking_type,
+                phone_suffix=phone_suffix
+            )
+            return {"bookings": [booking.to_dict() for booking in bookings], "next_cursor": None}
+        
+        # Read-only page: plain column tuples, no ORM entities
+        bookings = self.booking_repo.search_rows(
+            booking_id=booking_id,
+            phone=phone,
+            booking_type=booking_type,
+            limit=limit + 1,
+            after=decode_cursor(cursor) if cursor else None,
+            phone_suffix=phone_suffix
+        )
+        
+        # One extra row tells us whether another page exists
+        next_cursor = None
+        if len(bookings) > limit:
+            bookings = bookings[:limit]
+            last = bookings[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        
+        return {
+            "bookings": [booking.to_dict() for booking in bookings],
+            "next_cursor": next_cursor
+        }
+    
+    def stream_bookings(self, booking_id: Optional[str] = None,
+                        phone: Optional[str] = None,
+                        booking_type: Optional[str] = None,
+                        phone_suffix: Optional[str] = None) -> Iterator[Dict]:
+        """Yield every matching booking as a dict without loading the result set into memory"""
+        for booking in self.booking_repo.iter_search_rows(
             booking_id=booking_id,
             phone=phone,
-            booking_type=booking_type
+            booking_type=booking_type,
+            batch_size=Config.BOOKINGS_STREAM_BATCH_SIZE,
+            phone_suffix=phone_suffix
+        ):
+            yield booking.to_dict()
+    
+    def export_bookings(self, format: str = 'csv',
+                        booking_type: Optional[str] = None,
+                        date_from: Optional[date] = None,
+                        date_to: Optional[date] = None,
+                        date_field: str = 'created_at') -> Tuple[Iterator[bytes], str, str]:
+        """
+        Export matching bookings as a stream of CSV, Parquet or Arrow IPC bytes.
+        Returns (chunks, mimetype, file extension). Raises ValueError if the format
+        needs pyarrow and it is not installed.
+        """
+        columns = self.booking_repo.EXPORT_COLUMNS
+        table = self.booking_repo.model.__table__
+        types = {name: table.c[name].type.python_type for name in columns}
+        
+        # A generator - the query only runs once the response starts streaming
+        partitions = self.booking_repo.export_partitions(
+            booking_type=booking_type,
+            date_from=date_from,
+            date_to=date_to,
+            date_field=date_field,
+            batch_size=Config.BOOKINGS_EXPORT_BATCH_SIZE
+        )
+        if format == 'parquet':
+            chunks = parquet_chunks(columns, types, partitions)
+        elif format == 'arrow':
+            chunks = arrow_chunks(columns, types, partitions)
+        else:
+            chunks = csv_chunks(columns, partitions)
+        
+        mimetype, extension = EXPORT_FORMATS[format]
+        return chunks, mimetype, extension
+    
+    def booking_analytics(self, date_from: Optional[date] = None,
+                          date_to: Optional[date] = None,
+                          booking_type: Optional[str] = None,
+                          vehicle_model: Optional[str] = None,
+                          group_by: str = 'total') -> Dict:
+        """
+        Bookings per day (UTC) with average lead time to the preferred date, served
+        from the daily rollup. Defaults to the 30 days up to today.
+        Raises ValueError if date_from is after date_to.
+        """
+        date_to = date_to or datetime.utcnow().date()
+        date_from = date_from or date_to - timedelta(days=30)
+        if date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+        
+        series = self.booking_repo.stats.series(
+            date_from, date_to,
+            booking_type=booking_type,
+            vehicle_model=vehicle_model,
+            group_by=group_by
         )
-        return [booking.to_dict() for booking in bookings]
+        return {
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+            "group_by": group_by,
+            "total_bookings": sum(point["bookings"] for point in series),
+            "series": series
+        }
+    
+    def availability(self, date_from: Optional[date] = None,
+                     date_to: Optional[date] = None,
+                     booking_type: Optional[str] = None,
+                     location: Optional[str] = None) -> Dict:
+        """
+        Capacity, reserved and open slots per day and booking type, read from the
+        capacity counters (days without a counter have the default capacity).
+        Defaults to the 14 days from today.
+        Raises ValueError for an inverted range, one longer than BOOKING_AVAILABILITY_MAX_DAYS
+        or a location not in BOOKING_LOCATIONS.
+        """
+        date_from = date_from or datetime.utcnow().date()
+        date_to = date_to or date_from + timedelta(days=13)
+        if date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+        if (date_to - date_from).days >= Config.BOOKING_AVAILABILITY_MAX_DAYS:
+            raise ValueError(f"Date range must not exceed {Config.BOOKING_AVAILABILITY_MAX_DAYS} days")
+        location = normalize_location(location)
+        
+        counters = {
+            (row.day, row.booking_type): row
+            for row in self.capacity_repo.get_range(date_from, date_to, booking_type=booking_type, location=location)
+        }
+        booking_types = [booking_type] if booking_type else self.BOOKING_TYPES
+        days = []
+        day = date_from
+        while day <= date_to:
+            for slot_type in booking_types:
+                row = counters.get((day, slot_type))
+                capacity = row.capacity if row else self.default_capacity(slot_type)
+                reserved = row.reserved if row else 0
+                days.append({
+                    "date": day.isoformat(),
+                    "booking_type": slot_type,
+                    "capacity": capacity,
+                    "reserved": reserved,
+                    "available": max(capacity - reserved, 0)
+                })
+            day += timedelta(days=1)
+        return {
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+            "location": location or None,
+            "days": days
+        }
+    
+    def get_metrics(self) -> Dict:
+        """Per-process AutoSphere metrics"""
+        extraction = metrics.get_counters("booking_extraction.")
+        local = extraction.get("local", 0)
+        total = local + extraction.get("llm", 0)
+        return {
+            "booking_extraction": {
+                "local": local,
+                "llm": extraction.get("llm", 0),
+                "local_hit_rate": metrics.hit_rate(local, total)
+            },
+            "booking_cache": booking_cache.stats()
+        }
     
     def get_booking_by_id(self, booking_id: str) -> Optional[Dict]:
         """Get booking by booking ID"""
-        booking = self.booking_repo.get_by_booking_id(booking_id)
+        booking = self.booking_repo.get_row_by_booking_id(booking_id)
         if booking:
             return booking.to_dict()
         return None
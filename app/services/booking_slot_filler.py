@@ -0,0 +1,109 @@
+import json
+from typing import Callable, Dict, List
+from app.utils.booking_parser import (
+    BOOKING_FIELDS, find_date, find_phone, looks_like_name, looks_like_question, looks_like_vehicle_model,
+    parse_booking_text
+)
+
+
+class BookingSlotFiller:
+    """
+    Accumulates booking fields across chat turns.
+    Local parsers run first; the LLM is only asked for fields still unresolved.
+    State is a plain dict so it can be stored as JSON on the chat session.
+    """
+    
+    # Free text accepted as-is when it is the only field we are waiting for and passes the check
+    FREE_TEXT_FIELDS = {"Name": looks_like_name, "Vehicle Model": looks_like_vehicle_model}
+    
+    def __init__(self, ask_llm: Callable[[str], str]):
+        self.ask_llm = ask_llm
+    
+    def start(self, booking_type: str) -> Dict:
+        """New booking state"""
+        return {"booking_type": booking_type, "slots": {}, "llm_calls": 0}
+    
+    @staticmethod
+    def missing(state: Dict) -> List[str]:
+        """Fields that are still unresolved"""
+        return [field for field in BOOKING_FIELDS if not state["slots"].get(field)]
+    
+    def fill(self, state: Dict, message: str, allow_llm: bool = True) -> Dict:
+        """Update state with any fields found in message"""
+        slots = state["slots"]
+        parsed, leftover = parse_booking_text(message)
+        slots.update(parsed)
+        
+        missing = self.missing(state)
+        words = [w for w in leftover.replace(",", " ").split() if any(c.isalpha() for c in w)]
+        if not missing or not words:
+            return state
+        
+        # "Do you accept credit cards?" is not an answer - leave it to the LLM or ask again
+        if not looks_like_question(leftover):
+            if "Name" in missing and looks_like_name(" ".join(words)):
+                # "John Smith, 0501234567, Camry, tomorrow" - the unexplained words are the name
+                slots["Name"] = " ".join(words)
+                return state
+            
+            check = self.FREE_TEXT_FIELDS.get(missing[0])
+            if not parsed and len(missing) == 1 and check and check(leftover):
+                # Answer to "please provide your vehicle model"
+                slots[missing[0]] = leftover.strip(" ,.;")
+                return state
+        
+        if allow_llm:
+            slots.update(self._extract_with_llm(message, missing))
+            state["llm_calls"] = state.get("llm_calls", 0) + 1
+        return state
+    
+    def _extract_with_llm(self, message: str, fields: List[str]) -> Dict[str, str]:
+        """Ask the LLM for the given fields only; values are validated locally"""
+        prompt = f"""
+        Extract only these booking fields from the text and return JSON with double quotes.
+        Use null for fields that are not present. Do not add extra text.
+        
+        Fields: {', '.join(fields)}
+        Preferred Date must be YYYY-MM-DD.
+        
+        Text:
+        {message}
+        """
+        text = self.ask_llm(prompt).strip()
+        if text.startswith("```"):
+            text = text.strip("`")
+            if text.startswith("json"):
+                text = text[4:]
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        
+        result = {}
+        for field in fields:
+            value = data.get(field)
+            if not value:
+                continue
+            value = str(value).strip()
+            if field == "Phone":
+                found = find_phone(value)
+                value = found[0] if found else None
+            elif field == "Preferred Date":
+                found = find_date(value)
+                value = found[0] if found else None
+            if value:
+                result[field] = value
+        return result
+    
+    def prompt(self, state: Dict) -> str:
+        """Reply asking for the remaining fields"""
+        missing = self.missing(state)
+        if len(missing) == len(BOOKING_FIELDS):
+            return (
+                f"Sure! Let's book your {state['booking_type']}.\n"
+                "Please provide your Name, Phone, Vehicle Model and Preferred Date (YYYY-MM-DD)."
+            )
+        known = ", ".join(f"{k}: {v}" for k, v in state["slots"].items() if v)
+        return f"Thanks! I have {known}.\nPlease provide your {' and '.join(missing)}."
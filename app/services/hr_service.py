@@ -1,6 +1,4 @@
 import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Dict, Tuple
 from app.utils.openai_client import get_openai_client
 from app.repositories.policy_document_repository import PolicyDocumentRepository
@@ -12,9 +10,16 @@ class HRService:
     """Service for HR AI Platform operations"""
     
     def __init__(self):
-        self.client = get_openai_client()
+        self._client = None
         self.policy_repo = PolicyDocumentRepository()
     
+    @property
+    def client(self):
+        """OpenAI client, created on the first LLM call"""
+        if self._client is None:
+            self._client = get_openai_client()
+        return self._client
+    
     def _ask_llm(self, prompt: str, model: str = "gpt-4o-mini", temperature: float = 0.2) -> str:
         """Helper to call OpenAI LLM"""
         response = self.client.chat.completions.create(
@@ -26,6 +31,10 @@ class HRService:
     
     def similarity_score(self, text1: str, text2: str) -> float:
         """Calculate similarity score between two texts"""
+        # sklearn takes ~2s to import - only pay for it when scoring
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        
         tfidf = TfidfVectorizer(stop_words="english")
         matrix = tfidf.fit_transform([text1, text2])
         score = cosine_similarity(matrix[0:1], matrix[1:2])[0][0]
@@ -272,21 +281,21 @@ class HRService:
             "executive_kpis": executive_kpis
         }
     
+    def list_policies(self, limit: int = 50) -> List[Dict]:
+        """Most recently uploaded policy documents (metadata only)"""
+        return [policy.to_dict() for policy in self.policy_repo.list_recent(limit)]
+    
     def upload_policies(self, policy_files: List[FileStorage], user_id: int) -> Dict:
         """Upload policy documents"""
         processed_files = process_multiple_files(policy_files)
-        document_ids = []
         
-        for filename, content in processed_files:
-            if content.startswith("Error"):
-                continue
-            
-            policy_doc = self.policy_repo.create(
-                filename=filename,
-                content=content,
-                uploaded_by=user_id
-            )
-            document_ids.append(policy_doc.id)
+        # One transaction (and one commit) for the whole upload
+        policy_docs = self.policy_repo.create_many(
+            {"filename": filename, "content": content, "uploaded_by": user_id}
+            for filename, content in processed_files
+            if not content.startswith("Error")
+        )
+        document_ids = [policy_doc.id for policy_doc in policy_docs]
         
         return {
             "message": f"{len(document_ids)} policy document(s) uploaded successfully",
@@ -0,0 +1,293 @@
+"""
+Local (no LLM) parsers for booking details in free text.
+
+Fields use the same keys as AutoSphereService.extract_booking_details:
+Name, Phone, Vehicle Model and Preferred Date (YYYY-MM-DD).
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+
+BOOKING_FIELDS = ["Name", "Phone", "Vehicle Model", "Preferred Date"]
+
+FIELD_LABELS = {
+    "name": "Name",
+    "full name": "Name",
+    "customer name": "Name",
+    "phone": "Phone",
+    "phone number": "Phone",
+    "mobile": "Phone",
+    "mobile number": "Phone",
+    "contact number": "Phone",
+    "vehicle model": "Vehicle Model",
+    "vehicle": "Vehicle Model",
+    "model": "Vehicle Model",
+    "car": "Vehicle Model",
+    "preferred date": "Preferred Date",
+    "date": "Preferred Date",
+}
+
+# Brands from the AutoSphere policy document with their common models
+VEHICLE_CATALOG = {
+    "Toyota": ["Camry", "Corolla", "Land Cruiser", "Prado", "RAV4", "Hilux", "Yaris", "Fortuner", "Supra"],
+    "Nissan": ["Patrol", "Altima", "Sunny", "X-Trail", "Kicks", "Pathfinder", "Sentra"],
+    "Honda": ["Civic", "Accord", "CR-V", "HR-V", "Pilot", "City"],
+    "Hyundai": ["Elantra", "Sonata", "Tucson", "Santa Fe", "Accent", "Creta", "Kona"],
+    "Kia": ["Sportage", "Sorento", "Cerato", "Optima", "K5", "Seltos", "Picanto", "Telluride"],
+    "Mitsubishi": ["Pajero", "Outlander", "Lancer", "ASX", "Attrage"],
+    "BMW": ["3 Series", "5 Series", "7 Series", "X1", "X3", "X5", "X7", "i4", "iX"],
+    "Mercedes-Benz": ["A-Class", "C-Class", "E-Class", "S-Class", "GLA", "GLC", "GLE", "GLS", "G-Class"],
+    "Audi": ["A3", "A4", "A6", "A8", "Q3", "Q5", "Q7", "Q8", "e-tron"],
+    "Lexus": ["ES", "IS", "LS", "NX", "RX", "LX", "GX", "UX"],
+    "Volvo": ["XC40", "XC60", "XC90", "S60", "S90"],
+    "Tesla": ["Model 3", "Model S", "Model X", "Model Y", "Cybertruck"],
+    "Porsche": ["911", "Cayenne", "Macan", "Panamera", "Taycan"],
+    "Jaguar": ["F-Pace", "E-Pace", "XE", "XF", "F-Type"],
+    "Land Rover": ["Range Rover Sport", "Range Rover Evoque", "Range Rover Velar", "Range Rover", "Defender", "Discovery"],
+}
+_BRAND_ALIASES = {"mercedes": "Mercedes-Benz", "benz": "Mercedes-Benz", "range rover": "Land Rover"}
+
+
+def _loose(name: str) -> str:
+    """Regex for a catalog name that tolerates spaces/hyphens and case"""
+    return r'[\s\-]?'.join(re.escape(part) for part in re.split(r'[\s\-]+', name))
+
+
+# Longest names first so "Range Rover Sport" wins over "Range Rover"
+_MODEL_INDEX = sorted(
+    ((model, brand) for brand, models in VEHICLE_CATALOG.items() for model in models),
+    key=lambda item: len(item[0]), reverse=True
+)
+_MODEL_RE = re.compile(
+    r'(?<![\w-])(?:(' + '|'.join(_loose(b) for b in sorted(list(VEHICLE_CATALOG) + list(_BRAND_ALIASES), key=len, reverse=True)) +
+    r')\s+)?(' + '|'.join(_loose(m) for m, _ in _MODEL_INDEX) + r')(?![\w-])',
+    re.IGNORECASE
+)
+_NAME_RE = re.compile(
+    r"\b(?i:my name is|name's|i am|i'm|this is)\s+([A-Z][a-zA-Z'\-]+(?:\s+[A-Z][a-zA-Z'\-]+){0,2})"
+)
+# Capitalised words that follow "I am"/"I'm"/"this is" without being a name ("I am Interested in...")
+_NOT_NAME_WORDS = {
+    "a", "an", "the", "not", "just", "also", "still", "so", "very", "really", "here", "there", "back",
+    "interested", "looking", "calling", "writing", "planning", "trying", "hoping", "thinking", "wondering",
+    "checking", "asking", "contacting", "going", "coming", "booking", "wanting", "waiting", "available",
+    "free", "busy", "ready", "sure", "happy", "glad", "fine", "good", "okay", "ok", "sorry", "afraid",
+    "unable", "able", "new", "currently", "from", "in", "at", "on", "with", "about", "after", "done",
+}
+# Opening words of a question ("what are your opening hours", "do you accept cards")
+_QUESTION_WORDS = {
+    "what", "when", "where", "which", "who", "whom", "whose", "why", "how",
+    "do", "does", "did", "can", "could", "would", "will", "should", "shall", "may",
+    "is", "are", "was", "were", "have", "has", "any",
+}
+
+_LABEL_RE = re.compile(
+    r'(?:^|[\n,;])\s*(' + '|'.join(sorted(map(re.escape, FIELD_LABELS), key=len, reverse=True)) +
+    r')\s*[:=\-]\s*([^\n,;]+)',
+    re.IGNORECASE
+)
+_PHONE_RE = re.compile(r'(?<![\w-])\+?\(?\d[\d\s\-().]{5,}\d(?![\w-])')
+
+_MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+    ], 1)
+    for name in names
+}
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_MONTH_PATTERN = '|'.join(sorted(_MONTHS, key=len, reverse=True))
+
+_ISO_DATE_RE = re.compile(r'\b(\d{4})-(\d{1,2})-(\d{1,2})\b')
+_NUMERIC_DATE_RE = re.compile(r'\b(\d{1,2})[/.](\d{1,2})[/.](\d{4})\b')
+_DAY_MONTH_RE = re.compile(
+    r'\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(' + _MONTH_PATTERN + r')\.?(?:,?\s+(\d{4}))?\b', re.IGNORECASE
+)
+_MONTH_DAY_RE = re.compile(
+    r'\b(' + _MONTH_PATTERN + r')\.?\s+(\d{1,2})(?:st|nd|rd|th)?(?:,?\s+(\d{4}))?\b', re.IGNORECASE
+)
+_RELATIVE_RE = re.compile(
+    r'\b(today|tomorrow|day after tomorrow|(?:next\s+|this\s+|on\s+)?(?:' + '|'.join(_WEEKDAYS) + r'))\b',
+    re.IGNORECASE
+)
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(month: int, day: int, today: date) -> Optional[date]:
+    """Next occurrence of month/day on or after today"""
+    candidate = _safe_date(today.year, month, day)
+    if candidate and candidate < today:
+        candidate = _safe_date(today.year + 1, month, day)
+    return candidate
+
+
+def find_date(text: str, today: Optional[date] = None) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """
+    Find a date in text (ISO, DD/MM/YYYY, "25 Dec", "December 25th 2024",
+    "tomorrow", "next friday"). Returns (YYYY-MM-DD, match span) or None.
+    """
+    today = today or datetime.now().date()
+
+    match = _ISO_DATE_RE.search(text)
+    if match:
+        parsed = _safe_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        if parsed:
+            return parsed.isoformat(), match.span()
+
+    match = _NUMERIC_DATE_RE.search(text)
+    if match:
+        # Day first, as written in the GCC and the UK
+        parsed = _safe_date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+        if parsed:
+            return parsed.isoformat(), match.span()
+
+    for pattern, day_group, month_group in ((_DAY_MONTH_RE, 1, 2), (_MONTH_DAY_RE, 2, 1)):
+        match = pattern.search(text)
+        if match:
+            month = _MONTHS[match.group(month_group).lower()]
+            day = int(match.group(day_group))
+            if match.group(3):
+                parsed = _safe_date(int(match.group(3)), month, day)
+            else:
+                parsed = _upcoming(month, day, today)
+            if parsed:
+                return parsed.isoformat(), match.span()
+
+    match = _RELATIVE_RE.search(text)
+    if match:
+        word = match.group(1).lower()
+        if word == "today":
+            parsed = today
+        elif word == "tomorrow":
+            parsed = today + timedelta(days=1)
+        elif word == "day after tomorrow":
+            parsed = today + timedelta(days=2)
+        else:
+            weekday = _WEEKDAYS.index(word.split()[-1])
+            days_ahead = (weekday - today.weekday()) % 7 or 7
+            parsed = today + timedelta(days=days_ahead)
+        return parsed.isoformat(), match.span()
+
+    return None
+
+
+def find_phone(text: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """Find a phone number (7-15 digits, optional +country code). Returns (phone, span) or None."""
+    for match in _PHONE_RE.finditer(text):
+        candidate = match.group(0).strip()
+        digits = re.sub(r'\D', '', candidate)
+        if 7 <= len(digits) <= 15:
+            return candidate, match.span()
+    return None
+
+
+def find_vehicle_model(text: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """
+    Match a vehicle model against the catalog ("camry", "Toyota Camry", "range rover sport").
+    Returns ("Brand Model", span) or None.
+    """
+    for match in _MODEL_RE.finditer(text):
+        typed = re.sub(r'[\s\-]', '', match.group(2)).lower()
+        for model, brand in _MODEL_INDEX:
+            if re.sub(r'[\s\-]', '', model).lower() == typed:
+                # Short letter codes like "ES" only count in upper case or after the brand
+                if (len(model) <= 3 and not match.group(1) and match.group(2) != model
+                        and not any(c.isdigit() for c in model)):
+                    break
+                if model.startswith(brand.split()[0]):
+                    return model, match.span()
+                return f"{brand} {model}", match.span()
+    return None
+
+
+def find_name(text: str) -> Optional[Tuple[str, Tuple[int, int]]]:
+    """Find a name introduced as "my name is ...", "I'm ...", "this is ..." """
+    for match in _NAME_RE.finditer(text):
+        words = []
+        for word in match.group(1).split():
+            if word.lower() in _NOT_NAME_WORDS:
+                break
+            words.append(word)
+        if words:
+            end = match.start(1) + len(" ".join(words))
+            return " ".join(words), (match.start(), end)
+    return None
+
+
+def looks_like_name(text: str) -> bool:
+    """One to three capitalised words, e.g. a bare "John Smith" reply"""
+    words = text.strip(" ,.;").split()
+    return 0 < len(words) <= 3 and all(w[0].isupper() and w.replace("-", "").replace("'", "").isalpha() for w in words)
+
+
+def looks_like_question(text: str) -> bool:
+    """Ends with "?" or opens with an interrogative ("what are your opening hours")"""
+    text = text.strip(" ,.;")
+    words = text.split()
+    return text.endswith("?") or bool(words) and words[0].lower().strip("',") in _QUESTION_WORDS
+
+
+def looks_like_vehicle_model(text: str) -> bool:
+    """
+    A plausible model outside the catalog, e.g. "Ford Focus" or "Peugeot 3008":
+    one to four words of letters/digits, at least one capitalised or numeric.
+    """
+    words = text.strip(" ,.;").split()
+    return (0 < len(words) <= 4 and not looks_like_question(text)
+            and all(w.replace("-", "").isalnum() for w in words)
+            and any(w[0].isupper() or any(c.isdigit() for c in w) for w in words))
+
+
+def parse_labeled_fields(text: str) -> Dict[str, str]:
+    """Parse "Label: value" pairs separated by newlines, commas or semicolons"""
+    data = {}
+    for match in _LABEL_RE.finditer(text):
+        field = FIELD_LABELS[match.group(1).lower()]
+        value = match.group(2).strip()
+        if value and field not in data:
+            data[field] = value
+    return data
+
+
+def parse_booking_text(text: str, today: Optional[date] = None) -> Tuple[Dict[str, str], str]:
+    """
+    Extract whatever booking fields can be parsed locally.
+    Returns (fields, leftover) where leftover is the text not explained by any parser.
+    """
+    data = parse_labeled_fields(text)
+    leftover = _LABEL_RE.sub(' ', text)
+    unparsed_date = ''
+
+    if "Preferred Date" in data:
+        found = find_date(data["Preferred Date"], today)
+        if found:
+            data["Preferred Date"] = found[0]
+        else:
+            # "Date: next week" - leave the slot missing so the date is asked for again
+            unparsed_date = data.pop("Preferred Date")
+    else:
+        # Remove dates before looking for phone numbers - ISO dates look like digit runs
+        found = find_date(leftover, today)
+        if found:
+            data["Preferred Date"] = found[0]
+            leftover = leftover[:found[1][0]] + ' ' + leftover[found[1][1]:]
+
+    for field, finder in (("Phone", find_phone), ("Vehicle Model", find_vehicle_model), ("Name", find_name)):
+        if field in data:
+            continue
+        found = finder(leftover)
+        if found:
+            data[field] = found[0]
+            leftover = leftover[:found[1][0]] + ' ' + leftover[found[1][1]:]
+
+    # Added back only now so a malformed date is not mistaken for a phone number
+    return data, re.sub(r'\s+', ' ', leftover + ' ' + unparsed_date).strip()
@@ -0,0 +1,123 @@
+"""
+In-process read-through cache with bounded size and TTL.
+
+Values must be immutable (e.g. BookingRow tuples) because they are shared by
+every request in the worker. Hits, misses, evictions and invalidations are
+counted in app.utils.metrics under the cache name.
+
+Writers invalidate keys twice: immediately, and again when the session's
+transaction commits (invalidate_on_commit). The second pass drops any value a
+concurrent reader loaded from the database between the write and the commit.
+Other worker processes keep their own copies, so TTL bounds how stale a
+cached value can get after a write handled elsewhere.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.utils import metrics
+
+# Session.info key: {cache: set of keys} to invalidate after the transaction commits
+_PENDING_INVALIDATIONS = 'cache_invalidations'
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ttl seconds after they were loaded"""
+
+    def __init__(self, name: str, max_size: int, ttl: float):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; a load that overlapped one is not stored
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Cached value for key, or loader() - which is cached unless it returned None"""
+        if not self.enabled:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                metrics.increment(f"{self.name}.hits")
+                return entry[1]
+            generation = self._generation
+        metrics.increment(f"{self.name}.misses")
+
+        value = loader()
+        if value is None:
+            return value
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while loading - the value may predate that write
+                return value
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                metrics.increment(f"{self.name}.evictions")
+        return value
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Drop keys now"""
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    metrics.increment(f"{self.name}.invalidations")
+
+    def invalidate_on_commit(self, session: Session, keys: Iterable[Hashable]) -> None:
+        """Drop keys now and again once session's transaction commits"""
+        keys = set(keys)
+        self.invalidate(keys)
+        pending = session.info.setdefault(_PENDING_INVALIDATIONS, {})
+        pending.setdefault(self, set()).update(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Size, configuration and hit rate for the metrics endpoint"""
+        counters = metrics.get_counters(f"{self.name}.")
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": metrics.hit_rate(hits, hits + misses),
+            "evictions": counters.get("evictions", 0),
+            "invalidations": counters.get("invalidations", 0)
+        }
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    for cache, keys in session.info.pop(_PENDING_INVALIDATIONS, {}).items():
+        cache.invalidate(keys)
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _discard_rolled_back(session, transaction):
+    # A savepoint ending (e.g. a retried insert) leaves the outer transaction's writes pending
+    if transaction.parent is not None:
+        return
+    # Runs after after_commit, so anything left was rolled back - already invalidated
+    # when written, and the database never changed
+    session.info.pop(_PENDING_INVALIDATIONS, None)
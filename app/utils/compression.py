@@ -0,0 +1,201 @@
+"""
+Compression helpers for large text columns (extracted policy/CV text).
+
+Every compressed value starts with a 5 byte header: one codec byte followed by
+the 4 byte id of the dictionary it was compressed with (0 when no dictionary
+was used). Dictionaries are immutable files named ``<id>.dict`` so rows written
+with an older dictionary can still be read after a new one is trained.
+Dictionaries are looked up in TEXT_COMPRESSION_DICT_DIR and then in the deploy
+bundle, which ships a copy of them (scripts/build_bundle.py). New values use the
+dictionary named in the CURRENT file next to them, written by train_dictionary -
+file times are reset by checkouts and copies, so they can't tell which is newest.
+"""
+import os
+import struct
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+from app.config import Config
+
+# zstandard is optional - fall back to zlib (with a preset dictionary) without it
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstandard = None
+
+
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+HEADER = struct.Struct('>BI')
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 19
+# zlib only looks back 32KB, so a larger preset dictionary is wasted
+ZLIB_MAX_DICT_SIZE = 32 * 1024
+DEFAULT_DICT_SIZE = 64 * 1024
+
+# Holds the hex id of the dictionary new values are compressed with
+CURRENT_FILE = 'CURRENT'
+
+_dictionaries: Dict[int, bytes] = {}
+# (CURRENT path, mtime, dictionary id) - the file is only read again when it changes
+_current_dictionary = (None, None, 0)
+
+
+def _dict_dir() -> str:
+    return Config.TEXT_COMPRESSION_DICT_DIR
+
+
+def _dict_id(data: bytes) -> int:
+    # 0 is reserved for "no dictionary"
+    return zlib.crc32(data) or 1
+
+
+def _resolve_codec() -> int:
+    codec = (Config.TEXT_COMPRESSION_CODEC or 'auto').lower()
+    if codec == 'none':
+        return CODEC_RAW
+    if codec == 'zlib' or (codec == 'auto' and not ZSTD_AVAILABLE):
+        return CODEC_ZLIB
+    if not ZSTD_AVAILABLE:
+        raise ValueError("TEXT_COMPRESSION_CODEC is 'zstd' but the zstandard package is not installed")
+    return CODEC_ZSTD
+
+
+def load_dictionary(dict_id: int) -> bytes:
+    """Load a trained dictionary by id (cached per process)"""
+    if dict_id not in _dictionaries:
+        from app.bundle import TEXT_DICTS_DIR, bundle_path
+        
+        name = f'{dict_id:08x}.dict'
+        path = os.path.join(_dict_dir(), name)
+        if not os.path.exists(path):
+            path = bundle_path(f'{TEXT_DICTS_DIR}/{name}')
+        if not path:
+            raise ValueError(f"Compression dictionary not found: {os.path.join(_dict_dir(), name)}")
+        with open(path, 'rb') as f:
+            _dictionaries[dict_id] = f.read()
+    return _dictionaries[dict_id]
+
+
+def current_dictionary_id() -> int:
+    """Return the id recorded in CURRENT (TEXT_COMPRESSION_DICT_DIR, else the bundle), or 0 if none"""
+    global _current_dictionary
+    from app.bundle import TEXT_DICTS_DIR, bundle_path
+    
+    path = os.path.join(_dict_dir(), CURRENT_FILE)
+    if not os.path.exists(path):
+        path = bundle_path(f'{TEXT_DICTS_DIR}/{CURRENT_FILE}')
+        if not path:
+            return 0
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+    cached_path, cached_mtime, dict_id = _current_dictionary
+    if (cached_path, cached_mtime) == (path, mtime):
+        return dict_id
+    
+    with open(path) as f:
+        dict_id = int(f.read().strip(), 16)
+    _current_dictionary = (path, mtime, dict_id)
+    return dict_id
+
+
+def train_dictionary(samples: Iterable[str], size: int = DEFAULT_DICT_SIZE) -> int:
+    """
+    Train a compression dictionary from sample documents and save it.
+    Returns the new dictionary id.
+    """
+    encoded = [s.encode('utf-8') for s in samples if s]
+    if not encoded:
+        raise ValueError("At least one non-empty sample is required to train a dictionary")
+    
+    data = None
+    if _resolve_codec() == CODEC_ZSTD:
+        try:
+            data = zstandard.train_dictionary(size, encoded).as_bytes()
+        except zstandard.ZstdError:
+            # Too few samples for zstd's trainer - use the raw content dictionary below
+            data = None
+    
+    if data is None:
+        # Raw content dictionary: the most common lines, most frequent last
+        # because zlib favours matches closest to the end of the dictionary
+        counts = Counter(line.strip() for s in encoded for line in s.splitlines() if line.strip())
+        chosen = []
+        total = 0
+        for line, _ in counts.most_common():
+            if total + len(line) + 1 > min(size, ZLIB_MAX_DICT_SIZE):
+                break
+            chosen.append(line)
+            total += len(line) + 1
+        data = b'\n'.join(reversed(chosen))
+    
+    dict_id = _dict_id(data)
+    os.makedirs(_dict_dir(), exist_ok=True)
+    with open(os.path.join(_dict_dir(), f'{dict_id:08x}.dict'), 'wb') as f:
+        f.write(data)
+    _dictionaries[dict_id] = data
+    # Replaced atomically so a concurrent reader never sees a half-written id
+    current = os.path.join(_dict_dir(), CURRENT_FILE)
+    with open(current + '.tmp', 'w') as f:
+        f.write(f'{dict_id:08x}\n')
+    os.replace(current + '.tmp', current)
+    return dict_id
+
+
+def compress_text(text: str, dict_id: Optional[int] = None) -> bytes:
+    """Compress text using the configured codec and current dictionary"""
+    raw = text.encode('utf-8')
+    codec = _resolve_codec()
+    if codec == CODEC_RAW:
+        return HEADER.pack(CODEC_RAW, 0) + raw
+    
+    if dict_id is None:
+        dict_id = current_dictionary_id()
+    dictionary = load_dictionary(dict_id) if dict_id else None
+    
+    if codec == CODEC_ZSTD:
+        zdict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        payload = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=zdict).compress(raw)
+    else:
+        if dictionary:
+            compressor = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary[-ZLIB_MAX_DICT_SIZE:])
+        else:
+            compressor = zlib.compressobj(ZLIB_LEVEL)
+        payload = compressor.compress(raw) + compressor.flush()
+    return HEADER.pack(codec, dict_id) + payload
+
+
+def decompress_text(value) -> Optional[str]:
+    """
+    Decompress a stored value back to text.
+    Plain strings (rows written before compression was enabled) are returned unchanged.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    codec, dict_id = HEADER.unpack_from(value)
+    payload = value[HEADER.size:]
+    dictionary = load_dictionary(dict_id) if dict_id else None
+    
+    if codec == CODEC_RAW:
+        raw = payload
+    elif codec == CODEC_ZLIB:
+        if dictionary:
+            decompressor = zlib.decompressobj(zdict=dictionary[-ZLIB_MAX_DICT_SIZE:])
+        else:
+            decompressor = zlib.decompressobj()
+        raw = decompressor.decompress(payload) + decompressor.flush()
+    elif codec == CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Value was compressed with zstd but the zstandard package is not installed")
+        zdict = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        raw = zstandard.ZstdDecompressor(dict_data=zdict).decompress(payload)
+    else:
+        raise ValueError(f"Unknown text compression codec: {codec}")
+    return raw.decode('utf-8')
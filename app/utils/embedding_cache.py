@@ -0,0 +1,114 @@
+"""
+Query embedding cache for the AutoSphere vectorstore.
+
+Questions are normalised (case and whitespace) and looked up in an in-memory
+LRU first, then in an optional SQLite file shared by all workers, before
+falling back to the embeddings API. The normalised form is only the cache key -
+the API embeds the question as typed ("BMW X5", not "bmw x5").
+"""
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_query(text: str) -> str:
+    """Normalise a query so trivially different phrasings share a cache entry"""
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that caches query vectors by normalised text and model"""
+    
+    def __init__(self, embeddings: Embeddings, model: str, max_size: int = 1024,
+                 persist_path: Optional[str] = None):
+        self.embeddings = embeddings
+        self.model = model
+        self.max_size = max_size
+        self.persist_path = persist_path
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        
+        if persist_path:
+            os.makedirs(os.path.dirname(os.path.abspath(persist_path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                    "model TEXT NOT NULL, query TEXT NOT NULL, vector BLOB NOT NULL, "
+                    "PRIMARY KEY (model, query))"
+                )
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connection to the persistent cache that commits on success and is always closed"""
+        conn = sqlite3.connect(self.persist_path, timeout=5)
+        try:
+            # sqlite3's own context manager only commits/rolls back - it never closes
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Documents are embedded once when the index is built - no caching"""
+        return self.embeddings.embed_documents(texts)
+    
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_query(text)
+        
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+        
+        if self.persist_path:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT vector FROM query_embeddings WHERE model = ? AND query = ?",
+                    (self.model, key)
+                ).fetchone()
+            if row:
+                vector = array('f', row[0]).tolist()
+                self._remember(key, vector)
+                self.persistent_hits += 1
+                return vector
+        
+        vector = self.embeddings.embed_query(text)
+        self.misses += 1
+        self._remember(key, vector)
+        
+        if self.persist_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (model, query, vector) VALUES (?, ?, ?)",
+                    (self.model, key, array('f', vector).tobytes())
+                )
+        return vector
+    
+    def stats(self) -> Dict:
+        """Cache hit/miss counters for this process"""
+        lookups = self.hits + self.persistent_hits + self.misses
+        return {
+            "size": len(self._memory),
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.persistent_hits) / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,120 @@
+"""
+Streaming serializers for table exports.
+
+Each function takes the column names and an iterable of row partitions (lists
+of tuples, e.g. from a SQLAlchemy Core result's partitions()) and yields bytes
+chunks, so only one partition is held in memory at a time.
+"""
+import csv
+import io
+import importlib.util
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+# pyarrow is optional - CSV export works without it. It is only imported when an
+# Arrow/Parquet export runs, so it stays off the startup path.
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+def csv_chunks(columns: Sequence[str], partitions: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """CSV with a header row, one chunk per partition"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in partitions:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file that hands written bytes back in chunks but keeps absolute offsets"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _arrow_type(pyarrow, python_type):
+    if python_type is int:
+        return pyarrow.int64()
+    if python_type is datetime:
+        return pyarrow.timestamp('us')
+    if python_type is date:
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+def _arrow_chunks(columns: Sequence[str], types: Dict[str, type],
+                  partitions: Iterable[List[tuple]], parquet: bool) -> Iterator[bytes]:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    
+    schema = pyarrow.schema([(name, _arrow_type(pyarrow, types[name])) for name in columns])
+    sink = _ChunkSink()
+    stream = pyarrow.PythonFile(sink, mode='w')
+    if parquet:
+        writer = pyarrow.parquet.ParquetWriter(stream, schema)
+    else:
+        writer = pyarrow.ipc.new_stream(stream, schema)
+
+    for rows in partitions:
+        # Columnar batch straight from the row tuples - one row group / record batch per partition
+        arrays = [pyarrow.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+        writer.write_batch(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+        yield sink.take()
+    writer.close()
+    yield sink.take()
+
+
+def parquet_chunks(columns: Sequence[str], types: Dict[str, type],
+                   partitions: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Parquet file, one row group per partition. types maps column -> Python type"""
+    if not PYARROW_AVAILABLE:
+        raise ValueError("Parquet export requires the pyarrow package")
+    return _arrow_chunks(columns, types, partitions, parquet=True)
+
+
+def arrow_chunks(columns: Sequence[str], types: Dict[str, type],
+                 partitions: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """Arrow IPC stream, one record batch per partition. types maps column -> Python type"""
+    if not PYARROW_AVAILABLE:
+        raise ValueError("Arrow export requires the pyarrow package")
+    return _arrow_chunks(columns, types, partitions, parquet=False)
@@ -1,13 +1,17 @@
-import PyPDF2
-import docx
+import csv
+import io
 import tempfile
 import os
-from typing import List, Tuple
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Tuple
 from werkzeug.datastructures import FileStorage
 
 
 def read_pdf(file_path: str) -> str:
     """Extract text from PDF file"""
+    # Parsers are imported on first use so they stay off the startup path
+    import PyPDF2
+    
     text = ""
     try:
         with open(file_path, 'rb') as file:
@@ -23,6 +27,8 @@ def read_pdf(file_path: str) -> str:
 
 def read_docx(file_path: str) -> str:
     """Extract text from DOCX file"""
+    import docx
+    
     try:
         doc = docx.Document(file_path)
         return "\n".join([p.text for p in doc.paragraphs])
@@ -87,3 +93,48 @@ def process_multiple_files(files: List[FileStorage]) -> List[Tuple[str, str]]:
             # Continue processing other files even if one fails
             results.append((file.filename or "unknown", f"Error processing file: {str(e)}"))
     return results
+
+
+def _cell_value(value):
+    """Spreadsheet cell as text (dates kept as dates, 5.01e8 as "501000000")"""
+    if isinstance(value, datetime):
+        return value.date() if value.time() == datetime.min.time() else value
+    if isinstance(value, date):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def read_table_rows(file: FileStorage) -> Iterator[Tuple[int, Dict]]:
+    """
+    Stream rows of an uploaded CSV or XLSX file as (row number, {header: value}).
+    Row numbers match the spreadsheet (the header is row 1); empty cells are
+    left out and blank rows skipped.
+    """
+    filename = file.filename or ''
+    ext = filename.lower().split('.')[-1]
+    
+    if ext == 'csv':
+        reader = csv.reader(io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''))
+    elif ext == 'xlsx':
+        import openpyxl
+        workbook = openpyxl.load_workbook(file.stream, read_only=True, data_only=True)
+        reader = workbook.active.iter_rows(values_only=True)
+    else:
+        raise ValueError(f"Unsupported file type: {ext} (expected csv or xlsx)")
+    
+    header = next(reader, None)
+    if not header:
+        raise ValueError("File is empty")
+    header = [str(h).strip() if h is not None else '' for h in header]
+    
+    for number, values in enumerate(reader, start=2):
+        row = {}
+        for column, value in zip(header, values):
+            if column and value is not None:
+                value = _cell_value(value)
+                if value != '':
+                    row[column] = value
+        if row:
+            yield number, row
@@ -0,0 +1,51 @@
+"""
+Trigram helpers for fuzzy booking search ("jon smth" -> "John Smith").
+
+Words are padded with a space on each side before being split into trigrams,
+so word starts and ends count as matches even when the middle is misspelt.
+The SQLite search index stores text padded the same way (see pad_words).
+"""
+import re
+from typing import Set
+
+# Similarity below which a candidate is not considered a match
+MIN_SIMILARITY = 0.25
+
+
+def pad_words(text: str) -> str:
+    """Lower-case text with every word wrapped in spaces: "John Smith" -> " john  smith " """
+    words = (text or '').lower().split()
+    return ''.join(f' {word} ' for word in words)
+
+
+def trigrams(text: str) -> Set[str]:
+    """Padded trigrams of every word in text"""
+    padded = pad_words(text)
+    grams = set()
+    for word in re.findall(r' [^ ]+ ', padded):
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def _dice(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def similarity(query: str, text: str) -> float:
+    """
+    How well query matches text (0-1): each query word is scored against its
+    closest word in text (Dice coefficient of trigrams) and the scores averaged.
+    Extra words in text cost nothing, so "smith" fully matches "John Smith".
+    """
+    query_words = [trigrams(word) for word in query.split()]
+    text_words = [trigrams(word) for word in text.split()]
+    if not query_words or not text_words:
+        return 0.0
+    return sum(max(_dice(q, t) for t in text_words) for q in query_words) / len(query_words)
+
+
+def fts_match(query: str) -> str:
+    """FTS5 MATCH expression that finds rows sharing any trigram with query"""
+    return ' OR '.join('"' + gram.replace('"', '""') + '"' for gram in sorted(trigrams(query)))
@@ -0,0 +1,25 @@
+"""
+Deferred construction of module-level singletons.
+Blueprints use lazy_instance for their services so importing the app (and a
+cold start that only serves /api/auth/login) never builds them.
+"""
+import threading
+from typing import Callable, TypeVar
+from werkzeug.local import LocalProxy
+
+T = TypeVar('T')
+
+
+def lazy_instance(factory: Callable[[], T]) -> T:
+    """Proxy that calls factory() on first use and forwards everything to that one instance"""
+    instance = []
+    lock = threading.Lock()
+    
+    def get() -> T:
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+    
+    return LocalProxy(get)
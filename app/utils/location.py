@@ -0,0 +1,43 @@
+"""
+Branch names for bookings and their capacity counters.
+
+Capacity is counted per (date, booking type, location), so every spelling of a
+branch would otherwise get its own counter with the full default capacity.
+When BOOKING_LOCATIONS lists the branches, locations are matched against it
+ignoring case and spacing and stored in its spelling; anything else is
+rejected. Without a list any branch is accepted, with spacing collapsed and
+the words title-cased.
+"""
+from typing import Optional
+from app.config import Config
+
+# Location of bookings at the main site (no branch given)
+MAIN_SITE = ''
+
+
+def normalize_location(raw: Optional[str]) -> str:
+    """
+    Canonical location for raw ('' for the main site).
+    Raises ValueError for a branch that is not in BOOKING_LOCATIONS.
+    """
+    text = " ".join(str(raw).split()) if raw is not None else ''
+    if not text:
+        return MAIN_SITE
+    known = {" ".join(name.split()).casefold(): name for name in Config.BOOKING_LOCATIONS}
+    if not known:
+        return text.title()
+    if text.casefold() not in known:
+        raise ValueError(f"Unknown location '{text}' (expected one of: {', '.join(Config.BOOKING_LOCATIONS)})")
+    return known[text.casefold()]
+
+
+def location_key(stored: Optional[str]) -> str:
+    """
+    Capacity counter location for a booking's stored location. Rows saved before
+    normalisation are folded into their branch's counter; a branch since dropped
+    from BOOKING_LOCATIONS keeps its own.
+    """
+    try:
+        return normalize_location(stored)
+    except ValueError:
+        return stored or MAIN_SITE
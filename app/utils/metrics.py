@@ -0,0 +1,31 @@
+"""
+In-process counters for lightweight operational metrics.
+Counters are per worker process and reset on restart.
+"""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+_counters = defaultdict(int)
+_lock = threading.Lock()
+
+
+def increment(name: str, amount: int = 1):
+    """Increment a named counter"""
+    with _lock:
+        _counters[name] += amount
+
+
+def get_counters(prefix: str = '') -> Dict[str, int]:
+    """Snapshot of counters whose name starts with prefix (prefix stripped)"""
+    with _lock:
+        return {
+            name[len(prefix):]: value
+            for name, value in _counters.items()
+            if name.startswith(prefix)
+        }
+
+
+def hit_rate(hits: int, total: int) -> float:
+    """Ratio rounded for display; 0.0 when nothing was counted"""
+    return round(hits / total, 4) if total else 0.0
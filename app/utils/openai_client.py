@@ -1,10 +1,16 @@
-from openai import OpenAI
 import os
+from typing import TYPE_CHECKING
 from app.config import Config
 
+if TYPE_CHECKING:
+    from openai import OpenAI
 
-def get_openai_client() -> OpenAI:
+
+def get_openai_client() -> "OpenAI":
     """Get OpenAI client instance"""
+    # The openai package takes ~1s to import; keep it off the startup path
+    from openai import OpenAI
+    
     api_key = Config.OPENAI_API_KEY
     
     if not api_key:
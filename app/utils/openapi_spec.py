@@ -44,6 +44,10 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
             {
                 "name": "AutoSphere Motors",
                 "description": "AutoSphere Motors AI Assistant endpoints"
+            },
+            {
+                "name": "Admin",
+                "description": "Operational endpoints (HR Manager only)"
             }
         ],
         "paths": {
@@ -197,6 +201,28 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                     }
                 }
             },
+            "/api/hr/policy": {
+                "get": {
+                    "tags": ["HR AI Platform"],
+                    "summary": "List Policy Documents",
+                    "description": "Most recently uploaded policy documents (metadata only, newest first)",
+                    "security": [{"Bearer": []}],
+                    "parameters": [
+                        {
+                            "name": "limit",
+                            "in": "query",
+                            "schema": {"type": "integer", "default": 50, "minimum": 1, "maximum": 500},
+                            "description": "Number of policies to return"
+                        }
+                    ],
+                    "responses": {
+                        "200": {"description": "Policies retrieved"},
+                        "401": {"description": "Unauthorized"},
+                        "422": {"description": "Validation error"},
+                        "500": {"description": "Server error"}
+                    }
+                }
+            },
             "/api/hr/policy/ask": {
                 "post": {
                     "tags": ["HR AI Platform"],
@@ -308,7 +334,7 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                 "post": {
                     "tags": ["AutoSphere Motors"],
                     "summary": "AI Assistant Chat",
-                    "description": "Chat with AutoSphere AI assistant. Supports intent classification and booking flow.",
+                    "description": "Chat with AutoSphere AI assistant. Supports intent classification and booking flow. Conversation context is kept server-side; send back the returned session_id.",
                     "security": [{"Bearer": []}],
                     "requestBody": {
                         "required": True,
@@ -322,8 +348,13 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                                             "type": "string",
                                             "example": "What services do you offer?"
                                         },
+                                        "session_id": {
+                                            "type": "string",
+                                            "description": "Session ID from a previous response"
+                                        },
                                         "chat_history": {
                                             "type": "array",
+                                            "description": "Only used to seed a new session",
                                             "items": {
                                                 "type": "object",
                                                 "properties": {
@@ -368,6 +399,7 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                                         "phone": {"type": "string", "example": "+1234567890"},
                                         "vehicle_model": {"type": "string", "example": "Toyota Camry"},
                                         "preferred_date": {"type": "string", "format": "date", "example": "2024-12-25"},
+                                        "location": {"type": "string", "description": "Branch (default - main site)"},
                                         "natural_language": {
                                             "type": "string",
                                             "example": "I want to book a service for my Toyota Camry on December 25th",
@@ -382,6 +414,7 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                         "200": {"description": "Booking created successfully"},
                         "400": {"description": "Bad request"},
                         "401": {"description": "Unauthorized"},
+                        "409": {"description": "No slots left for the booking type on the preferred date"},
                         "422": {"description": "Validation error"},
                         "500": {"description": "Server error"}
                     }
@@ -389,7 +422,7 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                 "get": {
                     "tags": ["AutoSphere Motors"],
                     "summary": "Search Bookings",
-                    "description": "Search bookings by booking ID, phone number, or booking type",
+                    "description": "Search bookings by booking ID, phone number, or booking type. Results are paginated newest first; the X-Next-Cursor header holds the cursor for the next page. Use stream=ndjson|json to stream every match instead. name/vehicle_model do a typo-tolerant search and return one page, best match first.",
                     "security": [{"Bearer": []}],
                     "parameters": [
                         {
@@ -403,19 +436,185 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                             "name": "phone",
                             "in": "query",
                             "schema": {"type": "string"},
-                            "description": "Search by phone number",
+                            "description": "Search by phone number (matched on its last 9 digits, so any format works)",
                             "example": "+1234567890"
                         },
+                        {
+                            "name": "phone_suffix",
+                            "in": "query",
+                            "schema": {"type": "string", "pattern": "^\\d{4,15}$"},
+                            "description": "Search by the last 4-15 digits of the phone number",
+                            "example": "2000"
+                        },
                         {
                             "name": "booking_type",
                             "in": "query",
                             "schema": {"type": "string", "enum": ["Service", "Test Drive"]},
                             "description": "Filter by booking type"
+                        },
+                        {
+                            "name": "name",
+                            "in": "query",
+                            "schema": {"type": "string", "minLength": 2, "maxLength": 100},
+                            "description": "Fuzzy search by customer name (partial or misspelt, e.g. \"jon smth\")"
+                        },
+                        {
+                            "name": "vehicle_model",
+                            "in": "query",
+                            "schema": {"type": "string", "minLength": 2, "maxLength": 100},
+                            "description": "Fuzzy search by vehicle model (e.g. \"camry\")"
+                        },
+                        {
+                            "name": "limit",
+                            "in": "query",
+                            "schema": {"type": "integer", "minimum": 1},
+                            "description": "Page size (default 50, max 500)"
+                        },
+                        {
+                            "name": "cursor",
+                            "in": "query",
+                            "schema": {"type": "string"},
+                            "description": "X-Next-Cursor value from the previous page"
+                        },
+                        {
+                            "name": "stream",
+                            "in": "query",
+                            "schema": {"type": "string", "enum": ["ndjson", "json"]},
+                            "description": "Stream all matches as NDJSON lines or a bare JSON array"
                         }
                     ],
                     "responses": {
-                        "200": {"description": "Bookings found"},
+                        "200": {
+                            "description": "Bookings found",
+                            "headers": {
+                                "X-Next-Cursor": {
+                                    "schema": {"type": "string"},
+                                    "description": "Cursor for the next page (absent on the last page)"
+                                }
+                            }
+                        },
+                        "400": {"description": "Invalid cursor, or cursor/stream combined with a fuzzy search"},
                         "401": {"description": "Unauthorized"},
+                        "422": {"description": "Validation error"},
+                        "500": {"description": "Server error"}
+                    }
+                }
+            },
+            "/api/autosphere/bookings/import": {
+                "post": {
+                    "tags": ["AutoSphere Motors"],
+                    "summary": "Import Bookings",
+                    "description": "Bulk import bookings from a CSV or XLSX file with a header row (booking_type, name, phone, vehicle_model, preferred_date). Valid rows are saved even when others fail; failed rows are listed with their spreadsheet row number.",
+                    "security": [{"Bearer": []}],
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "multipart/form-data": {
+                                "schema": {
+                                    "type": "object",
+                                    "required": ["file"],
+                                    "properties": {
+                                        "file": {
+                                            "type": "string",
+                                            "format": "binary",
+                                            "description": "CSV or XLSX file of bookings"
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Import finished (check failed/errors for rejected rows)",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "object",
+                                        "properties": {
+                                            "success": {"type": "boolean"},
+                                            "message": {"type": "string", "example": "Imported 998 booking(s), 2 row(s) failed"},
+                                            "data": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "imported": {"type": "integer"},
+                                                    "failed": {"type": "integer"},
+                                                    "booking_ids": {"type": "array", "items": {"type": "string"}},
+                                                    "errors": {
+                                                        "type": "array",
+                                                        "items": {
+                                                            "type": "object",
+                                                            "properties": {
+                                                                "row": {"type": "integer", "example": 7},
+                                                                "errors": {"type": "array", "items": {"type": "string"}, "example": ["phone: Field required"]}
+                                                            }
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        },
+                        "400": {"description": "Missing, empty or unsupported file"},
+                        "401": {"description": "Unauthorized"},
+                        "500": {"description": "Server error"}
+                    }
+                }
+            },
+            "/api/autosphere/bookings/export": {
+                "get": {
+                    "tags": ["AutoSphere Motors"],
+                    "summary": "Export Bookings",
+                    "description": "Download bookings as CSV, Parquet or an Arrow IPC stream. The file is streamed in batches with constant memory. Parquet and Arrow require the optional pyarrow package.",
+                    "security": [{"Bearer": []}],
+                    "parameters": [
+                        {
+                            "name": "format",
+                            "in": "query",
+                            "schema": {"type": "string", "enum": ["csv", "parquet", "arrow"], "default": "csv"},
+                            "description": "File format"
+                        },
+                        {
+                            "name": "booking_type",
+                            "in": "query",
+                            "schema": {"type": "string", "enum": ["Service", "Test Drive"]},
+                            "description": "Filter by booking type"
+                        },
+                        {
+                            "name": "date_from",
+                            "in": "query",
+                            "schema": {"type": "string", "format": "date"},
+                            "description": "First day to include (inclusive)",
+                            "example": "2024-12-01"
+                        },
+                        {
+                            "name": "date_to",
+                            "in": "query",
+                            "schema": {"type": "string", "format": "date"},
+                            "description": "Last day to include (inclusive)",
+                            "example": "2024-12-31"
+                        },
+                        {
+                            "name": "date_field",
+                            "in": "query",
+                            "schema": {"type": "string", "enum": ["created_at", "preferred_date"], "default": "created_at"},
+                            "description": "Date the range applies to"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Export file (Content-Disposition attachment)",
+                            "content": {
+                                "text/csv": {"schema": {"type": "string"}},
+                                "application/vnd.apache.parquet": {"schema": {"type": "string", "format": "binary"}},
+                                "application/vnd.apache.arrow.stream": {"schema": {"type": "string", "format": "binary"}}
+                            }
+                        },
+                        "400": {"description": "Format not available (pyarrow not installed)"},
+                        "401": {"description": "Unauthorized"},
+                        "422": {"description": "Validation error"},
                         "500": {"description": "Server error"}
                     }
                 }
@@ -443,6 +642,223 @@ def get_openapi_spec(base_url="https://your-vercel-url.vercel.app"):
                         "500": {"description": "Server error"}
                     }
                 }
+            },
+            "/api/autosphere/metrics": {
+                "get": {
+                    "tags": ["AutoSphere Motors"],
+                    "summary": "AutoSphere Metrics",
+                    "description": "Per-process counters, e.g. how often booking details were extracted locally vs. by the LLM and the booking lookup cache hit rate",
+                    "security": [{"Bearer": []}],
+                    "responses": {
+                        "200": {"description": "Metrics retrieved"},
+                        "401": {"description": "Unauthorized"}
+                    }
+                }
+            },
+            "/api/autosphere/analytics/bookings": {
+                "get": {
+                    "tags": ["AutoSphere Motors"],
+                    "summary": "Booking Analytics",
+                    "description": "Bookings per day (UTC, by created_at) with the average lead time in days from booking to preferred date. Served from a rollup table, so cost grows with the number of days, not bookings.",
+                    "security": [{"Bearer": []}],
+                    "parameters": [
+                        {
+                            "name": "date_from",
+                            "in": "query",
+                            "schema": {"type": "string", "format": "date"},
+                            "description": "First day (inclusive, default 30 days before date_to)"
+                        },
+                        {
+                            "name": "date_to",
+                            "in": "query",
+                            "schema": {"type": "string", "format": "date"},
+                            "description": "Last day (inclusive, default today)"
+                        },
+                        {
+                            "name": "booking_type",
+                            "in": "query",
+                            "schema": {"type": "string", "enum": ["Service", "Test Drive"]},
+                            "description": "Filter by booking type"
+                        },
+                        {
+                            "name": "vehicle_model",
+                            "in": "query",
+                            "schema": {"type": "string"},
+                            "description": "Filter by vehicle model (exact)"
+                        },
+                        {
+                            "name": "group_by",
+                            "in": "query",
+                            "schema": {
+                                "type": "string",
+                                "enum": ["total", "booking_type", "vehicle_model", "booking_type_vehicle_model"],
+                                "default": "total"
+                            },
+                            "description": "Split each day by booking type and/or vehicle model"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Time series retrieved",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "object",
+                                        "properties": {
+                                            "success": {"type": "boolean"},
+                                            "message": {"type": "string"},
+                                            "data": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "date_from": {"type": "string", "format": "date"},
+                                                    "date_to": {"type": "string", "format": "date"},
+                                                    "group_by": {"type": "string"},
+                                                    "total_bookings": {"type": "integer"},
+                                                    "series": {
+                                                        "type": "array",
+                                                        "items": {
+                                                            "type": "object",
+                                                            "properties": {
+                                                                "day": {"type": "string", "format": "date"},
+                                                                "booking_type": {"type": "string"},
+                                                                "vehicle_model": {"type": "string"},
+                                                                "bookings": {"type": "integer", "example": 42},
+                                                                "avg_lead_time_days": {"type": "number", "nullable": True, "example": 6.5}
+                                                            }
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        },
+                        "400": {"description": "date_from is after date_to"},
+                        "401": {"description": "Unauthorized"},
+                        "422": {"description": "Validation error"},
+                        "500": {"description": "Server error"}
+                    }
+                }
+            },
+            "/api/autosphere/availability": {
+                "get": {
+                    "tags": ["AutoSphere Motors"],
+                    "summary": "Booking Availability",
+                    "description": "Open service and test drive slots per day, read from the per-date capacity counters in one range query. Days without bookings show the default capacity.",
+                    "security": [{"Bearer": []}],
+                    "parameters": [
+                        {
+                            "name": "date_from",
+                            "in": "query",
+                            "schema": {"type": "string", "format": "date"},
+                            "description": "First day (inclusive, default today)"
+                        },
+                        {
+                            "name": "date_to",
+                            "in": "query",
+                            "schema": {"type": "string", "format": "date"},
+                            "description": "Last day (inclusive, default 13 days after date_from)"
+                        },
+                        {
+                            "name": "booking_type",
+                            "in": "query",
+                            "schema": {"type": "string", "enum": ["Service", "Test Drive"]},
+                            "description": "Only this booking type"
+                        },
+                        {
+                            "name": "location",
+                            "in": "query",
+                            "schema": {"type": "string"},
+                            "description": "Branch (default - main site)"
+                        }
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "Availability retrieved",
+                            "content": {
+                                "application/json": {
+                                    "schema": {
+                                        "type": "object",
+                                        "properties": {
+                                            "success": {"type": "boolean"},
+                                            "message": {"type": "string"},
+                                            "data": {
+                                                "type": "object",
+                                                "properties": {
+                                                    "date_from": {"type": "string", "format": "date"},
+                                                    "date_to": {"type": "string", "format": "date"},
+                                                    "location": {"type": "string", "nullable": True},
+                                                    "days": {
+                                                        "type": "array",
+                                                        "items": {
+                                                            "type": "object",
+                                                            "properties": {
+                                                                "date": {"type": "string", "format": "date"},
+                                                                "booking_type": {"type": "string", "example": "Service"},
+                                                                "capacity": {"type": "integer", "example": 20},
+                                                                "reserved": {"type": "integer", "example": 18},
+                                                                "available": {"type": "integer", "example": 2}
+                                                            }
+                                                        }
+                                                    }
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        },
+                        "400": {"description": "Invalid or too long date range"},
+                        "401": {"description": "Unauthorized"},
+                        "422": {"description": "Validation error"},
+                        "500": {"description": "Server error"}
+                    }
+                }
+            },
+            "/api/autosphere/ready": {
+                "get": {
+                    "tags": ["AutoSphere Motors"],
+                    "summary": "Readiness Check",
+                    "description": "Report whether the AutoSphere knowledge base is loaded and warm",
+                    "responses": {
+                        "200": {"description": "Knowledge base is warm"},
+                        "503": {"description": "Knowledge base is still loading"}
+                    }
+                }
+            },
+            "/api/admin/query-stats": {
+                "get": {
+                    "tags": ["Admin"],
+                    "summary": "Database Query Stats",
+                    "description": "Per-endpoint query counts and database time for this worker process, the repository methods behind them, recent slow queries and possible N+1 patterns (HR Manager only)",
+                    "security": [{"Bearer": []}],
+                    "parameters": [
+                        {
+                            "name": "top_callers",
+                            "in": "query",
+                            "schema": {"type": "integer", "default": 10, "minimum": 0, "maximum": 100},
+                            "description": "Repository methods listed per endpoint, slowest first"
+                        }
+                    ],
+                    "responses": {
+                        "200": {"description": "Query stats retrieved"},
+                        "401": {"description": "Unauthorized"},
+                        "403": {"description": "Forbidden (HR Manager role required)"},
+                        "422": {"description": "Validation error"}
+                    }
+                },
+                "delete": {
+                    "tags": ["Admin"],
+                    "summary": "Reset Database Query Stats",
+                    "description": "Clear this worker's query counters, slow query log and N+1 reports (HR Manager only)",
+                    "security": [{"Bearer": []}],
+                    "responses": {
+                        "200": {"description": "Query stats reset"},
+                        "401": {"description": "Unauthorized"},
+                        "403": {"description": "Forbidden (HR Manager role required)"}
+                    }
+                }
             }
         }
     }
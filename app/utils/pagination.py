@@ -0,0 +1,19 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque keyset cursor for the (created_at, id) position of a row"""
+    raw = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a cursor from encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(id)
+    except Exception:
+        raise ValueError("Invalid cursor")
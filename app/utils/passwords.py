@@ -0,0 +1,113 @@
+"""
+Password hashing with a configurable algorithm and cost.
+
+PASSWORD_HASH_METHOD uses Werkzeug's method syntax: "scrypt:N:r:p" or
+"pbkdf2:<digest>:<iterations>". Every stored hash records the parameters it was
+made with, so changing the setting never locks anyone out - existing hashes
+still verify, and needs_rehash() tells login to re-hash them with the current
+parameters.
+
+Hashing and verification run on a small thread pool (PASSWORD_HASH_THREADS).
+The pool size caps how many cores a burst of logins can occupy: extra logins
+queue for a hashing slot instead of every request queuing for the CPU. 0 hashes
+on the request thread. The request thread still waits for its hash, so other
+requests only keep being served with threaded gunicorn workers (gunicorn.conf.py)
+that have request threads to spare; hashlib releases the GIL while deriving the key.
+"""
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Mapping, Optional
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+_settings = {'method': 'scrypt:32768:8:1', 'threads': 2}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def normalize_method(method: str) -> str:
+    """
+    Method with Werkzeug's defaults filled in - the prefix its hashes are stored
+    with (e.g. "pbkdf2" -> "pbkdf2:sha256:1000000"). Raises ValueError when invalid.
+    """
+    name, *args = method.strip().split(':')
+    try:
+        if name == 'scrypt':
+            n, r, p = map(int, args) if args else (2 ** 15, 8, 1)
+            if n < 2 or n & (n - 1) or r < 1 or p < 1:
+                raise ValueError
+            return f"scrypt:{n}:{r}:{p}"
+        if name == 'pbkdf2' and len(args) <= 2:
+            digest = args[0] if args else 'sha256'
+            iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+            if digest not in hashlib.algorithms_available or iterations < 1:
+                raise ValueError
+            return f"pbkdf2:{digest}:{iterations}"
+    except ValueError:
+        pass
+    raise ValueError(
+        f"Invalid PASSWORD_HASH_METHOD '{method}': expected scrypt[:N:r:p] (N a power of two) "
+        f"or pbkdf2[:digest[:iterations]]"
+    )
+
+
+def configure_password_hashing(config: Mapping) -> None:
+    """Apply PASSWORD_HASH_METHOD / PASSWORD_HASH_THREADS, failing fast on an invalid method"""
+    global _executor
+    
+    threads = int(config['PASSWORD_HASH_THREADS'])
+    if threads < 0:
+        raise ValueError("PASSWORD_HASH_THREADS must be 0 or more")
+    method = normalize_method(config['PASSWORD_HASH_METHOD'])
+    with _executor_lock:
+        if threads != _settings['threads'] and _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        _settings.update(method=method, threads=threads)
+
+
+def current_method() -> str:
+    return _settings['method']
+
+
+def _pool() -> Optional[ThreadPoolExecutor]:
+    """The hashing pool, created on first use (None when disabled)"""
+    global _executor
+    
+    if not _settings['threads']:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_settings['threads'], thread_name_prefix='password-hash')
+        return _executor
+
+
+def _run(fn, *args):
+    """Run fn on the hashing pool and wait for it (inline when the pool is disabled)"""
+    executor = _pool()
+    if executor is None:
+        return fn(*args)
+    return executor.submit(fn, *args).result()
+
+
+def hash_password(password: str) -> str:
+    """Hash with the configured method"""
+    return _run(generate_password_hash, password, _settings['method'])
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash several passwords with the configured method, in parallel on the hashing pool"""
+    method = _settings['method']
+    executor = _pool()
+    if executor is None:
+        return [generate_password_hash(password, method) for password in passwords]
+    return list(executor.map(lambda password: generate_password_hash(password, method), passwords))
+
+
+def verify_password(password_hash: str, password: str) -> bool:
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Whether a stored hash was made with different parameters than the configured ones"""
+    return password_hash.split('$', 1)[0] != _settings['method']
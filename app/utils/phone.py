@@ -0,0 +1,29 @@
+"""
+Phone number normalisation for booking lookups.
+"""
+import re
+
+# Numbers are matched on their last N digits so "+971 50 123 4567" and
+# "050 123 4567" (same number, national format) find each other
+PHONE_MATCH_DIGITS = 9
+
+
+def normalize_phone(raw: str) -> str:
+    """
+    Normalise a phone number to E.164 style: digits only, with a leading '+'
+    when an international prefix ('+' or '00') was given. Returns '' if no digits.
+    """
+    raw = str(raw).strip() if raw is not None else ''
+    digits = re.sub(r'\D', '', raw)
+    if not digits:
+        return ''
+    if raw.startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+    return digits
+
+
+def reversed_digits(raw: str) -> str:
+    """Digits in reverse order - lets a last-N-digits lookup use an index range scan"""
+    return re.sub(r'\D', '', str(raw) if raw is not None else '')[::-1]
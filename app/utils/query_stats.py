@@ -0,0 +1,207 @@
+"""
+SQL statement instrumentation.
+
+Engine events time every statement and attribute it to the HTTP endpoint being
+served and to the repository method that issued it (the outermost repository
+frame on the stack, e.g. BookingRepository.search). Per process this keeps:
+  - per-endpoint request/query counts and database time, split by caller
+  - the most recent statements slower than SLOW_QUERY_MS (with their bound
+    parameters only when SLOW_QUERY_LOG_PARAMETERS is on - they hold password
+    hashes, phone numbers and names)
+  - N+1 detections: one request running the same SELECT N_PLUS_ONE_THRESHOLD
+    or more times, which usually means a query inside a loop
+Counters are per worker process and reset on restart, like app.utils.metrics.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime
+from typing import Dict
+from flask import Flask, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+NO_REQUEST = '(no request)'
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_REPOSITORY_DIR = os.path.join(_APP_DIR, 'repositories') + os.sep
+_MAX_PARAMETERS_CHARS = 500
+
+_lock = threading.Lock()
+_endpoints = defaultdict(lambda: {'requests': 0, 'queries': 0, 'total_ms': 0.0, 'max_queries': 0,
+                                  'slow_queries': 0, 'n_plus_one': 0,
+                                  'callers': defaultdict(lambda: [0, 0.0])})
+_slow_queries = deque(maxlen=100)
+_n_plus_one = deque(maxlen=100)
+_settings = {'slow_query_ms': 200.0, 'n_plus_one_threshold': 10, 'log_parameters': False}
+
+
+def _caller() -> str:
+    """
+    Repository method (Class.method) that issued the current statement, or the
+    innermost app function when the statement did not come from a repository.
+    """
+    frame = sys._getframe(2)
+    repository_frame = app_frame = None
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_REPOSITORY_DIR):
+            repository_frame = frame
+        elif repository_frame is not None:
+            # Left the repository layer - the last repository frame was the entry point
+            break
+        elif app_frame is None and filename.startswith(_APP_DIR) and filename != __file__:
+            app_frame = frame
+        frame = frame.f_back
+    frame = repository_frame or app_frame
+    if frame is None:
+        return '(unknown)'
+    owner = frame.f_locals.get('self')
+    if owner is not None:
+        return f"{type(owner).__name__}.{frame.f_code.co_name}"
+    module = os.path.relpath(frame.f_code.co_filename, _APP_DIR)[:-3].replace(os.sep, '.')
+    return f"{module}.{frame.f_code.co_name}"
+
+
+def _endpoint() -> str:
+    if not has_request_context():
+        return NO_REQUEST
+    return request.endpoint or request.path
+
+
+def _format_parameters(parameters) -> str:
+    if not _settings['log_parameters']:
+        return '(redacted)'
+    text = repr(parameters)
+    if len(text) > _MAX_PARAMETERS_CHARS:
+        text = text[:_MAX_PARAMETERS_CHARS] + '...'
+    return text
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info['query_start'].pop()) * 1000
+    endpoint = _endpoint()
+    caller = _caller()
+    slow = elapsed_ms >= _settings['slow_query_ms']
+    
+    with _lock:
+        stats = _endpoints[endpoint]
+        stats['queries'] += 1
+        stats['total_ms'] += elapsed_ms
+        by_caller = stats['callers'][caller]
+        by_caller[0] += 1
+        by_caller[1] += elapsed_ms
+        if slow:
+            stats['slow_queries'] += 1
+            _slow_queries.append({
+                'at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+                'endpoint': endpoint,
+                'caller': caller,
+                'duration_ms': round(elapsed_ms, 2),
+                'statement': statement,
+                'parameters': _format_parameters(parameters),
+            })
+    
+    if slow:
+        print(f"Slow query ({elapsed_ms:.1f} ms) in {endpoint} from {caller}: {statement} "
+              f"-- parameters: {_format_parameters(parameters)}")
+    if endpoint != NO_REQUEST and 'query_stats' in g:
+        g.query_stats['queries'] += 1
+        # Only repeated reads count as N+1 - batched writes legitimately repeat an INSERT
+        if not executemany and statement.lstrip()[:6].upper() == 'SELECT':
+            g.query_stats['statements'][(statement, caller)] += 1
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute - drop its start time
+    start_times = context.connection.info.get('query_start') if context.connection is not None else None
+    if start_times:
+        start_times.pop()
+
+
+def _start_request():
+    g.query_stats = {'queries': 0, 'statements': Counter()}
+
+
+def _finish_request(exc):
+    request_stats = g.pop('query_stats', None)
+    if request_stats is None:
+        return
+    endpoint = _endpoint()
+    threshold = _settings['n_plus_one_threshold']
+    repeated = [(statement, caller, count) for (statement, caller), count in request_stats['statements'].items()
+                if count >= threshold]
+    
+    with _lock:
+        stats = _endpoints[endpoint]
+        stats['requests'] += 1
+        stats['max_queries'] = max(stats['max_queries'], request_stats['queries'])
+        stats['n_plus_one'] += len(repeated)
+        for statement, caller, count in repeated:
+            _n_plus_one.append({
+                'at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+                'endpoint': endpoint,
+                'caller': caller,
+                'executions': count,
+                'statement': statement,
+            })
+    
+    for statement, caller, count in repeated:
+        print(f"Possible N+1 in {endpoint}: {caller} ran the same statement {count} times in one request: "
+              f"{statement}")
+
+
+def install_query_stats(app: Flask, engine: Engine) -> None:
+    """Time every statement on engine and track requests served by app"""
+    _settings['slow_query_ms'] = float(app.config['SLOW_QUERY_MS'])
+    _settings['n_plus_one_threshold'] = int(app.config['N_PLUS_ONE_THRESHOLD'])
+    _settings['log_parameters'] = bool(app.config['SLOW_QUERY_LOG_PARAMETERS'])
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    app.before_request(_start_request)
+    app.teardown_request(_finish_request)
+
+
+def get_query_stats(top_callers: int = 10) -> Dict:
+    """Snapshot for the admin view - endpoints sorted by total database time"""
+    with _lock:
+        endpoints = []
+        for endpoint, stats in _endpoints.items():
+            requests = stats['requests']
+            callers = sorted(stats['callers'].items(), key=lambda item: item[1][1], reverse=True)
+            endpoints.append({
+                'endpoint': endpoint,
+                'requests': requests,
+                'queries': stats['queries'],
+                'total_ms': round(stats['total_ms'], 2),
+                'avg_queries_per_request': round(stats['queries'] / requests, 2) if requests else None,
+                'avg_ms_per_request': round(stats['total_ms'] / requests, 2) if requests else None,
+                'max_queries_per_request': stats['max_queries'],
+                'slow_queries': stats['slow_queries'],
+                'n_plus_one': stats['n_plus_one'],
+                'callers': [
+                    {'caller': caller, 'queries': count, 'total_ms': round(total_ms, 2)}
+                    for caller, (count, total_ms) in callers[:top_callers]
+                ],
+            })
+        return {
+            'settings': dict(_settings),
+            'endpoints': sorted(endpoints, key=lambda item: item['total_ms'], reverse=True),
+            'slow_queries': list(reversed(_slow_queries)),
+            'n_plus_one': list(reversed(_n_plus_one)),
+        }
+
+
+def reset_query_stats() -> None:
+    """Clear all counters and recent slow query / N+1 entries"""
+    with _lock:
+        _endpoints.clear()
+        _slow_queries.clear()
+        _n_plus_one.clear()
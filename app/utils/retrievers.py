@@ -0,0 +1,89 @@
+"""
+Local retrieval backends for the AutoSphere knowledge base.
+
+Any retriever used by AutoSphereService only needs the slice of the LangChain
+vectorstore API the service calls: ``similarity_search(query, k)`` returning
+Documents with ``page_content``. The FAISS vectorstore already satisfies it.
+"""
+import re
+from collections import Counter
+from typing import List, Protocol
+import numpy as np
+from scipy import sparse
+from langchain_core.documents import Document
+
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+_STOP_WORDS = frozenset("""
+a an and are as at be by can do does for from have how i if in is it its me my
+of on or our so that the their there this to was we what when where which who
+will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without common stop words"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+class Retriever(Protocol):
+    """
+    Interface for knowledge base retrievers. Structural, so the LangChain FAISS
+    vectorstore satisfies it without subclassing.
+    """
+    
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """The k chunks most relevant to query, best first"""
+        ...
+
+
+class BM25Retriever(Retriever):
+    """
+    Okapi BM25 over the policy chunks, computed in-process with NumPy/SciPy.
+    No network call is needed, so retrieval costs well under a millisecond.
+    """
+    
+    def __init__(self, documents: List[Document], k1: float = 1.5, b: float = 0.75):
+        if not documents:
+            raise ValueError("BM25Retriever requires at least one document")
+        self.documents = documents
+        
+        tokenized = [tokenize(doc.page_content) for doc in documents]
+        self.vocabulary = {}
+        rows, cols, counts = [], [], []
+        for row, tokens in enumerate(tokenized):
+            for term, count in Counter(tokens).items():
+                col = self.vocabulary.setdefault(term, len(self.vocabulary))
+                rows.append(row)
+                cols.append(col)
+                counts.append(count)
+        
+        tf = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float32), (rows, cols)),
+            shape=(len(documents), len(self.vocabulary))
+        )
+        doc_lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.float32)
+        avg_length = doc_lengths.mean() or 1.0
+        
+        df = np.bincount(tf.indices, minlength=len(self.vocabulary)).astype(np.float32)
+        n = float(len(documents))
+        idf = np.log((n - df + 0.5) / (df + 0.5) + 1.0)
+        
+        # Precompute the full BM25 term weight for every (document, term) pair so a
+        # query is a single sparse matrix-vector product
+        weights = tf.copy()
+        length_norm = k1 * (1 - b + b * doc_lengths / avg_length)
+        row_norm = np.repeat(length_norm, np.diff(tf.indptr))
+        weights.data = tf.data * (k1 + 1) / (tf.data + row_norm)
+        self.weights = (weights @ sparse.diags(idf)).tocsc()
+    
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        term_ids = [self.vocabulary[t] for t in set(tokenize(query)) if t in self.vocabulary]
+        if not term_ids:
+            return self.documents[:k]
+        
+        scores = np.asarray(self.weights[:, term_ids].sum(axis=1)).ravel()
+        k = min(k, len(self.documents))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.documents[i] for i in top]
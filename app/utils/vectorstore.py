@@ -1,33 +1,118 @@
 import os
-from langchain_community.document_loaders import Docx2txtLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+import pickle
+import threading
+from typing import TYPE_CHECKING
+from app.bundle import VECTORSTORE_DIR, bundle_path
 from app.config import Config
+from app.utils.file_processor import read_docx
+
+# faiss, langchain and the retrievers' numpy/scipy are imported inside the loaders:
+# they cost seconds at import and only the knowledge base endpoints need them
+if TYPE_CHECKING:
+    from app.utils.retrievers import Retriever
 
 
 EMBED_MODEL = "text-embedding-3-large"
 
+# Process-wide vectorstore shared by every AutoSphereService instance
+_vectorstore = None
+_vectorstore_lock = threading.Lock()
+
+
+def _read_vectorstore(vectorstore_path: str, embeddings):
+    """Open a saved FAISS vectorstore with the index memory-mapped read-only"""
+    import faiss
+    from langchain_community.vectorstores import FAISS
+    
+    # A read-only mmap lets forked workers share the index pages instead of each
+    # holding a private copy; FAISS.load_local always reads into private memory.
+    # IO_FLAG_MMAP_IFC is needed for flat indexes - plain IO_FLAG_MMAP still copies their vectors
+    index = faiss.read_index(
+        os.path.join(vectorstore_path, 'index.faiss'),
+        faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+    )
+    with open(os.path.join(vectorstore_path, 'index.pkl'), 'rb') as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def _split_policy_document(policy_doc_path: str):
+    """Split the AutoSphere policy document into retrieval chunks"""
+    from langchain_core.documents import Document
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    
+    if not os.path.exists(policy_doc_path):
+        raise FileNotFoundError(f"Policy document not found: {policy_doc_path}")
+    
+    # python-docx is already a dependency; Docx2txtLoader needs the extra docx2txt package
+    documents = [Document(page_content=read_docx(policy_doc_path), metadata={"source": policy_doc_path})]
+    splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=150)
+    return splitter.split_documents(documents)
+
 
-def load_vectorstore():
-    """Load or create FAISS vectorstore for AutoSphere policy documents"""
-    vectorstore_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'vectorstore')
+def load_vectorstore(backend: str = None) -> 'Retriever':
+    """
+    Load the retriever for AutoSphere policy documents.
+    backend is 'faiss' (OpenAI embeddings) or 'bm25' (local, no network);
+    defaults to Config.RETRIEVER_BACKEND.
+    """
+    backend = (backend or Config.RETRIEVER_BACKEND).lower()
+    # Prefer the verified copy shipped in the deploy bundle
+    vectorstore_path = bundle_path(VECTORSTORE_DIR) or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'vectorstore'
+    )
     policy_doc_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'autosphere_policy.docx')
     
-    embeddings = OpenAIEmbeddings(model=EMBED_MODEL, openai_api_key=Config.OPENAI_API_KEY)
+    if backend == 'bm25':
+        from app.utils.retrievers import BM25Retriever
+        return BM25Retriever(_split_policy_document(policy_doc_path))
+    if backend != 'faiss':
+        raise ValueError(f"Unknown retriever backend: {backend}")
+    
+    from langchain_community.vectorstores import FAISS
+    from langchain_openai import OpenAIEmbeddings
+    from app.utils.embedding_cache import CachedEmbeddings
+    
+    embeddings = CachedEmbeddings(
+        OpenAIEmbeddings(model=EMBED_MODEL, openai_api_key=Config.OPENAI_API_KEY),
+        model=EMBED_MODEL,
+        max_size=Config.EMBEDDING_CACHE_SIZE,
+        persist_path=Config.EMBEDDING_CACHE_PATH or None
+    )
     
     if not os.path.exists(vectorstore_path):
         # Create vectorstore from policy document
-        if not os.path.exists(policy_doc_path):
-            raise FileNotFoundError(f"Policy document not found: {policy_doc_path}")
-        
-        loader = Docx2txtLoader(policy_doc_path)
-        documents = loader.load()
-        splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=150)
-        docs = splitter.split_documents(documents)
+        docs = _split_policy_document(policy_doc_path)
         vectorstore = FAISS.from_documents(docs, embeddings)
         vectorstore.save_local(vectorstore_path)
-    else:
-        vectorstore = FAISS.load_local(vectorstore_path, embeddings, allow_dangerous_deserialization=True)
+        # Reopen from disk so the index is memory-mapped like the warm path
     
-    return vectorstore
+    return _read_vectorstore(vectorstore_path, embeddings)
+
+
+def get_vectorstore() -> 'Retriever':
+    """Return the process-wide vectorstore, loading it on first use"""
+    global _vectorstore
+    if _vectorstore is None:
+        with _vectorstore_lock:
+            if _vectorstore is None:
+                _vectorstore = load_vectorstore()
+    return _vectorstore
+
+
+def preload_vectorstore() -> bool:
+    """
+    Warm the process-wide vectorstore at startup.
+    Returns False instead of raising so a missing key or index does not stop the app.
+    """
+    try:
+        get_vectorstore()
+        return True
+    except Exception as e:
+        print(f"Warning: Vectorstore preload failed: {e}")
+        return False
+
+
+def is_vectorstore_ready() -> bool:
+    """Whether the vectorstore is loaded and ready to serve queries"""
+    return _vectorstore is not None
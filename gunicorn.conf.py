@@ -0,0 +1,14 @@
+# Gunicorn settings: gunicorn -c gunicorn.conf.py run:app
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', os.getenv('FLASK_PORT', '5001'))}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+
+# Threaded workers: while one request waits on I/O or a password hash (hashlib
+# releases the GIL) the worker's other threads keep serving requests
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '12'))
+
+# Build the app (and the memory-mapped vectorstore) in the master before forking
+# so every worker shares the same index pages and no first request pays the load
+preload_app = True
@@ -0,0 +1,65 @@
+"""
+Throughput and memory benchmark for the streaming booking export.
+
+Usage: python scripts/bench_booking_export.py [--rows 500000]
+
+Fills a temporary SQLite database with synthetic bookings, then consumes
+AutoSphereService.export_bookings in each format, reporting rows/s, output
+size and the peak Python memory allocated while streaming (tracemalloc).
+Peak memory should stay roughly flat as --rows grows.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault('OPENAI_API_KEY', 'bench')
+        os.environ['VECTORSTORE_PRELOAD'] = 'false'
+        from app import create_app
+        from app.database import db
+        from app.models.booking import Booking
+        from app.services.autosphere_service import AutoSphereService
+        from app.utils.export import PYARROW_AVAILABLE
+
+        app = create_app()
+        service = AutoSphereService()
+        with app.app_context():
+            now = datetime.utcnow()
+            for offset in range(0, args.rows, 10_000):
+                db.session.execute(db.insert(Booking.__table__), [
+                    {'booking_id': f'AS-BENCH-{i:08d}', 'booking_type': 'Service', 'name': f'Customer {i}',
+                     'phone': '0500000000', 'vehicle_model': 'Toyota Camry',
+                     'preferred_date': date(2030, 1, 1), 'created_at': now}
+                    for i in range(offset, min(offset + 10_000, args.rows))
+                ])
+                db.session.commit()
+
+            formats = ['csv'] + (['parquet', 'arrow'] if PYARROW_AVAILABLE else [])
+            for fmt in formats:
+                tracemalloc.start()
+                start = time.perf_counter()
+                chunks, _, _ = service.export_bookings(format=fmt)
+                size = sum(len(chunk) for chunk in chunks)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{fmt:8} {args.rows / elapsed:10,.0f} rows/s  {size / 1e6:7.1f} MB  peak {peak / 1e6:6.1f} MB")
+            if not PYARROW_AVAILABLE:
+                print("pyarrow not installed - skipped parquet/arrow")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark for the bulk booking import endpoint.
+
+Usage: python scripts/bench_booking_import.py [--rows 100000] [--invalid-every 1000] [--xlsx]
+
+Builds a CSV (or XLSX) of synthetic bookings, with every Nth row missing its
+phone, posts it to POST /api/autosphere/bookings/import against a temporary
+SQLite database and checks the counts, the error report and that every
+booking ID is unique.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+HEADER = ["Booking Type", "Name", "Phone", "Vehicle Model", "Preferred Date"]
+
+
+def build_rows(count: int, invalid_every: int):
+    rng = random.Random(7)
+    for i in range(count):
+        phone = '' if invalid_every and i % invalid_every == invalid_every - 1 else f"+97150{rng.randrange(10**7):07d}"
+        yield [rng.choice(["Service", "Test Drive"]), f"Customer {i}", phone,
+               rng.choice(["Toyota Camry", "Nissan Patrol", "BMW X5"]), f"2030-01-{i % 28 + 1:02d}"]
+
+
+def build_file(rows, xlsx: bool) -> bytes:
+    if xlsx:
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(HEADER)
+        for row in rows:
+            sheet.append(row)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        return buffer.getvalue()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--invalid-every', type=int, default=1000, help='Every Nth row has no phone (0 = none)')
+    parser.add_argument('--xlsx', action='store_true', help='Upload an XLSX file instead of CSV')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault('OPENAI_API_KEY', 'bench')
+        os.environ['VECTORSTORE_PRELOAD'] = 'false'
+        # Needs the admin user from users.xlsx
+        os.environ['SEED_ON_STARTUP'] = 'true'
+        # Measure insert throughput, not capacity refusals - every synthetic date fits
+        os.environ['BOOKING_CAPACITY_SERVICE'] = os.environ['BOOKING_CAPACITY_TEST_DRIVE'] = str(args.rows)
+        from app import create_app
+        from app.database import db
+        from app.models.booking import Booking
+
+        app = create_app()
+        app.config['MAX_CONTENT_LENGTH'] = None
+        client = app.test_client()
+        token = client.post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'}).get_json()['data']['token']
+
+        filename = 'bookings.xlsx' if args.xlsx else 'bookings.csv'
+        content = build_file(build_rows(args.rows, args.invalid_every), args.xlsx)
+        print(f"{filename}: {args.rows} rows, {len(content) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        response = client.post(
+            '/api/autosphere/bookings/import',
+            data={'file': (io.BytesIO(content), filename)},
+            headers={'Authorization': f'Bearer {token}'},
+            content_type='multipart/form-data'
+        )
+        elapsed = time.perf_counter() - start
+        body = response.get_json()
+        if response.status_code != 200:
+            print(f"FAILED: {response.status_code} {body}")
+            sys.exit(1)
+        result = body['data']
+
+        expected_failed = args.rows // args.invalid_every if args.invalid_every else 0
+        with app.app_context():
+            stored = db.session.query(Booking).filter(Booking.name.like('Customer %')).count()
+        unique_ids = len(set(result['booking_ids']))
+        print(f"Imported {result['imported']} ({result['imported'] / elapsed:,.0f} rows/s), "
+              f"failed {result['failed']} in {elapsed:.2f}s")
+        if result['errors']:
+            print(f"First error: {result['errors'][0]}")
+
+        ok = (result['failed'] == expected_failed and result['imported'] == args.rows - expected_failed
+              and stored == result['imported'] and unique_ids == result['imported'])
+        print("OK" if ok else f"MISMATCH: stored {stored}, unique IDs {unique_ids}, expected failures {expected_failed}")
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
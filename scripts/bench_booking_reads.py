@@ -0,0 +1,124 @@
+"""
+Benchmark of the read-only Core row path against ORM entities.
+
+Usage: python scripts/bench_booking_reads.py [--rows 100000] [--repeat 20] [--lookups 5000]
+
+Fills a temporary SQLite database with synthetic bookings and policy documents,
+then times each read both ways - ORM entities + to_dict() and BookingRow /
+PolicySummaryRow tuples + to_dict() - checking that both return the same JSON:
+  page      one 500-row search page (GET /api/autosphere/bookings)
+  phone     search by phone suffix
+  stream    every booking through the streaming iterator (?stream=ndjson)
+  lookup    --lookups single bookings by booking_id (GET /bookings/<id>)
+  policies  the 500 newest policy documents (GET /api/hr/policy)
+Each repetition starts from an empty session, as a request would.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def timed(fn, repeat):
+    """Median seconds per call and the last result, with a fresh session for every call"""
+    from app.database import db
+
+    timings = []
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    db.session.remove()
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20, help='Repetitions per case (median reported)')
+    parser.add_argument('--lookups', type=int, default=5000, help='Booking ID lookups per lookup run')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault('OPENAI_API_KEY', 'bench')
+        os.environ['VECTORSTORE_PRELOAD'] = 'false'
+        os.environ['QUERY_STATS_ENABLED'] = 'false'
+        os.environ['DEPLOY_BUNDLE_DIR'] = os.path.join(tmp, 'no-bundle')
+        from app import create_app
+        from app.database import db
+        from app.models import Booking, PolicyDocument
+        from app.repositories.booking_repository import BookingRepository
+        from app.repositories.policy_document_repository import PolicyDocumentRepository
+
+        app = create_app()
+        rng = random.Random(7)
+        with app.app_context():
+            start = time.perf_counter()
+            now = datetime.utcnow()
+            for offset in range(0, args.rows, 10_000):
+                db.session.execute(db.insert(Booking.__table__), [
+                    {'booking_id': f'AS-BENCH-{i:08d}', 'booking_type': rng.choice(['Service', 'Test Drive']),
+                     'name': f'Customer {i}', 'phone': f'+97150{rng.randrange(10**7):07d}',
+                     'phone_normalized': None, 'phone_reversed': None,
+                     'vehicle_model': rng.choice(['Toyota Camry', 'Nissan Patrol', 'BMW X5']),
+                     'preferred_date': date(2030, 1, 1) + timedelta(days=i % 365), 'location': None,
+                     'created_at': now - timedelta(seconds=i)}
+                    for i in range(offset, min(offset + 10_000, args.rows))
+                ])
+                db.session.commit()
+            BookingRepository().backfill_phone_lookup_columns(batch_size=10_000)
+            PolicyDocumentRepository().create_many(
+                {'filename': f'policy-{i}.pdf', 'content': f'Policy {i}. ' * 2000, 'uploaded_by': None}
+                for i in range(500)
+            )
+            print(f"Inserted {args.rows} bookings and 500 policies in {time.perf_counter() - start:.1f}s\n")
+
+            repo = BookingRepository()
+            policies = PolicyDocumentRepository()
+            suffix = '12'
+            ids = [f'AS-BENCH-{rng.randrange(args.rows):08d}' for _ in range(args.lookups)]
+
+            def policy_dicts(documents):
+                return [{'id': p.id, 'filename': p.filename,
+                         'uploaded_at': p.uploaded_at.isoformat() if p.uploaded_at else None,
+                         'uploaded_by': p.uploaded_by} for p in documents]
+
+            cases = [
+                ('page', 500, args.repeat,
+                 lambda: [b.to_dict() for b in repo.search(limit=500)],
+                 lambda: [b.to_dict() for b in repo.search_rows(limit=500)]),
+                ('phone', None, args.repeat,
+                 lambda: [b.to_dict() for b in repo.search(phone_suffix=suffix, limit=500)],
+                 lambda: [b.to_dict() for b in repo.search_rows(phone_suffix=suffix, limit=500)]),
+                ('stream', args.rows, max(1, args.repeat // 10),
+                 lambda: sum(1 for b in repo.iter_search(batch_size=1000) if b.to_dict()),
+                 lambda: sum(1 for b in repo.iter_search_rows(batch_size=1000) if b.to_dict())),
+                ('lookup', args.lookups, max(1, args.repeat // 10),
+                 lambda: [repo.get_by_booking_id(i).to_dict() for i in ids],
+                 lambda: [repo.get_row_by_booking_id(i).to_dict() for i in ids]),
+                # The ORM listing builds the same metadata dict (to_dict would also load every blob)
+                ('policies', 500, args.repeat,
+                 lambda: policy_dicts(policies.get_recent(500)),
+                 lambda: [p.to_dict() for p in policies.list_recent(500)]),
+            ]
+            print(f"{'case':10} {'rows':>8} {'ORM ms':>10} {'rows ms':>10} {'speedup':>8}")
+            for name, count, repeat, orm, core in cases:
+                orm_seconds, orm_result = timed(orm, repeat)
+                core_seconds, core_result = timed(core, repeat)
+                if orm_result != core_result:
+                    sys.exit(f"{name}: row path returned different data than the ORM path")
+                count = count if count is not None else len(core_result)
+                print(f"{name:10} {count:8} {orm_seconds * 1000:10.1f} {core_seconds * 1000:10.1f} "
+                      f"{orm_seconds / core_seconds:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
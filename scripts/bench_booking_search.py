@@ -0,0 +1,84 @@
+"""
+Latency benchmark for fuzzy booking search.
+
+Usage: python scripts/bench_booking_search.py [--rows 1000000] [--repeat 20]
+
+Fills a temporary SQLite database with synthetic bookings (the search index is
+populated by its insert trigger), then times BookingRepository.fuzzy_search
+for partial and misspelt names and models.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+FIRST_NAMES = ["John", "Mary", "Ahmed", "Fatima", "Omar", "Aisha", "Ravi", "Priya", "James", "Sara",
+               "Mohammed", "Layla", "David", "Noor", "Ali", "Hannah", "Yusuf", "Maria", "Khalid", "Elena"]
+LAST_NAMES = ["Smith", "Jones", "Khan", "Al Mansouri", "Patel", "Haddad", "Williams", "Rahman", "Nair",
+              "Garcia", "Hassan", "Brown", "Kumar", "Ibrahim", "Taylor", "Said", "Fernandes", "Ali"]
+QUERIES = [
+    {"name": "jon smth"},
+    {"name": "fatma"},
+    {"name": "al mansoori"},
+    {"vehicle_model": "camry"},
+    {"vehicle_model": "rang rover"},
+    {"name": "priya", "vehicle_model": "civic"},
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault('OPENAI_API_KEY', 'bench')
+        os.environ['VECTORSTORE_PRELOAD'] = 'false'
+        from app import create_app
+        from app.database import db
+        from app.models.booking import Booking
+        from app.repositories.booking_repository import BookingRepository
+        from app.utils.booking_parser import VEHICLE_CATALOG
+
+        app = create_app()
+        models = [f"{brand} {model}" for brand, names in VEHICLE_CATALOG.items() for model in names]
+        rng = random.Random(42)
+
+        with app.app_context():
+            start = time.perf_counter()
+            now = datetime.utcnow()
+            for offset in range(0, args.rows, 10_000):
+                db.session.execute(db.insert(Booking), [
+                    {
+                        'booking_id': f'AS-BENCH-{i:08d}', 'booking_type': 'Service',
+                        'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                        'phone': '0500000000', 'vehicle_model': rng.choice(models),
+                        'preferred_date': date(2030, 1, 1), 'created_at': now,
+                    }
+                    for i in range(offset, min(offset + 10_000, args.rows))
+                ])
+                db.session.commit()
+            print(f"Inserted {args.rows} bookings in {time.perf_counter() - start:.1f}s")
+
+            repo = BookingRepository()
+            for query in QUERIES:
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    results = repo.fuzzy_search(limit=20, **query)
+                    timings.append((time.perf_counter() - start) * 1000)
+                top = results[0] if results else None
+                print(f"{str(query):45} p50 {statistics.median(timings):7.1f}ms  max {max(timings):7.1f}ms  "
+                      f"top: {top.name + ' / ' + top.vehicle_model if top else '-'}")
+
+
+if __name__ == '__main__':
+    main()
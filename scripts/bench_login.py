@@ -0,0 +1,198 @@
+"""
+Login throughput benchmark for the password hashing settings.
+
+Usage: python scripts/bench_login.py [--clients 8] [--duration 5] [--workers 1]
+                                     [--method M ...] [--threads N ...] [--worker-class C ...]
+
+Creates a temporary SQLite database of users and, for every hashing method
+(default: the configured PASSWORD_HASH_METHOD), PASSWORD_HASH_THREADS value
+(default: 0, i.e. on the request thread, and the configured pool size) and
+gunicorn worker class (default: gthread as in gunicorn.conf.py, and sync),
+starts `gunicorn -c gunicorn.conf.py run:app` - the production setup - and runs
+--clients concurrent POST /api/auth/login loops over HTTP for --duration
+seconds while one probe thread keeps requesting a cheap endpoint
+(GET /api/hr/policy). Reports:
+  logins/s       wall-clock login throughput
+  per core       logins per second of server CPU time - what one core sustains
+  login p50/p99  login latency
+  probe p50/p99  latency of the other request while logins are running
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Tuple
+
+import requests
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+USERS = 100
+PASSWORD = 'bench-password'
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p), len(values) - 1)] * 1000 if values else 0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def server_cpu(pid: int) -> float:
+    """CPU seconds used by the gunicorn master and its workers"""
+    total = 0.0
+    pids = [pid] + [int(p) for p in subprocess.run(
+        ['pgrep', '-P', str(pid)], capture_output=True, text=True
+    ).stdout.split()]
+    for p in pids:
+        try:
+            with open(f'/proc/{p}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        total += (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    return total
+
+
+def start_server(env: dict, worker_class: str, workers: int) -> Tuple[subprocess.Popen, str]:
+    """Start gunicorn on a free port and wait until it answers"""
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--worker-class', worker_class,
+               '--workers', str(workers), '--bind', f'127.0.0.1:{port}', 'run:app']
+    if worker_class == 'sync':
+        # gunicorn silently switches sync to gthread when threads > 1
+        command[-1:-1] = ['--threads', '1']
+    server = subprocess.Popen(
+        command,
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            requests.get(f'{url}/', timeout=1)
+            return server, url
+        except requests.ConnectionError:
+            if server.poll() is not None:
+                sys.exit(f"gunicorn exited with status {server.returncode}")
+            time.sleep(0.2)
+    server.kill()
+    sys.exit("gunicorn did not start within 60s")
+
+
+def run(url: str, pid: int, clients: int, duration: float, token: str) -> dict:
+    login_latencies, probe_latencies, failures = [], [], []
+    stop = threading.Event()
+
+    def login_loop(n: int):
+        http = requests.Session()
+        i = n
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = http.post(f'{url}/api/auth/login', json={'username': f'bench{i % USERS}', 'password': PASSWORD})
+            login_latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failures.append(response.status_code)
+            i += clients
+
+    def probe_loop():
+        http = requests.Session()
+        headers = {'Authorization': f'Bearer {token}'}
+        while not stop.is_set():
+            start = time.perf_counter()
+            http.get(f'{url}/api/hr/policy?limit=1', headers=headers)
+            probe_latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_loop, args=(n,)) for n in range(clients)]
+    threads.append(threading.Thread(target=probe_loop))
+    cpu_start, wall_start = server_cpu(pid), time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    cpu, wall = server_cpu(pid) - cpu_start, time.perf_counter() - wall_start
+    if failures:
+        sys.exit(f"{len(failures)} logins failed (status {sorted(set(failures))})")
+    return {
+        'logins': len(login_latencies) / wall,
+        'per_core': len(login_latencies) / cpu if cpu else 0,
+        'login_p50': percentile(login_latencies, 0.5),
+        'login_p99': percentile(login_latencies, 0.99),
+        'probe_p50': percentile(probe_latencies, 0.5),
+        'probe_p99': percentile(probe_latencies, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent login loops')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds per run')
+    parser.add_argument('--workers', type=int, default=1, help='Gunicorn worker processes')
+    parser.add_argument('--method', action='append', help='Hashing method(s) to compare (default: configured)')
+    parser.add_argument('--threads', type=int, action='append',
+                        help='PASSWORD_HASH_THREADS value(s) to compare (default: 0 and configured)')
+    parser.add_argument('--worker-class', action='append',
+                        help='Gunicorn worker class(es) to compare (default: gthread and sync)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault('OPENAI_API_KEY', 'bench')
+        os.environ['VECTORSTORE_PRELOAD'] = 'false'
+        os.environ['QUERY_STATS_ENABLED'] = 'false'
+        os.environ['DEPLOY_BUNDLE_DIR'] = os.path.join(tmp, 'no-bundle')
+        from app import create_app
+        from app.database import db
+        from app.middleware.auth import generate_token
+        from app.models import User
+        from app.utils.passwords import configure_password_hashing, hash_password
+
+        app = create_app()
+        methods = args.method or [app.config['PASSWORD_HASH_METHOD']]
+        pool_sizes = args.threads or sorted({0, app.config['PASSWORD_HASH_THREADS']})
+        worker_classes = args.worker_class or ['gthread', 'sync']
+        token = generate_token(0, 'bench', 'Employee')
+        with app.app_context():
+            db.session.execute(db.insert(User), [
+                {'username': f'bench{i}', 'password': '', 'role': 'Employee'} for i in range(USERS)
+            ])
+            db.session.commit()
+
+        print(f"{args.clients} concurrent logins for {args.duration:g}s per run, "
+              f"{args.workers} gunicorn worker(s), {os.cpu_count()} CPU(s)\n")
+        print(f"{'method':24} {'worker':>7} {'threads':>7} {'logins/s':>9} {'per core':>9} "
+              f"{'login p50':>10} {'p99':>8} {'probe p50':>10} {'p99':>8}")
+        for method in methods:
+            configure_password_hashing({'PASSWORD_HASH_METHOD': method, 'PASSWORD_HASH_THREADS': 0})
+            with app.app_context():
+                # Store hashes made with this method so no login re-hashes during the run
+                db.session.execute(db.update(User).values(password=hash_password(PASSWORD)))
+                db.session.commit()
+            for worker_class in worker_classes:
+                for threads in pool_sizes:
+                    env = dict(os.environ, PASSWORD_HASH_METHOD=method, PASSWORD_HASH_THREADS=str(threads))
+                    server, url = start_server(env, worker_class, args.workers)
+                    try:
+                        result = run(url, server.pid, args.clients, args.duration, token)
+                    finally:
+                        server.terminate()
+                        server.wait()
+                    print(f"{method:24} {worker_class:>7} {threads:7} {result['logins']:9.1f} "
+                          f"{result['per_core']:9.1f} {result['login_p50']:8.0f}ms {result['login_p99']:6.0f}ms "
+                          f"{result['probe_p50']:8.1f}ms {result['probe_p99']:6.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
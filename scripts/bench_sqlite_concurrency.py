@@ -0,0 +1,159 @@
+"""
+Concurrent-write benchmark for the SQLite connection profile.
+
+Usage: python scripts/bench_sqlite_concurrency.py [--processes 4] [--threads 4] [--bookings 50] [--readers 1]
+
+Runs the same workload twice, each against a fresh SQLite file:
+  default  SQLite's own defaults (rollback journal, synchronous=FULL, 2 MB cache,
+           no mmap, the 5 s busy timeout Python's sqlite3 module sets)
+  tuned    the configured profile (SQLITE_* settings, WAL by default)
+
+Every writer thread in every process creates bookings through
+AutoSphereService.create_booking while reader threads look bookings up by ID.
+Reports bookings/s, lookups/s, write latency percentiles and failed operations
+("database is locked" and friends). Exits 1 if the tuned profile has any errors.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+PROFILES = {
+    'default': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_BUSY_TIMEOUT_MS': '5000',
+        'SQLITE_CACHE_SIZE_KB': '2000',
+        'SQLITE_MMAP_SIZE_MB': '0',
+    },
+    'tuned': {},
+}
+
+
+def worker(threads: int, readers: int, bookings: int, results):
+    from app import create_app
+    from app.services.autosphere_service import AutoSphereService
+
+    app = create_app()
+    service = AutoSphereService()
+    latencies, errors, reads = [], [], [0]
+    window = [float('inf'), 0.0]
+    created_ids = []
+    done = threading.Event()
+
+    def write(seed: int):
+        rng = random.Random(seed)
+        with app.app_context():
+            for i in range(bookings):
+                start = time.perf_counter()
+                window[0] = min(window[0], time.time())
+                try:
+                    booking = service.create_booking(
+                        booking_type='Service', name=f'Bench {seed}-{i}', phone='0500000000',
+                        vehicle_model='Toyota Camry',
+                        preferred_date=(date(2030, 1, 1) + timedelta(days=rng.randrange(365))).isoformat()
+                    )
+                    created_ids.append(booking['booking_id'])
+                    latencies.append(time.perf_counter() - start)
+                    window[1] = max(window[1], time.time())
+                except Exception as e:
+                    errors.append(f"write: {e}".splitlines()[0])
+
+    def read():
+        with app.app_context():
+            while not done.is_set():
+                if not created_ids:
+                    time.sleep(0.001)
+                    continue
+                try:
+                    service.get_booking_by_id(random.choice(created_ids))
+                    reads[0] += 1
+                except Exception as e:
+                    errors.append(f"read: {e}".splitlines()[0])
+
+    writers = [threading.Thread(target=write, args=(os.getpid() * 100 + n,)) for n in range(threads)]
+    lookups = [threading.Thread(target=read) for _ in range(readers)]
+    for t in writers + lookups:
+        t.start()
+    for t in writers:
+        t.join()
+    done.set()
+    for t in lookups:
+        t.join()
+    results.put((latencies, errors, reads[0], window))
+
+
+def run_profile(name: str, settings: dict, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        for key in PROFILES['default']:
+            os.environ.pop(key, None)
+        os.environ.update(settings)
+        # Create the schema once before the workers race; each worker is a fresh interpreter
+        # (spawn) so it reads this profile's settings
+        ctx = multiprocessing.get_context('spawn')
+        setup = ctx.Process(target=_create_schema)
+        setup.start()
+        setup.join()
+
+        results = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(args.threads, args.readers, args.bookings, results))
+                 for _ in range(args.processes)]
+        for p in procs:
+            p.start()
+        collected = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+
+    # From the first write to the last, so interpreter/app start-up is not counted
+    elapsed = max(w[1] for *_, w in collected) - min(w[0] for *_, w in collected)
+    latencies = sorted(latency for batch, _, _, _ in collected for latency in batch)
+    errors = [error for _, batch, _, _ in collected for error in batch]
+    reads = sum(count for _, _, count, _ in collected)
+
+    def percentile(p):
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000 if latencies else 0
+
+    print(f"{name:8} {len(latencies) / elapsed:8.0f} bookings/s {reads / elapsed:9.0f} lookups/s  "
+          f"write p50 {percentile(0.5):6.1f} ms  p99 {percentile(0.99):7.1f} ms  errors {len(errors)}")
+    for error in sorted(set(errors))[:3]:
+        print(f"         {error}")
+    return {'errors': len(errors)}
+
+
+def _create_schema():
+    from app import create_app
+    create_app()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='Writer threads per process')
+    parser.add_argument('--readers', type=int, default=1, help='Reader threads per process')
+    parser.add_argument('--bookings', type=int, default=50, help='Bookings per writer thread')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='Profile(s) to run (default: all)')
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENAI_API_KEY', 'bench')
+    os.environ['VECTORSTORE_PRELOAD'] = 'false'
+    os.environ['DEPLOY_BUNDLE_DIR'] = os.path.join(tempfile.gettempdir(), 'no-bundle')
+    # Never refuse a booking as fully booked - this measures the database, not capacity
+    os.environ['BOOKING_CAPACITY_SERVICE'] = str(args.processes * args.threads * args.bookings)
+
+    print(f"{args.processes} processes x {args.threads} writers + {args.readers} readers, "
+          f"{args.bookings} bookings per writer")
+    outcome = {name: run_profile(name, PROFILES[name], args) for name in args.profile or ['default', 'tuned']}
+    sys.exit(1 if outcome.get('tuned', {}).get('errors') else 0)
+
+
+if __name__ == '__main__':
+    main()
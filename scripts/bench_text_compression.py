@@ -0,0 +1,76 @@
+"""
+Benchmark SQLite file size and read latency for plain vs compressed policy text.
+
+Usage: python scripts/bench_text_compression.py [--docs 500]
+Documents are synthesised from autosphere_policy.docx so the text is realistic.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import Config
+from app.utils import compression
+from app.utils.file_processor import read_docx
+
+
+def build_documents(count: int):
+    source = read_docx(os.path.join(os.path.dirname(__file__), '..', 'autosphere_policy.docx'))
+    paragraphs = [p for p in source.splitlines() if p.strip()]
+    rng = random.Random(42)
+    return [
+        "\n".join(rng.sample(paragraphs, min(len(paragraphs), 40)))
+        for _ in range(count)
+    ]
+
+
+def measure(path: str, docs, encode, decode):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE policy_documents (id INTEGER PRIMARY KEY, content BLOB NOT NULL)")
+    conn.executemany("INSERT INTO policy_documents (content) VALUES (?)", [(encode(d),) for d in docs])
+    conn.commit()
+    conn.execute("VACUUM")
+
+    start = time.perf_counter()
+    for _ in range(5):
+        rows = conn.execute("SELECT content FROM policy_documents").fetchall()
+        texts = [decode(row[0]) for row in rows]
+    elapsed = (time.perf_counter() - start) / 5
+    conn.close()
+    assert texts == docs
+    return os.path.getsize(path), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--docs', type=int, default=500)
+    args = parser.parse_args()
+
+    docs = build_documents(args.docs)
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.TEXT_COMPRESSION_DICT_DIR = os.path.join(tmp, 'dicts')
+        variants = [('plain text', lambda d: d, lambda v: v)]
+        for codec in ['zlib', 'zstd'] if compression.ZSTD_AVAILABLE else ['zlib']:
+            Config.TEXT_COMPRESSION_CODEC = codec
+            variants.append((f'{codec}', lambda d, c=codec: _compress(c, d, 0), compression.decompress_text))
+            dict_id = compression.train_dictionary(docs[:100])
+            variants.append((f'{codec}+dict', lambda d, c=codec, i=dict_id: _compress(c, d, i), compression.decompress_text))
+
+        print(f"{'variant':<14}{'db size (KB)':>14}{'read all (ms)':>16}")
+        for i, (name, encode, decode) in enumerate(variants):
+            size, elapsed = measure(os.path.join(tmp, f'{i}.db'), docs, encode, decode)
+            print(f"{name:<14}{size / 1024:>14.1f}{elapsed * 1000:>16.2f}")
+
+
+def _compress(codec: str, text: str, dict_id: int) -> bytes:
+    Config.TEXT_COMPRESSION_CODEC = codec
+    return compression.compress_text(text, dict_id=dict_id)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Build the deploy bundle loaded on cold start (see app/bundle.py).
+
+Usage: python scripts/build_bundle.py [--output bundle] [--vectorstore vectorstore] [--no-vectorstore]
+
+Creates a fresh SQLite database, runs init_db and seeds it from the Excel
+workbooks, then writes the compacted database, the verified FAISS vectorstore
+and the serialized OpenAPI spec to --output together with manifest.json.
+Run it before deploying (e.g. in the Vercel build step) whenever the models,
+seed workbooks or policy document change.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=os.path.join(ROOT, 'bundle'), help='Bundle directory (default: bundle/)')
+    parser.add_argument('--vectorstore', default=os.path.join(ROOT, 'vectorstore'),
+                        help='Saved FAISS vectorstore to ship (built with OpenAI embeddings if missing)')
+    parser.add_argument('--no-vectorstore', action='store_true', help='Ship only the database and spec')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        database_path = os.path.join(tmp, 'bundle.db')
+        os.environ['DATABASE_URL'] = f"sqlite:///{database_path}"
+        os.environ['VECTORSTORE_PRELOAD'] = 'false'
+        os.environ['SEED_ON_STARTUP'] = 'false'
+        # Never start from a previously built bundle
+        os.environ['DEPLOY_BUNDLE_DIR'] = os.path.join(tmp, 'no-bundle')
+        os.environ.setdefault('OPENAI_API_KEY', '')
+        from app import create_app
+        from app.bundle import build_bundle
+        from app.seed import seed
+
+        vectorstore_path = None
+        if not args.no_vectorstore:
+            if not os.path.exists(os.path.join(args.vectorstore, 'index.faiss')):
+                if not os.environ['OPENAI_API_KEY']:
+                    sys.exit(f"No vectorstore at {args.vectorstore} and OPENAI_API_KEY is not set "
+                             "(use --no-vectorstore to skip it)")
+                from app.utils.vectorstore import load_vectorstore
+                load_vectorstore('faiss')
+            vectorstore_path = args.vectorstore
+
+        app = create_app()
+        with app.app_context():
+            counts = seed(workers=os.cpu_count())
+            print(f"Seeded {counts['users']} users and {counts['bookings']} bookings")
+            manifest = build_bundle(args.output, database_path, vectorstore_path)
+
+    print(f"Bundle {manifest['version']} written to {args.output} in {time.perf_counter() - start:.1f}s")
+    for name, info in manifest['files'].items():
+        print(f"  {name:28} {info['bytes'] / 1024:10,.1f} KB")
+    if manifest['vectors'] is not None:
+        print(f"  vectors: {manifest['vectors']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Offline comparison of AutoSphere retriever backends (hit rate and latency).
+
+Usage: python scripts/eval_retrievers.py [--k 3] [--queries queries.jsonl]
+
+Each query has an "expected" snippet; a query is a hit when any of the top-k
+chunks contains it. --queries takes JSON lines of {"query": ..., "expected": ...}.
+The faiss backend embeds every query through the OpenAI API, so it is skipped
+when OPENAI_API_KEY is not configured.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import Config
+from app.utils.vectorstore import load_vectorstore
+
+
+DEFAULT_QUERIES = [
+    {"query": "What documents do I need for a test drive?", "expected": "Driving License Number"},
+    {"query": "How long does a test drive last?", "expected": "Test drive duration"},
+    {"query": "Is VAT included in service charges in the UK?", "expected": "VAT Rate: 20%"},
+    {"query": "Can I pay with Apple Pay?", "expected": "Apple Pay / Google Pay"},
+    {"query": "How far in advance must I book a service?", "expected": "Booking must be 24 hours in advance"},
+    {"query": "What do I need to lodge a complaint?", "expected": "Complaint Category"},
+    {"query": "Which brands do you support?", "expected": "Mercedes-Benz"},
+    {"query": "Do you sell certified pre-owned cars?", "expected": "Certified Pre-Owned Vehicles"},
+    {"query": "What is included in quick service at the weekend?", "expected": "Tire puncture repair"},
+    {"query": "What is the last slot for a minor service?", "expected": "Minor Service: 3 hours before closing"},
+    {"query": "Where is your branch in Riyadh?", "expected": "Riyadh North"},
+    {"query": "Is my data shared with third parties?", "expected": "No third-party data sharing"},
+    {"query": "Can I return a spare part after installation?", "expected": "Non-returnable once installed"},
+    {"query": "Do you offer roadside assistance?", "expected": "Roadside Assistance"},
+    {"query": "What are your working hours in the UK?", "expected": "Monday–Saturday: 9:00 AM – 6:00 PM"},
+]
+
+
+def evaluate(retriever, queries, k: int):
+    hits = 0
+    latencies = []
+    for item in queries:
+        start = time.perf_counter()
+        docs = retriever.similarity_search(item["query"], k=k)
+        latencies.append(time.perf_counter() - start)
+        if any(item["expected"].lower() in doc.page_content.lower() for doc in docs):
+            hits += 1
+    latencies.sort()
+    return {
+        "hit_rate": hits / len(queries),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "max_ms": latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--k', type=int, default=3)
+    parser.add_argument('--queries', help='JSON lines file of {"query", "expected"}')
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries) as f:
+            queries = [json.loads(line) for line in f if line.strip()]
+
+    backends = ['bm25']
+    if Config.OPENAI_API_KEY:
+        backends.append('faiss')
+    else:
+        print("OPENAI_API_KEY not set - skipping the faiss backend")
+
+    print(f"{'backend':<10}{'load (ms)':>12}{'hit@' + str(args.k):>10}{'p50 (ms)':>12}{'max (ms)':>12}")
+    for backend in backends:
+        start = time.perf_counter()
+        retriever = load_vectorstore(backend)
+        load_ms = (time.perf_counter() - start) * 1000
+        result = evaluate(retriever, queries, args.k)
+        print(f"{backend:<10}{load_ms:>12.1f}{result['hit_rate']:>10.2f}"
+              f"{result['p50_ms']:>12.2f}{result['max_ms']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
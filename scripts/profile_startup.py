@@ -0,0 +1,124 @@
+"""
+Cold-start profiler and budget check.
+
+Usage: python scripts/profile_startup.py [--top 15] [--check] [--max-startup-ms 2000] [--max-rss-mb 250]
+
+Starts a fresh interpreter (as a serverless cold start would), imports the app,
+runs create_app against an already initialised SQLite database and serves one
+POST /api/auth/login. Reports the time for each step, peak RSS, the slowest
+top-level imports (python -X importtime), and any heavy optional dependency that
+got imported along the way. With --check it exits 1 when a budget is exceeded
+or a heavy module is loaded, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Must only be imported by the endpoints that use them, never at startup/login
+HEAVY_MODULES = [
+    'sklearn', 'scipy', 'numpy', 'faiss', 'langchain_core', 'langchain_community',
+    'langchain_openai', 'openai', 'PyPDF2', 'docx', 'openpyxl', 'pandas', 'pyarrow',
+]
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().post('/api/auth/login', json={'username': 'admin', 'password': 'admin123'})
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_login_ms': (served - created) * 1000,
+    'login_status': response.status_code,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy_modules': sorted(name for name in HEAVY if name in sys.modules),
+}))
+"""
+
+
+def run_probe(env, importtime: bool):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [
+        '-c', f"HEAVY = {HEAVY_MODULES!r}\n{PROBE}"
+    ]
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+    if result.returncode or not lines:
+        sys.exit(f"Probe failed:\n{result.stdout}\n{result.stderr[-2000:]}")
+    return json.loads(lines[-1]), result.stderr
+
+
+def top_imports(importtime_log: str, top: int):
+    """Slowest top-level modules by cumulative import time (ms)"""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if a budget is exceeded')
+    parser.add_argument('--max-startup-ms', type=float, default=2000,
+                        help='Budget for import + create_app (default: 2000)')
+    parser.add_argument('--max-rss-mb', type=float, default=250, help='Peak RSS budget (default: 250)')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs; the fastest is reported')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        env.update({
+            'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+            'OPENAI_API_KEY': env.get('OPENAI_API_KEY', 'profile'),
+            'VECTORSTORE_PRELOAD': 'false',
+            'SEED_ON_STARTUP': 'true',
+        })
+        # First start creates the schema and seeds the admin user; later starts are the cold path
+        run_probe(env, importtime=False)
+        runs = [run_probe(env, importtime=False)[0] for _ in range(args.runs)]
+        _, importtime_log = run_probe(env, importtime=True)
+
+    best = min(runs, key=lambda run: run['import_ms'] + run['create_app_ms'])
+    startup_ms = best['import_ms'] + best['create_app_ms']
+    print(f"import app      {best['import_ms']:8.0f} ms")
+    print(f"create_app      {best['create_app_ms']:8.0f} ms")
+    print(f"first login     {best['first_login_ms']:8.0f} ms  (HTTP {best['login_status']})")
+    print(f"peak RSS        {best['peak_rss_mb']:8.1f} MB")
+    print(f"\nSlowest top-level imports:")
+    for ms, name in top_imports(importtime_log, args.top):
+        print(f"  {ms:8.1f} ms  {name}")
+    print(f"\nHeavy modules loaded: {', '.join(best['heavy_modules']) or 'none'}")
+
+    failures = []
+    if startup_ms > args.max_startup_ms:
+        failures.append(f"startup {startup_ms:.0f} ms > {args.max_startup_ms:.0f} ms")
+    if best['peak_rss_mb'] > args.max_rss_mb:
+        failures.append(f"peak RSS {best['peak_rss_mb']:.1f} MB > {args.max_rss_mb:.0f} MB")
+    if best['heavy_modules']:
+        failures.append(f"heavy modules imported at startup/login: {', '.join(best['heavy_modules'])}")
+    if best['login_status'] != 200:
+        failures.append(f"login returned HTTP {best['login_status']}")
+
+    if failures:
+        print("\nBUDGET EXCEEDED:\n  " + "\n  ".join(failures))
+        if args.check:
+            sys.exit(1)
+    elif args.check:
+        print("\nWithin budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Concurrency stress test for booking ID generation and date capacity.
+
+Usage: python scripts/stress_booking_ids.py [--processes 4] [--threads 4] [--bookings 50] [--capacity N]
+
+Every thread in every process creates bookings for the same preferred date against
+one shared SQLite file through AutoSphereService.create_booking. The run fails if
+any booking errors or any booking ID is issued twice. With --capacity, exactly N
+bookings must succeed, the rest must be refused as fully booked, and the
+capacity counter must match the bookings stored.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+STRESS_DATE = date(2030, 1, 1)
+
+
+def worker(db_url: str, threads: int, bookings: int, results):
+    os.environ['DATABASE_URL'] = db_url
+    os.environ.setdefault('OPENAI_API_KEY', 'stress-test')
+    os.environ['VECTORSTORE_PRELOAD'] = 'false'
+    from app import create_app
+    from app.services.autosphere_service import AutoSphereService
+    from app.repositories.booking_capacity_repository import CapacityExceededError
+
+    app = create_app()
+    service = AutoSphereService()
+    ids, errors, refused = [], [], []
+
+    def run():
+        with app.app_context():
+            for i in range(bookings):
+                try:
+                    booking = service.create_booking(
+                        booking_type='Service', name=f'Stress {i}', phone='0500000000',
+                        vehicle_model='Toyota Camry', preferred_date=STRESS_DATE.isoformat()
+                    )
+                    ids.append(booking['booking_id'])
+                except CapacityExceededError:
+                    refused.append(i)
+                except Exception as e:
+                    errors.append(str(e))
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    results.put((ids, errors, len(refused)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--bookings', type=int, default=50, help='Bookings per thread')
+    parser.add_argument('--capacity', type=int, default=None,
+                        help='Service slots for the date (default: enough for every booking)')
+    args = parser.parse_args()
+    total = args.processes * args.threads * args.bookings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'stress.db')}"
+        # Create the schema once before the workers race
+        os.environ['DATABASE_URL'] = db_url
+        os.environ.setdefault('OPENAI_API_KEY', 'stress-test')
+        os.environ['VECTORSTORE_PRELOAD'] = 'false'
+        # Workers inherit the environment, so they all read the same capacity
+        os.environ['BOOKING_CAPACITY_SERVICE'] = str(total if args.capacity is None else args.capacity)
+        from app import create_app
+        app = create_app()
+
+        results = multiprocessing.Queue()
+        start = time.perf_counter()
+        procs = [
+            multiprocessing.Process(target=worker, args=(db_url, args.threads, args.bookings, results))
+            for _ in range(args.processes)
+        ]
+        for p in procs:
+            p.start()
+        collected = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        from app.models import Booking, BookingCapacity
+        with app.app_context():
+            stored = Booking.query.filter_by(preferred_date=STRESS_DATE).count()
+            counter = BookingCapacity.query.filter_by(day=STRESS_DATE, booking_type='Service', location='').first()
+            reserved = counter.reserved if counter else 0
+
+    ids = [i for batch, _, _ in collected for i in batch]
+    errors = [e for _, batch, _ in collected for e in batch]
+    refused = sum(count for _, _, count in collected)
+    duplicates = len(ids) - len(set(ids))
+    expected = total if args.capacity is None else min(args.capacity, total)
+    print(f"created {len(ids)} bookings in {elapsed:.2f}s ({len(ids) / elapsed:.0f}/s), refused {refused} as fully booked")
+    print(f"errors: {len(errors)}  duplicate ids: {duplicates}  stored: {stored}  reserved: {reserved}")
+    for error in sorted(set(errors))[:5]:
+        print(f"  {error}")
+    overbooked = len(ids) != expected or stored != len(ids) or reserved != len(ids)
+    if overbooked:
+        print(f"CAPACITY MISMATCH: expected {expected} bookings")
+    sys.exit(1 if errors or duplicates or overbooked else 0)
+
+
+if __name__ == '__main__':
+    main()